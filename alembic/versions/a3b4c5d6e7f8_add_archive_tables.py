@@ -0,0 +1,77 @@
+"""Add archive tables for soft-deleted polls, options, votes and likes
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-19 11:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a3b4c5d6e7f8'
+down_revision: Union[str, None] = 'f2a3b4c5d6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create poll_archive, poll_options_archive, votes_archive and likes_archive."""
+    op.create_table('poll_archive',
+        sa.Column('title', sa.String(length=50), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('likes', sa.Integer(), nullable=False),
+        sa.Column('vote_epoch', sa.Integer(), nullable=False),
+        sa.Column('version_id', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('id_seq')"), nullable=False),
+        sa.Column('uuid', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table('poll_options_archive',
+        sa.Column('poll_id', sa.Integer(), nullable=False),
+        sa.Column('option_name', sa.String(length=50), nullable=False),
+        sa.Column('votes', sa.Integer(), nullable=False),
+        sa.Column('version_id', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('id_seq')"), nullable=False),
+        sa.Column('uuid', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_poll_options_archive_poll_id', 'poll_options_archive', ['poll_id'])
+
+    op.create_table('votes_archive',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('poll_id', sa.Integer(), nullable=False),
+        sa.Column('option_id', sa.Integer(), nullable=False),
+        sa.Column('epoch', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('id_seq')"), nullable=False),
+        sa.Column('uuid', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_votes_archive_poll_id', 'votes_archive', ['poll_id'])
+
+    op.create_table('likes_archive',
+        sa.Column('poll_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('id_seq')"), nullable=False),
+        sa.Column('uuid', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_likes_archive_poll_id', 'likes_archive', ['poll_id'])
+
+
+def downgrade() -> None:
+    """Drop the archive tables."""
+    op.drop_table('likes_archive')
+    op.drop_table('votes_archive')
+    op.drop_table('poll_options_archive')
+    op.drop_table('poll_archive')
@@ -0,0 +1,51 @@
+"""Add vote timestamps and time-bucketed vote rollups
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-19 12:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b4c5d6e7f8a9'
+down_revision: Union[str, None] = 'a3b4c5d6e7f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add votes.created_at and the vote_rollups table read by the poll timeline."""
+    # Existing votes keep NULL: when they were cast is unknown, and stamping them with the
+    # migration time would put all history into one bucket. The default applies to new votes only
+    op.add_column('votes',
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.alter_column('votes', 'created_at', server_default=sa.text('now()'))
+    op.add_column('votes_archive',
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True)
+    )
+
+    op.create_table('vote_rollups',
+        sa.Column('poll_id', sa.Integer(), nullable=False),
+        sa.Column('epoch', sa.Integer(), nullable=False),
+        sa.Column('option_id', sa.Integer(), nullable=False),
+        sa.Column('granularity', sa.String(length=10), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('votes', sa.Integer(), nullable=False),
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('id_seq')"), nullable=False),
+        sa.Column('uuid', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        # Leading poll_id/epoch/granularity also serves the timeline's range scan
+        sa.UniqueConstraint('poll_id', 'epoch', 'granularity', 'bucket_start', 'option_id', name='uq_vote_rollups_bucket')
+    )
+    # No backfill: rollups only count votes with a real timestamp, so votes cast before this
+    # migration are left out of the timeline and trending rebuilds
+
+
+def downgrade() -> None:
+    """Drop vote_rollups and the vote timestamps."""
+    op.drop_table('vote_rollups')
+    op.drop_column('votes_archive', 'created_at')
+    op.drop_column('votes', 'created_at')
@@ -0,0 +1,51 @@
+"""Add poll search terms
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-19 13:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c5d6e7f8a9b0'
+down_revision: Union[str, None] = 'b4c5d6e7f8a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create poll_search_terms, the word -> poll postings behind poll search, and fill it."""
+    op.create_table('poll_search_terms',
+        sa.Column('poll_id', sa.Integer(), nullable=False),
+        sa.Column('term', sa.Text(), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('poll_id', 'term', name='poll_search_terms_pkey')
+    )
+
+    # The same words and weights as PollSearchCrud: 1.0 for title words, 0.4 for option-only words
+    op.execute("""
+        INSERT INTO poll_search_terms (poll_id, term, weight)
+        SELECT poll_id, term, max(weight)
+        FROM (
+            SELECT p.id AS poll_id, unnest(tsvector_to_array(to_tsvector('simple', p.title))) AS term, 1.0 AS weight
+            FROM poll p
+            WHERE p.is_active
+            UNION ALL
+            SELECT o.poll_id, unnest(tsvector_to_array(to_tsvector('simple', o.option_name))), 0.4
+            FROM poll_options o
+            JOIN poll p ON p.id = o.poll_id AND p.is_active
+            WHERE o.is_active
+        ) AS words
+        GROUP BY poll_id, term
+    """)
+
+    # Built after the backfill, which is faster than maintaining it row by row
+    op.create_index('ix_poll_search_terms_term', 'poll_search_terms', ['term', 'weight', 'poll_id'])
+
+
+def downgrade() -> None:
+    """Drop poll_search_terms."""
+    op.drop_index('ix_poll_search_terms_term', table_name='poll_search_terms')
+    op.drop_table('poll_search_terms')
@@ -0,0 +1,44 @@
+"""Add per-poll vote epochs
+
+Revision ID: e1f2a3b4c5d6
+Revises: 70e0bf9ebd07
+Create Date: 2026-10-19 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e1f2a3b4c5d6'
+down_revision: Union[str, None] = '70e0bf9ebd07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add poll.vote_epoch and votes.epoch so resetting votes is a single counter bump."""
+    op.add_column('poll',
+        sa.Column('vote_epoch', sa.Integer(), nullable=False, server_default='1')
+    )
+
+    op.add_column('votes',
+        sa.Column('epoch', sa.Integer(), nullable=False, server_default='1')
+    )
+
+    # Build the index without blocking vote inserts on large tables
+    with op.get_context().autocommit_block():
+        op.create_index('ix_votes_poll_id_epoch', 'votes', ['poll_id', 'epoch'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Drop vote epochs, discarding votes that belong to an old epoch first."""
+    op.execute(
+        "DELETE FROM votes USING poll "
+        "WHERE votes.poll_id = poll.id AND votes.epoch <> poll.vote_epoch"
+    )
+
+    op.drop_index('ix_votes_poll_id_epoch', table_name='votes')
+
+    op.drop_column('votes', 'epoch')
+
+    op.drop_column('poll', 'vote_epoch')
@@ -0,0 +1,25 @@
+"""Index poll_options.poll_id
+
+Revision ID: e2f3a4b5c6d7
+Revises: d6e7f8a9b0c1
+Create Date: 2026-10-19 16:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+revision: str = 'e2f3a4b5c6d7'
+down_revision: Union[str, None] = 'd6e7f8a9b0c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the options foreign key, used to load a poll's options and to rank search candidates."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_poll_options_poll_id', 'poll_options', ['poll_id'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Drop the options foreign key index."""
+    op.drop_index('ix_poll_options_poll_id', table_name='poll_options')
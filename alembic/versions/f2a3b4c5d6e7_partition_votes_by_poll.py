@@ -0,0 +1,133 @@
+"""Hash-partition the votes table on poll_id
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-19 10:00:00.000000
+
+The existing table stays online while it is copied:
+
+1. ``votes_partitioned`` is created with ``VOTES_PARTITION_COUNT`` hash partitions.
+2. A trigger mirrors every insert/update/delete on ``votes`` into the new table.
+3. Existing rows are copied in id-range batches of ``VOTES_PARTITION_COPY_BATCH``,
+   each batch committed on its own so no long transaction holds locks.
+4. The tables are swapped under a brief ACCESS EXCLUSIVE lock and the old table is dropped.
+
+Both values come from ``settings`` (environment or local.env, defaults 16 and 50000), the
+same source the ``Vote`` model uses. This migration needs an online connection; it can't be
+rendered with ``--sql``.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+from core.settings import settings
+
+
+revision: str = 'f2a3b4c5d6e7'
+down_revision: Union[str, None] = 'e1f2a3b4c5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, uuid, user_id, poll_id, option_id, epoch"
+
+
+def _create_votes_table(name: str, partition_count: int = 0) -> None:
+    partition_clause = " PARTITION BY HASH (poll_id)" if partition_count else ""
+    # Same column order as the PrimaryKeyConstraint on the Vote model
+    primary_key = "poll_id, id" if partition_count else "id"
+    op.execute(f"""
+        CREATE TABLE {name} (
+            id INTEGER NOT NULL DEFAULT nextval('id_seq'),
+            uuid UUID NOT NULL DEFAULT gen_random_uuid(),
+            user_id INTEGER NOT NULL,
+            poll_id INTEGER NOT NULL,
+            option_id INTEGER NOT NULL,
+            epoch INTEGER NOT NULL DEFAULT 1,
+            CONSTRAINT {name}_pkey PRIMARY KEY ({primary_key}),
+            CONSTRAINT {name}_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id),
+            CONSTRAINT {name}_poll_id_fkey FOREIGN KEY (poll_id) REFERENCES poll (id),
+            CONSTRAINT {name}_option_id_fkey FOREIGN KEY (option_id) REFERENCES poll_options (id)
+        ){partition_clause}
+    """)
+    for remainder in range(partition_count):
+        op.execute(
+            f"CREATE TABLE votes_p{remainder} PARTITION OF {name} "
+            f"FOR VALUES WITH (MODULUS {partition_count}, REMAINDER {remainder})"
+        )
+    op.execute(f"CREATE INDEX ix_{name}_poll_id_epoch ON {name} (poll_id, epoch)")
+
+
+def _mirror_writes(source: str, target: str) -> None:
+    op.execute(f"""
+        CREATE FUNCTION {source}_mirror_writes() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {target} WHERE id = OLD.id AND poll_id = OLD.poll_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {target} ({COLUMNS})
+                VALUES (NEW.id, NEW.uuid, NEW.user_id, NEW.poll_id, NEW.option_id, NEW.epoch)
+                ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        f"CREATE TRIGGER {source}_mirror_writes AFTER INSERT OR UPDATE OR DELETE ON {source} "
+        f"FOR EACH ROW EXECUTE FUNCTION {source}_mirror_writes()"
+    )
+
+
+def _copy_in_batches(source: str, target: str, batch_size: int) -> None:
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text(f"SELECT max(id) FROM {source}")).scalar()
+    if max_id is None:
+        return
+
+    # Each statement commits on its own inside the autocommit block.
+    # FOR SHARE makes a concurrent delete wait for the batch, so the mirror trigger sees the copied row.
+    with op.get_context().autocommit_block():
+        lower = 0
+        while lower < max_id:
+            upper = lower + batch_size
+            op.execute(
+                f"INSERT INTO {target} ({COLUMNS}) "
+                f"SELECT {COLUMNS} FROM {source} WHERE id > {lower} AND id <= {upper} FOR SHARE "
+                f"ON CONFLICT DO NOTHING"
+            )
+            lower = upper
+
+
+def _swap(old: str, new: str) -> None:
+    op.execute(f"LOCK TABLE {old} IN ACCESS EXCLUSIVE MODE")
+    op.execute(f"DROP TRIGGER {old}_mirror_writes ON {old}")
+    op.execute(f"DROP FUNCTION {old}_mirror_writes()")
+    op.execute(f"DROP TABLE {old}")
+
+    op.execute(f"ALTER TABLE {new} RENAME TO votes")
+    for suffix in ("pkey", "user_id_fkey", "poll_id_fkey", "option_id_fkey"):
+        op.execute(f"ALTER TABLE votes RENAME CONSTRAINT {new}_{suffix} TO votes_{suffix}")
+    op.execute(f"ALTER INDEX ix_{new}_poll_id_epoch RENAME TO ix_votes_poll_id_epoch")
+
+
+def upgrade() -> None:
+    """Copy votes into a table hash-partitioned on poll_id and swap it in."""
+    partition_count = settings.VOTES_PARTITION_COUNT
+    batch_size = settings.VOTES_PARTITION_COPY_BATCH
+
+    _create_votes_table("votes_partitioned", partition_count)
+    _mirror_writes("votes", "votes_partitioned")
+    _copy_in_batches("votes", "votes_partitioned", batch_size)
+    _swap("votes", "votes_partitioned")
+
+
+def downgrade() -> None:
+    """Copy votes back into a regular table."""
+    batch_size = settings.VOTES_PARTITION_COPY_BATCH
+
+    _create_votes_table("votes_unpartitioned")
+    _mirror_writes("votes", "votes_unpartitioned")
+    _copy_in_batches("votes", "votes_unpartitioned", batch_size)
+    # Dropping the partitioned parent also drops its partitions
+    _swap("votes", "votes_unpartitioned")
@@ -1,7 +1,8 @@
 from datetime import timedelta
 from fastapi import HTTPException, APIRouter, status, Depends
 
-from core.depends import AsyncDBSession, AuthenticatedUser
+from core.depends import AsyncDBSession, AsyncReadDBSession, ReadAuthenticatedUser
+from core.errors import unexpected_error
 from core.auth import verify_password, create_access_token
 from core.settings import settings
 from schemas.user_schema import UserCreate, UserLogin, AuthUser, Token, UserMeResponse
@@ -45,10 +46,7 @@ async def register(
         raise
     except Exception as e:
         await session.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create user: {str(e)}"
-        )
+        raise unexpected_error("Failed to create user", e)
 
 
 @router.post("/login", response_model=Token)
@@ -85,16 +83,13 @@ async def login(
         raise
     except Exception as e:
         await session.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to authenticate user: {str(e)}"
-        )
+        raise unexpected_error("Failed to authenticate user", e)
 
 
 @router.get("/me", response_model=UserMeResponse)
 async def get_current_user_info(
-    session: AsyncDBSession,
-    current_user: AuthenticatedUser
+    session: AsyncReadDBSession,
+    current_user: ReadAuthenticatedUser
 ):
     """Get current user info including liked polls and voted options."""
     try:
@@ -112,8 +107,5 @@ async def get_current_user_info(
         )
     
     except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to fetch user data: {str(e)}"
-        )
+        raise unexpected_error("Failed to fetch user data", e)
 
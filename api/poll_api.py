@@ -1,12 +1,24 @@
-from typing import List
+import base64
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, List, Literal, Optional, Tuple
 from uuid import UUID
-from fastapi import HTTPException, APIRouter, Depends
+from fastapi import HTTPException, APIRouter, Query
+from fastapi.responses import StreamingResponse
 
 from core.connection_manager import manager
-from core.depends import AsyncDBSession, AuthenticatedUser
+from core.errors import unexpected_error
+from core.responses import RawJSONResponse
+from core.metrics import votes_total, likes_total
+from core.depends import (
+    AsyncDBSession, AsyncReadDBSession, AuthenticatedUser, ReadAuthenticatedUser, UserKey, pinned_to_primary, read_engine_for
+)
+from core.settings import settings
+from core.single_flight import single_flight
+from core.trending import trending_polls
 from schemas.poll_schema import (
     CreatePollRequestSchema,
-    PollOptionSchema,
     UpdatePollRequestSchema,
     PollResponseWithVersionId,
     VoteRequestSchema,
@@ -14,12 +26,25 @@ from schemas.poll_schema import (
     DeletePollOptionsRequestSchema,
     LikeResponseSchema,
     VoteResponseSchema,
-    PollSummaryData
+    PollSummaryData,
+    PollSummaryResponse,
+    PollSearchResponse,
+    PollTimelineResponse,
+    TimelineBucket,
+    TrendingPollSchema,
+    poll_response_adapter,
+    poll_summary_adapter,
+    trending_list_adapter,
+    poll_list_adapter
 )
 from crud.poll_crud import poll_crud as PollCrud
 from crud.poll_option_crud import poll_option_crud as PollOptionCrud
+from crud.poll_search_crud import poll_search_crud as PollSearchCrud
 from crud.like_crud import like_crud as LikeCrud
 from crud.vote_crud import vote_crud as VoteCrud
+from crud.vote_rollup_crud import vote_rollup_crud as VoteRollupCrud
+
+logger = logging.getLogger(__name__)
 
 
 router = APIRouter(
@@ -57,35 +82,20 @@ async def create_poll(
                 for opt in poll.options
             ]
             poll_options = await PollOptionCrud.create_options(session, options_data)
+            await PollSearchCrud.index_poll(session, created_poll.id)
             
-            # Sort options by id (ascending order) to ensure consistent ordering
-            sorted_poll_options = sorted(poll_options, key=lambda opt: opt.id)
-            
-            options_list = [
-                PollOptionSchema.model_validate(opt).model_dump(mode="json")
-                for opt in sorted_poll_options
-            ]
-            
-            response_data = {
-                "uuid": created_poll.uuid,
-                "title": created_poll.title,
-                "likes": created_poll.likes,
-                "created_at": created_poll.created_at,
-                "version_id": created_poll.version_id,
-                "created_by_uuid": current_user.uuid,
-                "options": options_list
-            }
-        validated_response = PollResponseWithVersionId.model_validate(response_data)
-        await manager.broadcast({
-            "type": "poll_created",
-            "data": validated_response.model_dump(mode="json")
-        })
+            # A new poll has no votes yet
+            response = PollCrud.build_poll_response(created_poll, poll_options, current_user.uuid, {})
 
-        return validated_response
+        # Encoded once and shared by the broadcast and the HTTP response
+        poll_json = poll_response_adapter.dump_json(response)
+        await manager.broadcast_event("poll_created", poll_json)
+
+        return RawJSONResponse(poll_json)
 
     except Exception as e:
         await session.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to create poll: {str(e)}")
+        raise unexpected_error("Failed to create poll", e)
 
 
 @router.put("/{poll_uuid}", response_model=PollResponseWithVersionId)
@@ -110,6 +120,8 @@ async def edit_poll(
             if existing_poll.version_id != poll.version_id:
                 raise HTTPException(status_code=409, detail="Poll version conflict")
 
+            # Search terms only need re-indexing when the title or an option name changes
+            text_changed = False
             if poll.options is not None:
                 option_map = {opt.uuid: {
                     "id": opt.id,
@@ -147,39 +159,44 @@ async def edit_poll(
 
                 # Only update options if there are actual changes
                 if id_to_title_map:
+                    # RETURNING refreshes the options already loaded on existing_poll
                     await PollOptionCrud.update_option_by_id(
                         session,
                         list(id_to_title_map.keys()),
                         id_to_title_map
                     )
                     existing_poll.version_id += 1
-                    await session.flush()
+                    text_changed = True
 
             if poll.title is not None and poll.title != existing_poll.title:
                 existing_poll.title = poll.title
                 existing_poll.version_id += 1
-                await session.flush()
-            
-            # Expunge all objects from session to clear cache and ensure fresh data is fetched
-            session.expunge_all()
+                text_changed = True
 
-            updated_poll = await PollCrud.get_poll_by_uuid(session, poll_uuid)
-            response_data = await PollCrud.build_poll_response_data(session, updated_poll)
+            # Single flush for the poll row; the response is built from in-memory state
+            await session.flush()
+            if text_changed:
+                await PollSearchCrud.index_poll(session, existing_poll.id)
+
+            vote_counts = await VoteCrud.get_vote_counts_by_poll(session, existing_poll.id, existing_poll.vote_epoch)
+            response = PollCrud.build_poll_response(
+                existing_poll,
+                existing_poll.poll_options,
+                current_user.uuid,
+                vote_counts
+            )
             
-        validated_response = PollResponseWithVersionId.model_validate(response_data)
-        
-        await manager.broadcast({
-            "type": "poll_updated",
-            "data": validated_response.model_dump(mode="json")
-        })
+        trending_polls.set_title(poll_uuid, response.title)
+        poll_json = poll_response_adapter.dump_json(response)
+        await manager.broadcast_event("poll_updated", poll_json)
         
-        return validated_response
+        return RawJSONResponse(poll_json)
         
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to update poll: {str(e)}")
+        raise unexpected_error("Failed to update poll", e)
 
 
 @router.post("/{poll_uuid}/options", response_model=PollResponseWithVersionId)
@@ -211,26 +228,25 @@ async def add_options_to_poll(
                 for opt in options_data.options
             ]
             
-            await PollOptionCrud.add_options_to_poll(session, existing_poll.id, new_options)
+            added_options = await PollOptionCrud.add_options_to_poll(session, existing_poll.id, new_options)
+            await PollSearchCrud.index_poll(session, existing_poll.id)
             existing_poll.version_id += 1
             
-            # Delete all votes for this poll since options have changed
-            await VoteCrud.delete_all_votes_for_poll(session, existing_poll.id)
+            # Reset votes since options have changed: starting a new epoch hides all earlier votes
+            # in O(1), and the stale rows are deleted later by the vote sweeper
+            existing_poll.vote_epoch += 1
 
             await session.flush()
             
-            # Expunge all objects from session to clear cache and ensure fresh data is fetched
-            session.expunge_all()
-
-            updated_poll = await PollCrud.get_poll_by_uuid(session, poll_uuid)
-            
-            response_data = await PollCrud.build_poll_response_data(session, updated_poll)
-            
-            total_votes, option_percentages = await VoteCrud.get_vote_percentages(
-                session, updated_poll.id, updated_poll.poll_options
+            # Votes were just cleared, so every option has zero votes
+            response = PollCrud.build_poll_response(
+                existing_poll,
+                [*existing_poll.poll_options, *added_options],
+                current_user.uuid,
+                {}
             )
             
-        validated_response = PollResponseWithVersionId.model_validate(response_data)
+        poll_json = poll_response_adapter.dump_json(response)
         
         # Send a poll_voted event with total_votes: 0 to indicate votes were cleared and poll is votable
         await manager.broadcast({
@@ -245,40 +261,313 @@ async def add_options_to_poll(
             }
         })
         
-        # Build broadcast data
-        broadcast_data = validated_response.model_dump(mode="json")
+        await manager.broadcast_event("poll_options_added", poll_json)
         
-        await manager.broadcast({
-            "type": "poll_options_added",
-            "data": broadcast_data
-        })
-        
-        return validated_response
+        return RawJSONResponse(poll_json)
         
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to add options to poll: {str(e)}")
+        raise unexpected_error("Failed to add options to poll", e)
+
+
+async def _render_poll_list(session_factory) -> bytes:
+    async with session_factory() as session:
+        async with session.begin():
+            polls = await PollCrud.get_all_active_polls(session)
+            response_list = await PollCrud.build_poll_responses(session, polls)
+
+    return poll_list_adapter.dump_json(response_list)
 
 
 @router.get("/", response_model=List[PollResponseWithVersionId])
 async def get_all_polls(
-    session: AsyncDBSession,
+    user_key: UserKey,
+):
+    """List active polls.
+
+    Concurrent requests against the same database share one in-flight query and its encoded
+    result, so a burst of refetches costs a single read. A user who just wrote runs their own
+    query, so they see the write.
+    """
+    engine, session_factory = read_engine_for(user_key)
+    try:
+        body = await single_flight.do(
+            ("poll_list", engine),
+            lambda: _render_poll_list(session_factory),
+            coalesce=not pinned_to_primary(user_key)
+        )
+        return RawJSONResponse(body)
+
+    except Exception as e:
+        raise unexpected_error("Failed to fetch polls", e)
+
+
+async def _stream_polls(engine, session_factory, output_format: str):
+    """Yield serialized active polls batch by batch so memory does not grow with the table.
+
+    Headers are already sent by the time a batch can fail, so a failure is logged and re-raised,
+    which aborts the response; the client sees a broken body instead of a well-formed partial one.
+    """
+    ndjson = output_format == "ndjson"
+    first = True
+    if not ndjson:
+        yield b"["
+    try:
+        async with engine.connect() as connection:
+            async with session_factory(bind=connection) as session:
+                async with session.begin():
+                    async for polls in PollCrud.stream_active_polls(session, settings.POLL_STREAM_BATCH_SIZE):
+                        chunk = []
+                        for response in await PollCrud.build_poll_responses(session, polls):
+                            poll_json = poll_response_adapter.dump_json(response)
+                            if ndjson:
+                                chunk.append(poll_json + b"\n")
+                            else:
+                                chunk.append(poll_json if first else b"," + poll_json)
+                                first = False
+                        # Drop the batch from the identity map before fetching the next one; expunge_all()
+                        # would replace the map the open cursor is still loading into
+                        for instance in list(session):
+                            session.expunge(instance)
+                        yield b"".join(chunk)
+    except Exception as e:
+        logger.error(f"Poll stream aborted: {e}")
+        raise
+    if not ndjson:
+        yield b"]"
+
+
+@router.get("/stream", response_model=List[PollResponseWithVersionId])
+async def stream_all_polls(
+    user_key: UserKey,
+    format: Literal["json", "ndjson"] = "ndjson",
 ):
+    """Stream every active poll as NDJSON (one poll per line) or as a chunked JSON array.
+
+    Polls are read through a server-side cursor in batches, so time to first byte and memory
+    stay flat however many polls exist.
+    """
+    engine, session_factory = read_engine_for(user_key)
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+    return StreamingResponse(_stream_polls(engine, session_factory, format), media_type=media_type)
+
+
+def _encode_search_cursor(rank: float, poll_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{rank!r}:{poll_id}".encode()).decode()
+
+
+def _decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        rank, poll_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(rank), int(poll_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid search cursor")
+
+
+@router.get("/search", response_model=PollSearchResponse)
+async def search_polls(
+    session: AsyncReadDBSession,
+    q: Annotated[str, Query(min_length=3, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=settings.POLL_SEARCH_MAX_PAGE_SIZE)] = settings.POLL_SEARCH_PAGE_SIZE,
+    cursor: Optional[str] = None,
+):
+    """Search active polls by title and option names, best matches first.
+
+    Polls match on whole words of the query, and those matching more words rank first. Pages are
+    keyset-paginated: pass the returned ``next_cursor`` as ``cursor``.
+    """
+    after = _decode_search_cursor(cursor) if cursor else None
     try:
         async with session.begin():
-            polls = await PollCrud.get_all_active_polls(session)
-            
-            response_list = []
-            for poll in polls:
-                poll_data = await PollCrud.build_poll_response_data(session, poll)
-                response_list.append(PollResponseWithVersionId.model_validate(poll_data))
-            
-            return response_list
-        
+            matches = await PollCrud.search_active_polls(session, q, limit, after)
+            responses = await PollCrud.build_poll_responses(session, [poll for poll, _ in matches])
+
+        next_cursor = None
+        if len(matches) == limit:
+            last_poll, last_rank = matches[-1]
+            next_cursor = _encode_search_cursor(last_rank, last_poll.id)
+        return RawJSONResponse(
+            PollSearchResponse.model_construct(items=responses, next_cursor=next_cursor).model_dump_json().encode()
+        )
+
+    except Exception as e:
+        raise unexpected_error("Failed to search polls", e)
+
+
+@router.get("/trending", response_model=List[TrendingPollSchema])
+async def get_trending_polls(limit: Annotated[int, Query(ge=1, le=settings.TRENDING_TOP_K)] = 20):
+    """Polls ranked by recent vote and like activity, decayed with ``TRENDING_HALF_LIFE_SECONDS``.
+
+    Served from the in-memory top-K list without touching the database.
+    """
+    return RawJSONResponse(trending_list_adapter.dump_json([
+        TrendingPollSchema.model_construct(poll_uuid=poll_uuid, title=title, score=round(score, 4))
+        for poll_uuid, title, score in trending_polls.trending(limit)
+    ]))
+
+
+async def _export_votes(engine, session_factory, poll_id: int, epoch: int, output_format: str):
+    """Yield a poll's votes as CSV (via COPY) or NDJSON (via a server-side cursor) with flat memory."""
+    async with engine.connect() as connection:
+        if output_format == "csv":
+            async for chunk in VoteCrud.copy_votes_csv(connection, poll_id, epoch):
+                yield chunk
+            return
+
+        async with session_factory(bind=connection) as session:
+            async with session.begin():
+                async for rows in VoteCrud.stream_votes_for_export(
+                    session, poll_id, epoch, settings.POLL_EXPORT_BATCH_SIZE
+                ):
+                    yield "".join(
+                        json.dumps({
+                            "option_uuid": str(row.option_uuid),
+                            "option_name": row.option_name,
+                            "voter_uuid": str(row.voter_uuid),
+                            "voted_at": row.voted_at.isoformat() if row.voted_at is not None else None,
+                        }, separators=(",", ":")) + "\n"
+                        for row in rows
+                    ).encode()
+
+
+@router.get("/{poll_uuid}/export")
+async def export_poll_votes(
+    session: AsyncReadDBSession,
+    poll_uuid: UUID,
+    current_user: ReadAuthenticatedUser,
+    user_key: UserKey,
+    format: Literal["csv", "ndjson"] = "csv",
+):
+    """Stream every current vote of the poll (option, voter uuid, timestamp). Creator only.
+
+    CSV is produced by Postgres with ``COPY ... TO STDOUT`` and NDJSON is read through a
+    server-side cursor, so neither holds the result in memory. Rows are in no particular order.
+    The ownership check's connection goes back to the pool when its transaction ends, so the
+    download holds only the connection the body is streamed from.
+    """
+    try:
+        async with session.begin():
+            existing_poll = await PollCrud.get_poll_by_uuid(session, poll_uuid)
+            if not existing_poll:
+                raise HTTPException(status_code=404, detail="Poll not found")
+
+            if existing_poll.created_by != current_user.id:
+                raise HTTPException(
+                    status_code=403,
+                    detail="You don't have permission to export this poll"
+                )
+            poll_id, epoch = existing_poll.id, existing_poll.vote_epoch
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise unexpected_error("Failed to export poll", e)
+
+    engine, session_factory = read_engine_for(user_key)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_votes(engine, session_factory, poll_id, epoch, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="poll-{poll_uuid}-votes.{format}"'},
+    )
+
+
+@router.get("/{poll_uuid}/timeline", response_model=PollTimelineResponse)
+async def get_poll_timeline(
+    session: AsyncReadDBSession,
+    poll_uuid: UUID,
+    granularity: Literal["minute", "hour"] = "hour",
+    since: Optional[datetime] = None,
+):
+    """Net votes per option per minute or hour bucket for the poll's current vote epoch.
+
+    Reads only the pre-aggregated vote rollups, never the raw votes. Defaults to the last
+    ``POLL_TIMELINE_DEFAULT_HOURS`` hours.
+    """
+    if since is None:
+        since = datetime.now(timezone.utc) - timedelta(hours=settings.POLL_TIMELINE_DEFAULT_HOURS)
+    elif since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    try:
+        async with session.begin():
+            existing_poll = await PollCrud.get_poll_by_uuid(session, poll_uuid)
+            if not existing_poll:
+                raise HTTPException(status_code=404, detail="Poll not found")
+
+            buckets = await VoteRollupCrud.get_timeline(
+                session, existing_poll.id, existing_poll.vote_epoch, granularity, since
+            )
+
+        return PollTimelineResponse(
+            poll_uuid=poll_uuid,
+            granularity=granularity,
+            since=since,
+            buckets=[TimelineBucket(bucket_start=start, votes=votes) for start, votes in buckets.items()]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise unexpected_error("Failed to fetch poll timeline", e)
+
+
+async def _render_poll(session_factory, poll_uuid: UUID) -> Optional[bytes]:
+    async with session_factory() as session:
+        async with session.begin():
+            response = await PollCrud.get_poll_response_by_uuid(session, poll_uuid)
+    return poll_response_adapter.dump_json(response) if response is not None else None
+
+
+@router.get("/{poll_uuid}", response_model=PollResponseWithVersionId)
+async def get_poll(
+    user_key: UserKey,
+    poll_uuid: UUID,
+):
+    """One poll with its options and vote summary, without fetching the whole listing."""
+    engine, session_factory = read_engine_for(user_key)
+    try:
+        body = await single_flight.do(
+            ("poll", engine, poll_uuid),
+            lambda: _render_poll(session_factory, poll_uuid),
+            coalesce=not pinned_to_primary(user_key)
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch polls: {str(e)}")
+        raise unexpected_error("Failed to fetch poll", e)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    return RawJSONResponse(body)
+
+
+async def _render_poll_summary(session_factory, poll_uuid: UUID) -> Optional[bytes]:
+    async with session_factory() as session:
+        async with session.begin():
+            summary = await VoteCrud.get_poll_summary(session, poll_uuid)
+    return poll_summary_adapter.dump_json(summary) if summary is not None else None
+
+
+@router.get("/{poll_uuid}/summary", response_model=PollSummaryResponse)
+async def get_poll_summary(
+    user_key: UserKey,
+    poll_uuid: UUID,
+):
+    """Total votes and per-option percentages and vote counts only, read with a single query.
+
+    Meant for clients that poll for results or resync after a websocket reconnect.
+    """
+    engine, session_factory = read_engine_for(user_key)
+    try:
+        body = await single_flight.do(
+            ("poll_summary", engine, poll_uuid),
+            lambda: _render_poll_summary(session_factory, poll_uuid),
+            coalesce=not pinned_to_primary(user_key)
+        )
+    except Exception as e:
+        raise unexpected_error("Failed to fetch poll summary", e)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    return RawJSONResponse(body)
 
 
 @router.delete("/{poll_uuid}/options")
@@ -300,52 +589,50 @@ async def delete_poll_options(
                     detail="You don't have permission to delete options from this poll"
                 )
             
-            # Get the option IDs that will be deleted to check if they have votes
-            options_to_delete = await PollOptionCrud.get_active_options_by_poll_id(session, existing_poll.id)
-            options_to_delete_by_uuid = {str(opt.uuid): opt.id for opt in options_to_delete}
-            option_ids_to_delete = [options_to_delete_by_uuid.get(str(uuid)) for uuid in delete_data.option_uuids if str(uuid) in options_to_delete_by_uuid]
-            option_ids_to_delete = [opt_id for opt_id in option_ids_to_delete if opt_id is not None]
+            # Map the requested UUIDs onto the active options already loaded with the poll
+            options_by_uuid = {opt.uuid: opt.id for opt in existing_poll.poll_options}
+            option_ids_to_delete = [options_by_uuid[uuid] for uuid in delete_data.option_uuids if uuid in options_by_uuid]
             
-            # Check if any of the options being deleted have votes
-            has_votes = await VoteCrud.has_votes_for_options(session, existing_poll.id, option_ids_to_delete) if option_ids_to_delete else False
+            # One grouped count tells us whether the deleted options had votes and serves the response
+            vote_counts = await VoteCrud.get_vote_counts_by_poll(session, existing_poll.id, existing_poll.vote_epoch)
+            has_votes = any(vote_counts.get(opt_id, 0) > 0 for opt_id in option_ids_to_delete)
             
             # Validate and soft delete the options
-            deleted_count = await PollOptionCrud.soft_delete_options_by_uuids_for_poll(
+            deleted_option_ids = await PollOptionCrud.soft_delete_options_by_uuids_for_poll(
                 session,
                 existing_poll.id,
                 delete_data.option_uuids
             )
             
-            if deleted_count == 0:
+            if not deleted_option_ids:
                 raise HTTPException(
                     status_code=400,
                     detail="No valid options were found to delete. Options may not belong to this poll or are already deleted."
                 )
             
+            await PollSearchCrud.index_poll(session, existing_poll.id)
+
             # Increment poll version
             existing_poll.version_id += 1
             
-            # Only delete votes if the deleted options had votes
+            # Only reset votes if the deleted options had votes
             if has_votes:
-                await VoteCrud.delete_all_votes_for_poll(session, existing_poll.id)
+                existing_poll.vote_epoch += 1
+                vote_counts = {}
             
             await session.flush()
             
-            # Expunge all objects from session to clear cache
-            session.expunge_all()
-            
-            # Get updated poll with remaining options
-            updated_poll = await PollCrud.get_poll_by_uuid(session, poll_uuid)
+            deleted_ids = set(deleted_option_ids)
+            remaining_options = [opt for opt in existing_poll.poll_options if opt.id not in deleted_ids]
             
-            # Build response data
-            response_data = await PollCrud.build_poll_response_data(session, updated_poll)
-            
-            # Get vote percentages for summary
-            total_votes, option_percentages = await VoteCrud.get_vote_percentages(
-                session, updated_poll.id, updated_poll.poll_options
+            response = PollCrud.build_poll_response(
+                existing_poll,
+                remaining_options,
+                current_user.uuid,
+                vote_counts
             )
             
-        validated_response = PollResponseWithVersionId.model_validate(response_data)
+        poll_json = poll_response_adapter.dump_json(response)
         
         # Broadcast that votes were cleared due to options being deleted (only if votes were cleared)
         if has_votes:
@@ -362,21 +649,15 @@ async def delete_poll_options(
                 }
             })
         
-        # Build broadcast data
-        broadcast_data = validated_response.model_dump(mode="json")
-        
-        await manager.broadcast({
-            "type": "poll_options_deleted",
-            "data": broadcast_data
-        })
+        await manager.broadcast_event("poll_options_deleted", poll_json)
         
-        return validated_response
+        return RawJSONResponse(poll_json)
         
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to delete options: {str(e)}")
+        raise unexpected_error("Failed to delete options", e)
 
 
 @router.delete("/{poll_uuid}")
@@ -400,7 +681,9 @@ async def delete_poll(
             
             await PollOptionCrud.soft_delete_options_by_poll_id(session, existing_poll.id)
             await PollCrud.soft_delete_poll(session, existing_poll.id)
+            await PollSearchCrud.index_poll(session, existing_poll.id)
             
+        trending_polls.forget(poll_uuid)
         await manager.broadcast({
             "type": "poll_deleted",
             "data": {"uuid": str(poll_uuid)}
@@ -412,7 +695,7 @@ async def delete_poll(
         raise
     except Exception as e:
         await session.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to delete poll: {str(e)}")
+        raise unexpected_error("Failed to delete poll", e)
 
 
 @router.post("/{poll_uuid}/like", response_model=LikeResponseSchema)
@@ -423,47 +706,38 @@ async def toggle_like(
 ):
     try:
         async with session.begin():
-            existing_poll = await PollCrud.get_poll_by_uuid(session, poll_uuid)
-            if not existing_poll:
+            poll_id = await PollCrud.get_active_poll_id_by_uuid(session, poll_uuid)
+            if poll_id is None:
                 raise HTTPException(status_code=404, detail="Poll not found")
             
-            # Get current like state before toggling
-            current_like = await LikeCrud.get_active_like(session, current_user.id, existing_poll.id)
-            was_liked = current_like is not None
-            
-            # Toggle the like
-            is_liked, like_record = await LikeCrud.toggle_like(session, current_user.id, existing_poll.id)
-            
-            # Update poll likes count
-            if was_liked and not is_liked:
-                existing_poll.likes -= 1
-            elif not was_liked and is_liked:
-                existing_poll.likes += 1
-            
-            await session.flush()
+            # Toggle the like and update the poll likes count atomically
+            is_liked, likes, title = await LikeCrud.toggle_like(session, current_user.id, poll_id)
             
             response = LikeResponseSchema(
                 poll_uuid=poll_uuid,
                 is_liked=is_liked
             )
-            
-            # Broadcast like update to all connected clients
-            await manager.broadcast({
-                "type": "poll_liked" if is_liked else "poll_unliked",
-                "data": {
-                    "poll_uuid": str(poll_uuid),
-                    "likes": existing_poll.likes,
-                    "is_liked": is_liked
-                }
-            })
-            
-            return response
+        
+        # Broadcast like update to all connected clients once the poll row lock is released
+        await manager.broadcast({
+            "type": "poll_liked" if is_liked else "poll_unliked",
+            "data": {
+                "poll_uuid": str(poll_uuid),
+                "likes": likes,
+                "is_liked": is_liked
+            }
+        })
+        likes_total.labels("like" if is_liked else "unlike").inc()
+        if is_liked:
+            # Likes are not in the rollups, so a trending rebuild must keep this contribution
+            trending_polls.record(poll_uuid, settings.TRENDING_LIKE_WEIGHT, title, rebuildable=False)
+        return response
         
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to toggle like: {str(e)}")
+        raise unexpected_error("Failed to toggle like", e)
 
 
 @router.post("/{poll_uuid}/vote", response_model=VoteResponseSchema)
@@ -492,7 +766,7 @@ async def vote_on_poll(
                     detail=f"Option {vote_data.option_uuid} not found for this poll"
                 )
             
-            await VoteCrud.upsert_vote(
+            vote, rollup_deltas = await VoteCrud.upsert_vote(
                 session,
                 current_user.id,
                 existing_poll.id,
@@ -510,6 +784,9 @@ async def vote_on_poll(
                 session, existing_poll.id, fresh_options
             )
             
+            # Last statement before commit: concurrent voters on this poll queue on the bucket rows
+            await VoteRollupCrud.record_deltas(session, existing_poll.id, vote.epoch, rollup_deltas)
+            
             summary = PollSummaryData(
                 total_votes=total_votes,
                 option_percentages=option_percentages
@@ -521,23 +798,24 @@ async def vote_on_poll(
                 option_uuid=vote_data.option_uuid,
                 summary=summary
             )
-            
-            await manager.broadcast({
-                "type": "poll_voted",
-                "data": {
-                    "poll_uuid": str(poll_uuid),
+        
+        await manager.broadcast({
+            "type": "poll_voted",
+            "data": {
+                "poll_uuid": str(poll_uuid),
+                "total_votes": total_votes,
+                "summary": {
                     "total_votes": total_votes,
-                    "summary": {
-                        "total_votes": total_votes,
-                        "option_percentages": option_percentages
-                    }
+                    "option_percentages": option_percentages
                 }
-            })
-            
-            return response
+            }
+        })
+        votes_total.inc()
+        trending_polls.record(poll_uuid, settings.TRENDING_VOTE_WEIGHT, existing_poll.title)
+        return response
         
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to record vote: {str(e)}")
+        raise unexpected_error("Failed to record vote", e)
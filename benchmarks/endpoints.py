@@ -0,0 +1,276 @@
+"""Drive every poll and auth endpoint through an in-process ASGI client.
+
+Run ``benchmarks.seed`` first. Each scenario sends ``--requests`` requests with
+``--concurrency`` in flight and records latency percentiles, throughput and SQL queries per
+request (counted with ``core.query_profiler``). Results are written as JSON tagged with the
+current git commit, and ``--compare`` prints the change against an earlier result file.
+
+Usage:
+    python -m benchmarks.endpoints --requests 500 --concurrency 20
+    python -m benchmarks.endpoints --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.seed import BENCH_PASSWORD, VOCABULARY, bench_email
+from core.query_profiler import count_queries
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Bench:
+    def __init__(self, client: httpx.AsyncClient, requests: int, concurrency: int, rng: random.Random):
+        self.client = client
+        self.requests = requests
+        self.concurrency = concurrency
+        self.rng = rng
+        self.tokens: List[Dict[str, str]] = []
+        self.targets: List[dict] = []
+        self.own_polls: List[dict] = []
+        self.added_options: Dict[str, List[str]] = {}
+
+    def headers(self, index: int) -> Dict[str, str]:
+        return self.tokens[index % len(self.tokens)]
+
+    async def setup(self, seeded_users: int):
+        from core.async_engine import AsyncSessionLocal
+
+        for index in range(self.concurrency):
+            user = self.rng.randrange(seeded_users)
+            response = await self.client.post("/auth/login", json={"email": bench_email(user), "password": BENCH_PASSWORD})
+            response.raise_for_status()
+            self.tokens.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(text(
+                "SELECT p.uuid, array_agg(o.uuid) AS options FROM poll p "
+                "JOIN poll_options o ON o.poll_id = p.id AND o.is_active "
+                "WHERE p.is_active GROUP BY p.id ORDER BY random() LIMIT 1000"
+            ))
+            self.targets = [{"uuid": str(row.uuid), "options": [str(o) for o in row.options]} for row in result]
+        if not self.targets:
+            raise RuntimeError("No polls found; run `python -m benchmarks.seed` first")
+
+    async def run(self, name: str, call: Callable[[int], Awaitable[httpx.Response]]) -> dict:
+        latencies: List[float] = []
+        errors = 0
+        gate = asyncio.Semaphore(self.concurrency)
+
+        async def one(index: int):
+            nonlocal errors
+            async with gate:
+                started = time.perf_counter()
+                response = await call(index)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+
+        with count_queries() as stats:
+            started = time.perf_counter()
+            await asyncio.gather(*(one(index) for index in range(self.requests)))
+            elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        result = {
+            "endpoint": name,
+            "requests": self.requests,
+            "errors": errors,
+            "throughput_rps": round(self.requests / elapsed, 1) if elapsed else None,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50) * 1000, 3),
+                "p95": round(percentile(latencies, 95) * 1000, 3),
+                "p99": round(percentile(latencies, 99) * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+            "queries_per_request": round(stats.count / self.requests, 2),
+            "db_ms_per_request": round(stats.seconds / self.requests * 1000, 3),
+        }
+        print(f"{name}: {result['throughput_rps']} req/s, p95 {result['latency_ms']['p95']}ms, "
+              f"{result['queries_per_request']} queries/request, {errors} errors")
+        return result
+
+    def target(self, index: int) -> dict:
+        return self.targets[index % len(self.targets)]
+
+    async def create_poll(self, index: int) -> httpx.Response:
+        response = await self.client.post(
+            "/poll/",
+            headers=self.headers(0),
+            json={"title": f"bench {uuid.uuid4().hex[:8]}", "options": [{"option_name": "a"}, {"option_name": "b"}]},
+        )
+        if response.status_code == 200:
+            self.own_polls.append(response.json())
+        return response
+
+    async def edit_poll(self, index: int) -> httpx.Response:
+        poll = self.own_polls[index % len(self.own_polls)]
+        response = await self.client.put(
+            f"/poll/{poll['uuid']}",
+            headers=self.headers(0),
+            json={"title": f"edited {index}", "version_id": poll["version_id"]},
+        )
+        if response.status_code == 200:
+            poll.update(response.json())
+        return response
+
+    async def add_options(self, index: int) -> httpx.Response:
+        poll = self.own_polls[index % len(self.own_polls)]
+        response = await self.client.post(
+            f"/poll/{poll['uuid']}/options", headers=self.headers(0), json={"options": [{"option_name": f"extra {index}"}]}
+        )
+        if response.status_code == 200:
+            known = {option["uuid"] for option in poll["options"]}
+            body = response.json()
+            self.added_options.setdefault(poll["uuid"], []).extend(
+                option["uuid"] for option in body["options"] if option["uuid"] not in known
+            )
+            poll.update(body)
+        return response
+
+    async def delete_options(self, index: int) -> httpx.Response:
+        poll = self.own_polls[index % len(self.own_polls)]
+        added = self.added_options.get(poll["uuid"]) or []
+        option_uuids = [added.pop()] if added else [poll["options"][-1]["uuid"]]
+        return await self.client.request(
+            "DELETE", f"/poll/{poll['uuid']}/options", headers=self.headers(0), json={"option_uuids": option_uuids}
+        )
+
+    async def delete_poll(self, index: int) -> httpx.Response:
+        poll = self.own_polls[index % len(self.own_polls)]
+        return await self.client.delete(f"/poll/{poll['uuid']}", headers=self.headers(0))
+
+    async def vote(self, index: int) -> httpx.Response:
+        poll = self.target(self.rng.randrange(len(self.targets)))
+        return await self.client.post(
+            f"/poll/{poll['uuid']}/vote",
+            headers=self.headers(index),
+            json={"option_uuid": self.rng.choice(poll["options"])},
+        )
+
+    async def like(self, index: int) -> httpx.Response:
+        poll = self.target(self.rng.randrange(len(self.targets)))
+        return await self.client.post(f"/poll/{poll['uuid']}/like", headers=self.headers(index))
+
+    async def register(self, index: int) -> httpx.Response:
+        return await self.client.post(
+            "/auth/register",
+            json={"name": "bench", "email": f"bench-new-{uuid.uuid4().hex[:16]}@example.com", "password": BENCH_PASSWORD},
+        )
+
+    async def login(self, index: int) -> httpx.Response:
+        return await self.client.post("/auth/login", json={"email": bench_email(index), "password": BENCH_PASSWORD})
+
+    async def me(self, index: int) -> httpx.Response:
+        return await self.client.get("/auth/me", headers=self.headers(index))
+
+    async def search(self, index: int) -> httpx.Response:
+        return await self.client.get("/poll/search", params={"q": self.rng.choice(VOCABULARY)})
+
+    async def list_polls(self, index: int) -> httpx.Response:
+        return await self.client.get("/poll/")
+
+
+async def run_suite(requests: int, concurrency: int, seeded_users: int, list_requests: int, seed: int) -> dict:
+    from main import app
+    from core.async_engine import async_engine
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        bench = Bench(client, requests, concurrency, random.Random(seed))
+        await bench.setup(seeded_users)
+
+        results = [
+            await bench.run("POST /auth/register", bench.register),
+            await bench.run("POST /auth/login", bench.login),
+            await bench.run("GET /auth/me", bench.me),
+            await bench.run("POST /poll/", bench.create_poll),
+            await bench.run("PUT /poll/{poll_uuid}", bench.edit_poll),
+            await bench.run("POST /poll/{poll_uuid}/options", bench.add_options),
+            await bench.run("DELETE /poll/{poll_uuid}/options", bench.delete_options),
+            await bench.run("POST /poll/{poll_uuid}/vote", bench.vote),
+            await bench.run("POST /poll/{poll_uuid}/like", bench.like),
+            await bench.run("DELETE /poll/{poll_uuid}", bench.delete_poll),
+            await bench.run("GET /poll/search", bench.search),
+        ]
+        # Lists every active poll, so it gets its own (smaller) request count
+        bench.requests = list_requests
+        results.append(await bench.run("GET /poll/", bench.list_polls))
+
+    await async_engine.dispose()
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "requests": requests,
+        "concurrency": concurrency,
+        "results": results,
+    }
+
+
+def compare(current: dict, previous: dict) -> None:
+    before = {result["endpoint"]: result for result in previous["results"]}
+    print(f"\nCompared with {previous.get('commit')} ({previous.get('timestamp')}):")
+    for result in current["results"]:
+        old = before.get(result["endpoint"])
+        if old is None:
+            continue
+        p95_change = (result["latency_ms"]["p95"] / old["latency_ms"]["p95"] - 1) * 100 if old["latency_ms"]["p95"] else 0.0
+        print(
+            f"  {result['endpoint']:<36} p95 {old['latency_ms']['p95']:>9.2f} -> {result['latency_ms']['p95']:>9.2f}ms "
+            f"({p95_change:+.1f}%), queries {old['queries_per_request']} -> {result['queries_per_request']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Endpoint benchmark suite")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--list-requests", type=int, default=20, help="Requests for GET /poll/")
+    parser.add_argument("--seeded-users", type=int, default=100_000, help="--users given to benchmarks.seed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Defaults to benchmarks/results/<commit>-<time>.json")
+    parser.add_argument("--compare", default=None, help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_suite(args.requests, args.concurrency, args.seeded_users, args.list_requests, args.seed))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{report['commit'] or 'unknown'}-{stamp}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
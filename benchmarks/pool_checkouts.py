@@ -0,0 +1,81 @@
+"""Pool checkouts per request under concurrency.
+
+Fires concurrent authenticated requests at a running server and compares the
+``checkouts`` counter of ``/health/pool`` before and after, so a regression
+back to more than one pooled connection per request shows up directly.
+Background jobs and the replica pool are not counted; run against a quiet
+server with jobs disabled.
+
+Usage:
+    python -m benchmarks.pool_checkouts --url http://127.0.0.1:8000 --requests 500 --concurrency 100
+"""
+import argparse
+import asyncio
+import json
+import uuid
+
+import httpx
+
+
+async def _authenticate(client: httpx.AsyncClient) -> str:
+    email = f"pooltest-{uuid.uuid4().hex[:12]}@example.com"
+    password = "pooltest-password"
+    response = await client.post("/auth/register", json={"name": "pooltest", "email": email, "password": password})
+    response.raise_for_status()
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(url: str, requests: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        token = await _authenticate(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        response = await client.post(
+            "/poll/",
+            headers=headers,
+            json={"title": "pool checkouts", "options": [{"option_name": "a"}, {"option_name": "b"}]},
+        )
+        response.raise_for_status()
+        poll_uuid = response.json()["uuid"]
+
+        before = (await client.get("/health/pool")).json()
+        gate = asyncio.Semaphore(concurrency)
+        statuses = []
+
+        async def like():
+            async with gate:
+                response = await client.post(f"/poll/{poll_uuid}/like", headers=headers)
+                statuses.append(response.status_code)
+
+        await asyncio.gather(*(like() for _ in range(requests)))
+        after = (await client.get("/health/pool")).json()
+
+    checkouts = after["checkouts"] - before["checkouts"]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "ok": sum(1 for status in statuses if status == 200),
+        "checkouts": checkouts,
+        "checkouts_per_request": round(checkouts / requests, 3),
+        "timeouts": after["timeouts"] - before["timeouts"],
+        "peak_checkout_wait_ms": after["checkout_wait_ms"]["max"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pool checkouts per request")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.url, args.requests, args.concurrency))
+    print(json.dumps(report, indent=2))
+    if report["checkouts_per_request"] > 1:
+        raise SystemExit("More than one pooled connection checked out per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Per-query CPU cost of building statements on every call versus pre-built statements.
+
+For each hot CRUD query this compares the statement as it used to be written
+(constructed inside the CRUD method on every call) with the module-level
+pre-built statement now used by ``crud/*.py``. Both go through SQLAlchemy's
+compiled cache exactly like ``Connection.execute`` does, so the difference is
+statement construction plus cache key generation.
+
+Usage:
+    python -m benchmarks.query_cache --iterations 20000
+    python -m benchmarks.query_cache --database --iterations 2000
+
+``--database`` additionally executes the read queries against the configured
+Postgres and reports CPU time per execution in this process (with server-side
+prepares as configured by ``POSTGRES_PREPARE_THRESHOLD``).
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Callable, Dict, List, Tuple
+from uuid import uuid4
+
+from sqlalchemy import select, insert, update, delete, func, case, not_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.postgresql.psycopg import PGDialectAsync_psycopg
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.util import LRUCache
+
+from crud import like_crud, poll_crud, poll_option_crud, user_crud, vote_crud
+from models import Like, Poll, PollOptions, UserModel, Vote
+
+
+def _current_epoch(poll_id):
+    return select(Poll.vote_epoch).where(Poll.id == poll_id).scalar_subquery()
+
+
+def _toggle_like(params):
+    toggled = (
+        pg_insert(Like)
+        .values(user_id=params["user_id"], poll_id=params["poll_id"], is_active=True)
+        .on_conflict_do_update(constraint="uq_likes_poll_user", set_={"is_active": not_(Like.is_active)})
+        .returning(Like.poll_id, Like.is_active)
+        .cte("toggled")
+    )
+    return (
+        update(Poll)
+        .where(Poll.id == toggled.c.poll_id)
+        .values(likes=Poll.likes + case((toggled.c.is_active, 1), else_=-1))
+        .returning(toggled.c.is_active, Poll.likes, Poll.title)
+        .add_cte(toggled)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# name -> (statement as built per call, pre-built statement, params, read-only)
+CASES: Dict[str, Tuple[Callable[[dict], object], object, dict, bool]] = {
+    "poll_by_uuid": (
+        lambda p: select(Poll)
+        .outerjoin(PollOptions, (Poll.id == PollOptions.poll_id) & (PollOptions.is_active == True))
+        .where(Poll.uuid == p["poll_uuid"], Poll.is_active == True)
+        .options(contains_eager(Poll.poll_options)),
+        poll_crud._SELECT_POLL_BY_UUID,
+        {"poll_uuid": uuid4()},
+        True,
+    ),
+    "active_poll_id_by_uuid": (
+        lambda p: select(Poll.id).where(Poll.uuid == p["poll_uuid"], Poll.is_active == True),
+        poll_crud._SELECT_ACTIVE_POLL_ID_BY_UUID,
+        {"poll_uuid": uuid4()},
+        True,
+    ),
+    "active_option_by_uuid_and_poll_id": (
+        lambda p: select(PollOptions).where(
+            PollOptions.uuid == p["option_uuid"], PollOptions.poll_id == p["poll_id"], PollOptions.is_active == True
+        ),
+        poll_option_crud._SELECT_ACTIVE_OPTION_BY_UUID_AND_POLL_ID,
+        {"option_uuid": uuid4(), "poll_id": 1},
+        True,
+    ),
+    "current_epoch_vote_counts": (
+        lambda p: select(Vote.option_id, func.count(Vote.option_id).label("count"))
+        .where(Vote.poll_id == p["poll_id"], Vote.epoch == _current_epoch(p["poll_id"]))
+        .group_by(Vote.option_id),
+        vote_crud._SELECT_CURRENT_EPOCH_VOTE_COUNTS,
+        {"poll_id": 1},
+        True,
+    ),
+    "user_by_uuid": (
+        lambda p: select(UserModel).where(UserModel.uuid == p["user_uuid"]),
+        user_crud._SELECT_USER_BY_UUID,
+        {"user_uuid": uuid4()},
+        True,
+    ),
+    "insert_vote": (
+        lambda p: insert(Vote).values(
+            user_id=p["user_id"], poll_id=p["poll_id"], option_id=p["option_id"], epoch=_current_epoch(p["poll_id"])
+        ).returning(Vote),
+        vote_crud._INSERT_VOTE,
+        {"user_id": 1, "poll_id": 1, "option_id": 1},
+        False,
+    ),
+    "delete_user_vote": (
+        lambda p: delete(Vote)
+        .where(Vote.user_id == p["user_id"], Vote.poll_id == p["poll_id"])
+        .returning(Vote.option_id, Vote.epoch),
+        vote_crud._DELETE_USER_VOTE,
+        {"user_id": 1, "poll_id": 1},
+        False,
+    ),
+    "toggle_like": (_toggle_like, like_crud._TOGGLE_LIKE, {"user_id": 1, "poll_id": 1}, False),
+}
+
+
+def _compile(stmt, dialect, cache) -> None:
+    # The same entry point Connection._execute_clauseelement uses
+    stmt._compile_w_cache(
+        dialect, compiled_cache=cache, column_keys=[], for_executemany=False, schema_translate_map=None
+    )
+
+
+def _cpu_per_call(fn: Callable[[], None], iterations: int) -> float:
+    fn()
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1_000_000
+
+
+def run_offline(iterations: int) -> List[dict]:
+    dialect = PGDialectAsync_psycopg()
+    results = []
+    for name, (build, prebuilt_stmt, params, _) in CASES.items():
+        cache = LRUCache(100)
+        before = _cpu_per_call(lambda: _compile(build(params), dialect, cache), iterations)
+        after = _cpu_per_call(lambda: _compile(prebuilt_stmt, dialect, cache), iterations)
+        results.append({
+            "query": name,
+            "build_per_call_us": round(before, 2),
+            "prebuilt_us": round(after, 2),
+            "speedup": round(before / after, 1) if after else None,
+        })
+    return results
+
+
+async def run_database(iterations: int) -> List[dict]:
+    from core.async_engine import AsyncSessionLocal, async_engine
+
+    results = []
+    async with AsyncSessionLocal() as session:
+        for name, (build, prebuilt_stmt, params, read_only) in CASES.items():
+            if not read_only:
+                continue
+
+            async def timed(make_call) -> float:
+                await make_call()
+                started = time.process_time()
+                for _ in range(iterations):
+                    await make_call()
+                return (time.process_time() - started) / iterations * 1_000_000
+
+            before = await timed(lambda: session.execute(build(params)))
+            after = await timed(lambda: session.execute(prebuilt_stmt, params))
+            results.append({
+                "query": name,
+                "build_per_call_us": round(before, 2),
+                "prebuilt_us": round(after, 2),
+            })
+        await session.rollback()
+    await async_engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compiled query cache benchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--database", action="store_true", help="Also execute read queries against Postgres")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {"offline_cpu_per_call": run_offline(args.iterations)}
+    if args.database:
+        report["database_cpu_per_execute"] = asyncio.run(run_database(max(args.iterations // 10, 1)))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
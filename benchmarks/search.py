@@ -0,0 +1,108 @@
+"""Latency of ``PollCrud.search_active_polls`` against a seeded database.
+
+Seed a large data set first (``python -m benchmarks.seed --polls 1000000 --truncate``). Queries
+are one or two words from the seed vocabulary. The first query's plan is printed to confirm
+ranking is an index-only scan of ``ix_poll_search_terms_term``; heap fetches there mean the
+table needs a VACUUM to set its visibility map.
+
+Usage:
+    python -m benchmarks.search --queries 500 --limit 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+import psycopg
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+
+from benchmarks.endpoints import percentile
+from benchmarks.seed import VOCABULARY, conninfo
+from core.async_engine import AsyncSessionLocal, async_engine
+from crud.poll_crud import poll_crud
+from models import Poll
+
+
+def make_queries(count: int, rng: random.Random) -> List[str]:
+    queries = []
+    for index in range(count):
+        word = rng.choice(VOCABULARY)
+        if index % 2:
+            word = f"{word} {rng.choice(VOCABULARY)}"
+        queries.append(word)
+    return queries
+
+
+class _StatementCapture:
+    """Stands in for a session to capture the statement the search would run."""
+
+    stmt = None
+
+    async def execute(self, stmt):
+        self.stmt = stmt
+        return []
+
+
+async def print_plan(term: str, limit: int):
+    capture = _StatementCapture()
+    await poll_crud.search_active_polls(capture, term, limit)
+    compiled = capture.stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    # Without parameters psycopg sends the text as-is, so undo the driver's percent escaping
+    sql = str(compiled).replace("%%", "%")
+    async with await psycopg.AsyncConnection.connect(conninfo()) as conn:
+        cursor = await conn.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+        print("\n".join(row[0] for row in await cursor.fetchall()))
+
+
+async def run(queries: int, limit: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    terms = make_queries(queries, rng)
+    latencies: List[float] = []
+    results = 0
+
+    async with AsyncSessionLocal() as session:
+        polls = await session.scalar(select(func.count()).select_from(Poll).where(Poll.is_active == True))
+
+        await print_plan(terms[0], limit)
+
+        # Warm the caches and the compiled statement before timing
+        for term in terms[:10]:
+            await poll_crud.search_active_polls(session, term, limit)
+
+        for term in terms:
+            started = time.perf_counter()
+            matches = await poll_crud.search_active_polls(session, term, limit)
+            latencies.append(time.perf_counter() - started)
+            results += len(matches)
+
+    await async_engine.dispose()
+    latencies.sort()
+    return {
+        "active_polls": polls,
+        "queries": queries,
+        "limit": limit,
+        "avg_results": round(results / queries, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Poll search benchmark")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.queries, args.limit, args.seed)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
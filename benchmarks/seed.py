@@ -0,0 +1,214 @@
+"""Seed a local Postgres with synthetic users, polls, options, votes and likes using COPY.
+
+Rows are streamed with ``COPY ... FROM STDIN`` straight from generators, so memory stays
+flat at any scale. Ids are reserved up front from the shared ``id_seq`` sequence and uuids
+come from the server defaults. Generation is deterministic for a given ``--seed``, so two
+runs at the same scale produce the same data set.
+
+Every seeded user can log in as ``bench-user-<n>@example.com`` with the password
+``bench-password``, which ``benchmarks.endpoints`` relies on.
+
+Usage:
+    python -m benchmarks.seed --users 100000 --polls 50000 --votes 10000000 --truncate
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Iterator, Sequence, Tuple
+
+import psycopg
+
+from core.async_engine import AsyncSessionLocal, async_engine
+from core.auth import get_password_hash
+from core.settings import settings
+from crud.poll_search_crud import poll_search_crud as PollSearchCrud
+
+BENCH_PASSWORD = "bench-password"
+SEEDED_TABLES = ("poll_search_terms", "likes", "votes", "poll_options", "poll", "users")
+SYLLABLES = tuple(c + v for c in "bcdfghklmnprstvz" for v in "aeiou")
+
+
+def make_vocabulary(size: int = 20_000, seed_value: int = 7) -> Tuple[str, ...]:
+    """Pronounceable pseudo-words for titles and option names, the same for every ``--seed``.
+
+    A large vocabulary keeps each word rare, like real poll text, so search benchmarks measure
+    selective lookups rather than matching a large share of all polls.
+    """
+    rng = random.Random(seed_value)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return tuple(sorted(words))
+
+
+VOCABULARY = make_vocabulary()
+
+
+def bench_email(index: int) -> str:
+    return f"bench-user-{index}@example.com"
+
+
+def _phrase(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def conninfo() -> str:
+    return settings.SQLALCHEMY_DATABASE_URI.replace("postgresql+psycopg://", "postgresql://", 1)
+
+
+async def _reserve_ids(conn: psycopg.AsyncConnection, count: int) -> int:
+    """Advance ``id_seq`` past ``count`` ids and return the first one."""
+    cursor = await conn.execute(
+        "SELECT setval('id_seq', nextval('id_seq') + %s - 1) - %s + 1", (count, count)
+    )
+    return (await cursor.fetchone())[0]
+
+
+async def _copy(conn: psycopg.AsyncConnection, table: str, columns: Sequence[str], rows: Iterator[Tuple]) -> int:
+    started = time.perf_counter()
+    written = 0
+    async with conn.cursor() as cursor:
+        async with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                await copy.write_row(row)
+                written += 1
+    elapsed = time.perf_counter() - started
+    print(f"{table}: {written} rows in {elapsed:.1f}s ({written / elapsed if elapsed else 0:.0f} rows/s)")
+    return written
+
+
+def _votes_per_poll(votes: int, polls: int, users: int, poll_index: int) -> int:
+    per_poll = votes // polls + (1 if poll_index < votes % polls else 0)
+    # A user votes at most once per poll
+    return min(per_poll, users)
+
+
+async def seed(
+    users: int,
+    polls: int,
+    options_per_poll: int,
+    votes: int,
+    likes: int,
+    seed_value: int,
+    truncate: bool,
+) -> dict:
+    rng = random.Random(seed_value)
+    started = time.perf_counter()
+    # One bcrypt hash shared by every user keeps seeding fast and logins realistic
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+
+    async with await psycopg.AsyncConnection.connect(conninfo()) as conn:
+        if truncate:
+            await conn.execute(f"TRUNCATE {', '.join(SEEDED_TABLES)} CASCADE")
+
+        first_user_id = await _reserve_ids(conn, users)
+        first_poll_id = await _reserve_ids(conn, polls)
+        first_option_id = await _reserve_ids(conn, polls * options_per_poll)
+        first_vote_id = await _reserve_ids(conn, max(votes, 1))
+        first_like_id = await _reserve_ids(conn, max(likes, 1))
+
+        likes_per_poll = [min(likes // polls + (1 if i < likes % polls else 0), users) for i in range(polls)]
+        # Each poll's voters and likers are a contiguous window of users starting at a random offset
+        user_offsets = [rng.randrange(users) for _ in range(polls)]
+
+        await _copy(
+            conn, "users", ("id", "name", "email", "hashed_password"),
+            ((first_user_id + i, f"bench {i}", bench_email(i), hashed_password) for i in range(users)),
+        )
+        await _copy(
+            conn, "poll", ("id", "title", "created_by", "likes", "version_id", "vote_epoch", "is_active"),
+            (
+                (
+                    first_poll_id + p, f"{_phrase(rng, 3)} {p}", first_user_id + rng.randrange(users),
+                    likes_per_poll[p], 1, 1, True,
+                )
+                for p in range(polls)
+            ),
+        )
+        await _copy(
+            conn, "poll_options", ("id", "poll_id", "option_name", "votes", "version_id", "is_active"),
+            (
+                (first_option_id + p * options_per_poll + o, first_poll_id + p, _phrase(rng, 2), 0, 1, True)
+                for p in range(polls)
+                for o in range(options_per_poll)
+            ),
+        )
+
+        def vote_rows():
+            vote_id = first_vote_id
+            for p in range(polls):
+                for n in range(_votes_per_poll(votes, polls, users, p)):
+                    option = rng.randrange(options_per_poll)
+                    yield (
+                        vote_id,
+                        first_user_id + (user_offsets[p] + n) % users,
+                        first_poll_id + p,
+                        first_option_id + p * options_per_poll + option,
+                        1,
+                    )
+                    vote_id += 1
+
+        seeded_votes = await _copy(conn, "votes", ("id", "user_id", "poll_id", "option_id", "epoch"), vote_rows())
+
+        def like_rows():
+            like_id = first_like_id
+            for p in range(polls):
+                for n in range(likes_per_poll[p]):
+                    yield (like_id, first_poll_id + p, first_user_id + (user_offsets[p] + n) % users, True)
+                    like_id += 1
+
+        seeded_likes = await _copy(conn, "likes", ("id", "poll_id", "user_id", "is_active"), like_rows())
+
+        await conn.commit()
+
+    # COPY bypasses the API, which maintains the search terms, so they are built for every poll at once
+    started_terms = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await PollSearchCrud.index_all_polls(session)
+    await async_engine.dispose()
+    print(f"poll_search_terms: built in {time.perf_counter() - started_terms:.1f}s")
+
+    async with await psycopg.AsyncConnection.connect(conninfo(), autocommit=True) as conn:
+        for table in SEEDED_TABLES:
+            # VACUUM sets the visibility map, which index-only scans (search) rely on
+            await conn.execute(f"VACUUM ANALYZE {table}")
+
+    return {
+        "users": users,
+        "polls": polls,
+        "options": polls * options_per_poll,
+        "votes": seeded_votes,
+        "likes": seeded_likes,
+        "seed": seed_value,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed Postgres for benchmarks using COPY")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--polls", type=int, default=50_000)
+    parser.add_argument("--options-per-poll", type=int, default=4)
+    parser.add_argument("--votes", type=int, default=10_000_000)
+    parser.add_argument("--likes", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="Empty the app tables before seeding")
+    args = parser.parse_args()
+
+    report = asyncio.run(seed(
+        users=args.users,
+        polls=args.polls,
+        options_per_poll=args.options_per_poll,
+        votes=args.votes,
+        likes=args.likes,
+        seed_value=args.seed,
+        truncate=args.truncate,
+    ))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
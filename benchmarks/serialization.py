@@ -0,0 +1,99 @@
+"""CPU per poll rendered: the old validate/dump chain versus the single-pass serializer.
+
+The old path converted every option with ``PollOptionSchema.model_validate(...).model_dump``,
+validated the whole dict into ``PollResponseWithVersionId``, let FastAPI validate and encode
+it again through ``response_model`` and dumped it once more for the websocket broadcast,
+which ``send_json`` then encoded per connection. The new path constructs the models without
+validation, encodes them once and reuses the bytes for the response and every connection.
+
+Usage:
+    python -m benchmarks.serialization --options 4 --connections 100
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from crud.poll_crud import poll_crud
+from crud.vote_crud import vote_crud
+from schemas.poll_schema import PollOptionSchema, PollResponseWithVersionId, poll_response_adapter
+
+
+def make_poll(options: int):
+    now = datetime.utcnow()
+    poll_options = [
+        SimpleNamespace(id=i, uuid=uuid.uuid4(), option_name=f"option {i}", votes=0, version_id=1, created_at=now)
+        for i in range(options)
+    ]
+    poll = SimpleNamespace(uuid=uuid.uuid4(), title="benchmark poll", likes=3, created_at=now, version_id=2)
+    vote_counts = {opt.id: (opt.id + 1) * 7 for opt in poll_options}
+    return poll, poll_options, vote_counts
+
+
+def render_old(poll, poll_options, vote_counts, creator_uuid, connections: int):
+    options_list = []
+    for opt in sorted(poll_options, key=lambda o: o.id):
+        option_data = PollOptionSchema.model_validate(opt).model_dump(mode="json")
+        option_data["votes"] = vote_counts.get(opt.id, 0)
+        options_list.append(option_data)
+    total_votes, option_percentages = vote_crud.calculate_vote_percentages(vote_counts, poll_options)
+    response_dict = {
+        "uuid": poll.uuid, "title": poll.title, "likes": poll.likes, "created_at": poll.created_at,
+        "version_id": poll.version_id, "created_by_uuid": creator_uuid, "options": options_list,
+        "summary": {"total_votes": total_votes, "option_percentages": option_percentages},
+    }
+    validated = PollResponseWithVersionId.model_validate(response_dict)
+    # Broadcast: dumped once, then encoded by send_json for every connection
+    message = {"type": "poll_updated", "data": validated.model_dump(mode="json")}
+    for _ in range(connections):
+        json.dumps(message, separators=(",", ":"))
+    # FastAPI response_model: validate the returned model again, jsonable_encoder, then JSONResponse
+    revalidated = PollResponseWithVersionId.model_validate(validated.model_dump())
+    json.dumps(jsonable_encoder(revalidated.model_dump(mode="json")), separators=(",", ":")).encode()
+
+
+def render_new(poll, poll_options, vote_counts, creator_uuid, connections: int):
+    response = poll_crud.build_poll_response(poll, poll_options, creator_uuid, vote_counts)
+    poll_json = poll_response_adapter.dump_json(response)
+    # Broadcast text is built once and sent as-is to every connection
+    f'{{"type":"poll_updated","data":{poll_json.decode()}}}'
+
+
+def cpu_per_call_us(fn, iterations: int) -> float:
+    fn()
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Poll serialization benchmark")
+    parser.add_argument("--options", type=int, default=4)
+    parser.add_argument("--connections", type=int, default=100, help="Websocket clients receiving the broadcast")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    poll, poll_options, vote_counts = make_poll(args.options)
+    creator_uuid = uuid.uuid4()
+    before = cpu_per_call_us(
+        lambda: render_old(poll, poll_options, vote_counts, creator_uuid, args.connections), args.iterations
+    )
+    after = cpu_per_call_us(
+        lambda: render_new(poll, poll_options, vote_counts, creator_uuid, args.connections), args.iterations
+    )
+    print(json.dumps({
+        "options": args.options,
+        "connections": args.connections,
+        "old_cpu_us_per_poll": round(before, 2),
+        "new_cpu_us_per_poll": round(after, 2),
+        "speedup": round(before / after, 1) if after else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Websocket fan-out load harness.
+
+Opens N websocket clients against ``/ws``, drives create/vote/like traffic
+through the REST endpoints and reports how long each broadcast takes to reach
+every client, together with server memory per connection and CPU usage.
+
+Usage:
+    python -m benchmarks.ws_fanout --clients 10000 --events 50
+    python -m benchmarks.ws_fanout --url http://127.0.0.1:8000 --server-pid 1234 --clients 50000
+
+Without ``--url`` the harness starts ``uvicorn main:app`` on localhost using the
+regular settings (so ``DATABASE_URL``/``POSTGRES_*`` must point at a local
+Postgres). Clients are spread over several worker processes and over the
+127.0.0.0/8 loopback range so a single box can hold more than the ~28k
+ephemeral ports available per source address. For 100k clients raise
+``ulimit -n`` for both the harness and the server first.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import uuid
+from array import array
+from typing import List, Optional
+
+import httpx
+import websockets
+
+BROADCAST_TYPES = {"poll_created", "poll_voted", "poll_liked", "poll_unliked"}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def read_rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def read_cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 of /proc/<pid>/stat (index 11/12 after the comm field)
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def _run_clients(ws_url: str, count: int, worker_index: int, source_addresses: int, conn) -> None:
+    arrivals: List[array] = []
+    sockets = []
+    connect_limit = asyncio.Semaphore(500)
+
+    async def reader(websocket, received: array):
+        try:
+            async for raw in websocket:
+                now = time.monotonic()
+                if json.loads(raw).get("type") in BROADCAST_TYPES:
+                    received.append(now)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def open_client(index: int):
+        # Spread clients over 127.0.0.x so each source address stays under the ephemeral port limit
+        local_host = f"127.0.{worker_index % 256}.{index % source_addresses + 1}"
+        async with connect_limit:
+            try:
+                websocket = await websockets.connect(
+                    ws_url,
+                    local_addr=(local_host, 0),
+                    ping_interval=None,
+                    max_size=None,
+                    open_timeout=60,
+                )
+            except Exception:
+                return
+        received = array("d")
+        arrivals.append(received)
+        sockets.append(websocket)
+        asyncio.create_task(reader(websocket, received))
+
+    await asyncio.gather(*(open_client(i) for i in range(count)))
+
+    loop = asyncio.get_running_loop()
+    conn.send(len(sockets))
+
+    # Wait until the driver asks for results
+    await loop.run_in_executor(None, conn.recv)
+    for websocket in sockets:
+        await websocket.close()
+    conn.send([received.tobytes() for received in arrivals])
+
+
+def _client_worker(ws_url: str, count: int, worker_index: int, source_addresses: int, conn) -> None:
+    asyncio.run(_run_clients(ws_url, count, worker_index, source_addresses, conn))
+
+
+async def _authenticate(client: httpx.AsyncClient) -> str:
+    email = f"loadtest-{uuid.uuid4().hex[:12]}@example.com"
+    password = "loadtest-password"
+    response = await client.post("/auth/register", json={"name": "loadtest", "email": email, "password": password})
+    response.raise_for_status()
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def _drive_events(base_url: str, events: int, interval: float) -> List[dict]:
+    """Fire create/vote/like requests one at a time and record when each was sent."""
+    sent = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        token = await _authenticate(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        poll = None
+
+        for index in range(events):
+            kind = ("create", "vote", "like")[index % 3]
+            started = time.monotonic()
+            if kind == "create" or poll is None:
+                kind = "create"
+                response = await client.post(
+                    "/poll/",
+                    headers=headers,
+                    json={"title": f"load {index}", "options": [{"option_name": "a"}, {"option_name": "b"}]},
+                )
+                response.raise_for_status()
+                poll = response.json()
+            elif kind == "vote":
+                option = poll["options"][index % len(poll["options"])]
+                response = await client.post(
+                    f"/poll/{poll['uuid']}/vote", headers=headers, json={"option_uuid": option["uuid"]}
+                )
+                response.raise_for_status()
+            else:
+                response = await client.post(f"/poll/{poll['uuid']}/like", headers=headers)
+                response.raise_for_status()
+
+            sent.append({"kind": kind, "sent_at": started, "response_seconds": time.monotonic() - started})
+            await asyncio.sleep(interval)
+    return sent
+
+
+def _wait_for_server(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become healthy within {timeout}s")
+
+
+def run(
+    clients: int,
+    events: int,
+    workers: int,
+    interval: float,
+    url: Optional[str],
+    server_pid: Optional[int],
+    source_addresses: int,
+) -> dict:
+    server = None
+    if url is None:
+        port = 8765
+        url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning", "--backlog", "65535"],
+        )
+        server_pid = server.pid
+
+    try:
+        _wait_for_server(url)
+        ws_url = url.replace("http", "ws", 1) + "/ws"
+
+        rss_before = read_rss_bytes(server_pid) if server_pid else 0
+
+        pipes = []
+        processes = []
+        per_worker = [clients // workers + (1 if i < clients % workers else 0) for i in range(workers)]
+        for index, count in enumerate(per_worker):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_client_worker, args=(ws_url, count, index, source_addresses, child_conn), daemon=True
+            )
+            process.start()
+            pipes.append(parent_conn)
+            processes.append(process)
+
+        connect_started = time.monotonic()
+        connected = sum(conn.recv() for conn in pipes)
+        connect_seconds = time.monotonic() - connect_started
+
+        rss_after = read_rss_bytes(server_pid) if server_pid else 0
+        cpu_before = read_cpu_seconds(server_pid) if server_pid else 0.0
+        wall_before = time.monotonic()
+
+        sent = asyncio.run(_drive_events(url, events, interval))
+
+        # Give the last broadcast time to drain before collecting
+        time.sleep(max(interval, 1.0))
+        cpu_seconds = (read_cpu_seconds(server_pid) - cpu_before) if server_pid else 0.0
+        wall_seconds = time.monotonic() - wall_before
+
+        for conn in pipes:
+            conn.send("collect")
+
+        latencies = []
+        delivered = 0
+        for conn in pipes:
+            for raw in conn.recv():
+                received = array("d")
+                received.frombytes(raw)
+                delivered += len(received)
+                # Events are driven strictly one at a time, so the n-th broadcast on a socket belongs to the n-th event
+                for event, arrived_at in zip(sent, received):
+                    latencies.append(arrived_at - event["sent_at"])
+
+        for process in processes:
+            process.join(timeout=30)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    latencies.sort()
+    response_times = sorted(event["response_seconds"] for event in sent)
+    return {
+        "clients_requested": clients,
+        "clients_connected": connected,
+        "connect_seconds": round(connect_seconds, 3),
+        "events": len(sent),
+        "deliveries_expected": connected * len(sent),
+        "deliveries_received": delivered,
+        "broadcast_latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p90": round(percentile(latencies, 90) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+        "request_latency_ms": {
+            "p50": round(percentile(response_times, 50) * 1000, 3),
+            "p99": round(percentile(response_times, 99) * 1000, 3),
+        },
+        "server_rss_bytes_per_connection": round((rss_after - rss_before) / connected, 1) if connected and server_pid else None,
+        "server_cpu_percent": round(cpu_seconds / wall_seconds * 100, 1) if server_pid and wall_seconds else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Websocket fan-out load harness")
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=30, help="Number of create/vote/like events to drive")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Client worker processes")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds to wait between events")
+    parser.add_argument("--url", default=None, help="Use an already running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, default=None, help="PID of --url server for memory/CPU sampling")
+    parser.add_argument("--source-addresses", type=int, default=8, help="Loopback source addresses per worker")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run(
+        clients=args.clients,
+        events=args.events,
+        workers=args.workers,
+        interval=args.interval,
+        url=args.url,
+        server_pid=args.server_pid,
+        source_addresses=args.source_addresses,
+    )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
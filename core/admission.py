@@ -0,0 +1,135 @@
+"""Admission control: shed low-priority requests while the database pool or event loop is saturated.
+
+Every HTTP route has a priority class, looked up in ``ADMISSION_ROUTE_PRIORITIES`` by
+``"METHOD /route/template"`` or by the bare template, falling back to
+``ADMISSION_DEFAULT_PRIORITY``:
+
+- ``critical`` (votes, likes, health and metrics) is always admitted.
+- ``normal`` is admitted while fewer than ``ADMISSION_MAX_IN_FLIGHT * (1 - ADMISSION_CRITICAL_RESERVE)``
+  requests are in flight, which keeps the reserve free for critical requests.
+- ``low`` (full listings, exports, search, timelines) gets ``ADMISSION_LOW_PRIORITY_SHARE`` of the
+  normal limit and is rejected outright while the system is saturated.
+
+The system counts as saturated while connection checkouts are queueing with a smoothed wait above
+``ADMISSION_POOL_WAIT_MS``, or while the event loop lags more than ``ADMISSION_LOOP_LAG_MS``.
+Rejected requests get 503 with ``Retry-After`` before any database work is done. Websocket
+traffic is never shed.
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
+
+from core.loop_monitor import loop_monitor
+from core.metrics import http_requests_shed_total
+from core.pool_monitor import pool_monitor, replica_pool_monitor
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ("critical", "normal", "low")
+
+
+class AdmissionController:
+    def __init__(self):
+        self.in_flight = 0
+        self.in_flight_by_priority: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self.shed = 0
+        # (path regex, methods, priority) per HTTP route, built from the app's routes on first use
+        self._routes: Optional[List[Tuple[Pattern, Set[str], Dict[str, str]]]] = None
+
+    def _build_routes(self, app) -> List[Tuple[Pattern, Set[str], Dict[str, str]]]:
+        configured = settings.ADMISSION_ROUTE_PRIORITIES
+        routes = []
+        for route in app.router.routes:
+            methods = getattr(route, "methods", None)
+            if not methods:
+                continue
+            priorities = {}
+            for method in methods:
+                priority = configured.get(f"{method} {route.path}") or configured.get(route.path) or settings.ADMISSION_DEFAULT_PRIORITY
+                if priority not in PRIORITIES:
+                    logger.warning(f"Unknown admission priority {priority!r} for {method} {route.path}; using normal")
+                    priority = "normal"
+                priorities[method] = priority
+            routes.append((route.path_regex, methods, priorities))
+        return routes
+
+    def priority_for(self, scope) -> str:
+        """Priority of the route the request will be dispatched to (the first full match, like the router)."""
+        if self._routes is None:
+            self._routes = self._build_routes(scope["app"])
+        method, path = scope["method"], scope["path"]
+        for path_regex, methods, priorities in self._routes:
+            if method in methods and path_regex.match(path):
+                return priorities[method]
+        return settings.ADMISSION_DEFAULT_PRIORITY
+
+    def saturation(self) -> str:
+        """Why the system is saturated, or an empty string when it is not."""
+        for monitor in (pool_monitor, replica_pool_monitor):
+            if monitor.waiting > 0 and monitor.wait_ewma * 1000 >= settings.ADMISSION_POOL_WAIT_MS:
+                return "pool"
+        if loop_monitor.recent_lags and loop_monitor.recent_lags[-1] * 1000 >= settings.ADMISSION_LOOP_LAG_MS:
+            return "loop"
+        return ""
+
+    def admit(self, priority: str) -> bool:
+        if priority == "critical":
+            return True
+        normal_limit = settings.ADMISSION_MAX_IN_FLIGHT * (1 - settings.ADMISSION_CRITICAL_RESERVE)
+        if priority == "low":
+            if self.in_flight >= normal_limit * settings.ADMISSION_LOW_PRIORITY_SHARE:
+                return False
+            return not self.saturation()
+        return self.in_flight < normal_limit
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "in_flight_by_priority": dict(self.in_flight_by_priority),
+            "saturated": self.saturation() or None,
+            "shed": self.shed,
+            "max_in_flight": settings.ADMISSION_MAX_IN_FLIGHT,
+        }
+
+
+admission_controller = AdmissionController()
+
+_REJECTED_BODY = json.dumps({"detail": "Server is busy, please retry shortly"}).encode()
+
+
+class AdmissionControlMiddleware:
+    """Rejects requests the ``admission_controller`` does not admit with 503 and ``Retry-After``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        controller = admission_controller
+        priority = controller.priority_for(scope)
+        if not controller.admit(priority):
+            controller.shed += 1
+            http_requests_shed_total.labels(priority).inc()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_REJECTED_BODY)).encode()),
+                    (b"retry-after", str(settings.ADMISSION_RETRY_AFTER_SECONDS).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": _REJECTED_BODY})
+            return
+
+        controller.in_flight += 1
+        controller.in_flight_by_priority[priority] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.in_flight -= 1
+            controller.in_flight_by_priority[priority] -= 1
@@ -1,13 +1,51 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
+from core.pool_monitor import InstrumentedAsyncQueuePool, pool_monitor, replica_pool_monitor
 from core.settings import settings
 
 async_engine = create_async_engine(
     settings.SQLALCHEMY_DATABASE_URI,
+    poolclass=InstrumentedAsyncQueuePool,
     pool_pre_ping=True,
     pool_size=settings.POSTGRES_POOL_SIZE,
     max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+    # Fail fast instead of letting requests hang when the pool is saturated
+    pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
     pool_recycle=600,
     pool_use_lifo=True,
+    query_cache_size=settings.SQLALCHEMY_QUERY_CACHE_SIZE,
+    connect_args={"prepare_threshold": settings.POSTGRES_PREPARE_THRESHOLD},
 )
+pool_monitor.attach(async_engine.sync_engine.pool, async_engine.sync_engine.dialect)
 AsyncSessionLocal = async_sessionmaker(async_engine, autocommit=False, expire_on_commit=False)
+
+# Read-only replica; without one configured, reads go to the primary
+read_async_engine = (
+    create_async_engine(
+        settings.SQLALCHEMY_READ_DATABASE_URI,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_pre_ping=True,
+        pool_size=settings.POSTGRES_POOL_SIZE,
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+        pool_recycle=600,
+        pool_use_lifo=True,
+        query_cache_size=settings.SQLALCHEMY_QUERY_CACHE_SIZE,
+        connect_args={"prepare_threshold": settings.POSTGRES_PREPARE_THRESHOLD},
+    )
+    if settings.SQLALCHEMY_READ_DATABASE_URI
+    else async_engine
+)
+if read_async_engine is not async_engine:
+    replica_pool_monitor.attach(read_async_engine.sync_engine.pool, read_async_engine.sync_engine.dialect)
+AsyncReadSessionLocal = async_sessionmaker(read_async_engine, autocommit=False, expire_on_commit=False)
+
+
+def _set_prepared_max(dbapi_connection, connection_record):
+    # The adapted connection exposes psycopg's AsyncConnection as ``driver_connection``
+    dbapi_connection.driver_connection.prepared_max = settings.POSTGRES_PREPARED_MAX
+
+
+for _engine in {async_engine, read_async_engine}:
+    event.listen(_engine.sync_engine, "connect", _set_prepared_max)
@@ -1,8 +1,12 @@
+import json
 import logging
+import time
 from typing import List
 
 from starlette.websockets import WebSocket
 
+from core.metrics import websocket_broadcast_duration_seconds
+
 
 class ConnectionManager:
     def __init__(self):
@@ -20,15 +24,25 @@ class ConnectionManager:
             logging.warning(f"WebSocket not in active connections")
 
     async def broadcast(self, message: dict):
+        # Encode once for every connection instead of once per send_json call
+        await self.broadcast_text(json.dumps(message, separators=(",", ":")))
+
+    async def broadcast_event(self, event_type: str, data_json: bytes):
+        """Broadcast ``{"type": event_type, "data": ...}`` around an already encoded JSON payload."""
+        await self.broadcast_text(f'{{"type":{json.dumps(event_type)},"data":{data_json.decode()}}}')
+
+    async def broadcast_text(self, text: str):
+        started = time.perf_counter()
         disconnected = []
         for connection in self.active_connections:
             try:
-                await connection.send_json(message)
+                await connection.send_text(text)
             except Exception as e:
                 logging.warning(f"Failed to send to connection: {e}")
                 disconnected.append(connection)
 
         for conn in disconnected:
             self.disconnect(conn)
+        websocket_broadcast_duration_seconds.observe(time.perf_counter() - started)
 
 manager = ConnectionManager()
\ No newline at end of file
@@ -1,57 +1,148 @@
-from typing import Annotated, AsyncGenerator, Optional
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncGenerator, AsyncIterator, Optional
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
-from jose import jwt, JWTError
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
 from starlette import status
 from typing_extensions import TypeAlias
 
-from core.async_engine import AsyncSessionLocal
+from core.async_engine import async_engine, read_async_engine, AsyncSessionLocal, AsyncReadSessionLocal
 from core.auth import bearer_scheme
-from core.settings import settings
+from core.read_routing import read_your_writes, token_subject
+from crud.user_crud import user_crud
 from models import UserModel
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+@event.listens_for(Session, "after_transaction_end")
+def _release_pinned_connection(session, transaction):
+    """Hand the connection pinned by authentication back once the handler's transaction ends."""
+    if transaction.parent is not None or not session.info.pop("release_after_transaction", False):
+        return
+    connection = session.info.pop("pinned_connection", None)
+    if connection is None:
+        return
+    # Later transactions (if any) check out a connection of their own, as an unpinned session does
+    session.bind = connection.sync_connection.engine
+    connection.sync_connection.close()
+
+
+@asynccontextmanager
+async def _request_session(session_factory, engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
+    async with session_factory() as session:
+        session.info["engine"] = engine
+        try:
+            yield session
+        finally:
+            session.info.pop("release_after_transaction", None)
+            connection = session.info.pop("pinned_connection", None)
+            if connection is not None:
+                # The handler never ran a transaction of its own after authentication
+                await session.close()
+                await connection.close()
+
+
+def get_user_key(
+    credentials: Annotated[Optional[HTTPAuthorizationCredentials], Depends(bearer_scheme)]
+) -> Optional[str]:
+    """User uuid from the bearer token, or None; FastAPI caches it, so the token is decoded once per request."""
+    return token_subject(credentials)
+
+UserKey: TypeAlias = Annotated[Optional[str], Depends(get_user_key)]
+
+
+async def get_session(user_key: UserKey) -> AsyncGenerator[AsyncSession, None]:
+    """Request-scoped session; connections are only checked out when a transaction needs one.
+
+    FastAPI caches dependencies per request, so ``get_current_user`` and the handler get this
+    same session. Authentication pins one pooled connection to it that the handler's
+    transaction reuses, and it goes back to the pool as soon as that transaction ends, before
+    broadcasts or streamed bodies: one checkout per authenticated request, held only while
+    the request is using the database.
+    """
+    async with _request_session(AsyncSessionLocal, async_engine) as session:
+        # Lets a committed write pin this user's reads to the primary for a short while
+        session.info["user_key"] = user_key
         yield session
 
 AsyncDBSession: TypeAlias = Annotated[AsyncSession, Depends(get_session)]
 
 
-async def get_current_user(
-    credentials: Annotated[Optional[HTTPAuthorizationCredentials], Depends(bearer_scheme)]
-) -> UserModel:
-    credentials_exception = HTTPException(
+def pinned_to_primary(user_key: Optional[str]) -> bool:
+    """Whether this user wrote within ``READ_YOUR_WRITES_SECONDS`` and must see that write."""
+    return read_your_writes.is_pinned(user_key)
+
+
+def read_engine_for(user_key: Optional[str]):
+    """The replica's engine and session factory, or the primary's right after this user wrote."""
+    if pinned_to_primary(user_key):
+        return async_engine, AsyncSessionLocal
+    return read_async_engine, AsyncReadSessionLocal
+
+
+async def get_read_session(user_key: UserKey) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the replica, or the primary right after this user wrote."""
+    engine, session_factory = read_engine_for(user_key)
+
+    async with _request_session(session_factory, engine) as session:
+        yield session
+
+AsyncReadDBSession: TypeAlias = Annotated[AsyncSession, Depends(get_read_session)]
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    if credentials is None:
-        raise credentials_exception
 
-    try:
-        token = credentials.credentials
-        if not token or token.strip() == "":
-            raise credentials_exception
-        
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        user_uuid: str = payload.get("sub")
-        if user_uuid is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+async def _load_user(session: AsyncSession, user_uuid: str) -> Optional[UserModel]:
+    connection = await session.info["engine"].connect()
+    session.sync_session.bind = connection.sync_connection
+    session.info["pinned_connection"] = connection
+    user = await user_crud.get_user_by_uuid(session, user_uuid)
+    # Close the lookup's transaction so handlers can open their own with session.begin();
+    # the connection stays pinned until that transaction ends
+    await session.commit()
+    session.info["release_after_transaction"] = True
+    return user
 
-    async with AsyncSessionLocal() as session:
-        stmt = select(UserModel).where(UserModel.uuid == user_uuid)
-        result = await session.execute(stmt)
-        user = result.scalars().first()
 
-        if user is None:
-            raise credentials_exception
+async def get_current_user(
+    session: AsyncDBSession,
+    user_uuid: UserKey
+) -> UserModel:
+    if user_uuid is None:
+        raise _credentials_exception()
 
-        return user
+    user = await _load_user(session, user_uuid)
+    if user is None:
+        raise _credentials_exception()
+
+    return user
 
 AuthenticatedUser: TypeAlias = Annotated[UserModel, Depends(get_current_user)]
+
+
+async def get_current_user_for_read(
+    session: AsyncReadDBSession,
+    user_uuid: UserKey
+) -> UserModel:
+    """``get_current_user`` for read-only endpoints, sharing the request's read session."""
+    if user_uuid is None:
+        raise _credentials_exception()
+
+    user = await _load_user(session, user_uuid)
+    if user is None and read_async_engine is not async_engine:
+        # A user registered moments ago may not have reached the replica yet
+        async with AsyncSessionLocal() as primary_session:
+            user = await user_crud.get_user_by_uuid(primary_session, user_uuid)
+    if user is None:
+        raise _credentials_exception()
+
+    return user
+
+ReadAuthenticatedUser: TypeAlias = Annotated[UserModel, Depends(get_current_user_for_read)]
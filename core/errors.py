@@ -0,0 +1,12 @@
+from fastapi import HTTPException
+from sqlalchemy import exc as sa_exc
+
+
+def unexpected_error(detail: str, exc: Exception) -> Exception:
+    """What a handler's catch-all raises: a 500 with ``detail``, except for pool checkout timeouts.
+
+    Those are returned unchanged so they reach the 503 handler registered in ``main.py``.
+    """
+    if isinstance(exc, sa_exc.TimeoutError):
+        return exc
+    return HTTPException(status_code=500, detail=f"{detail}: {str(exc)}")
@@ -0,0 +1,256 @@
+"""``Idempotency-Key`` support for POST requests.
+
+A client that retries a POST with the same ``Idempotency-Key`` header gets the first attempt's
+response back instead of running the handler again, so a retried vote is not re-applied, a
+retried like does not flip back and nothing is broadcast twice. Keys are scoped to the
+authenticated user, the method and the path, and remembered with a fingerprint of the request
+body: reusing a key for a different body is rejected with 422.
+
+The middleware runs before routing and dependency resolution, so a replay from the default
+in-memory store costs no database work at all. The in-memory store is per process and bounded
+by ``IDEMPOTENCY_MAX_KEYS``; with several workers set ``IDEMPOTENCY_STORE=database`` to share
+keys through the ``idempotency_keys`` table.
+
+Only responses below 500 are stored; a failed attempt releases its key so the retry runs again.
+A duplicate that arrives while the first attempt is still running waits for it (in-memory store)
+or gets 409 (database store).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from core.read_routing import token_subject
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    # None while the first attempt is still running
+    status: Optional[int]
+    headers: Headers
+    body: bytes
+
+
+class _MemoryRecord:
+    __slots__ = ("response", "expires_at", "done")
+
+    def __init__(self, response: StoredResponse, expires_at: float):
+        self.response = response
+        self.expires_at = expires_at
+        self.done = asyncio.Event()
+
+
+class MemoryIdempotencyStore:
+    """Recent keys in insertion order; expired and excess keys are dropped from the oldest end."""
+
+    def __init__(self, ttl_seconds: float, max_keys: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self.records: "OrderedDict[str, _MemoryRecord]" = OrderedDict()
+
+    def _evict(self, now: float):
+        # In-flight records are never dropped: duplicates wait on them and their owner still has to
+        # complete them. They move to the back instead, so the bound can be exceeded by at most the
+        # number of requests in flight.
+        for _ in range(len(self.records)):
+            key, record = next(iter(self.records.items()))
+            if record.expires_at > now and len(self.records) < self.max_keys:
+                break
+            if record.response.status is None:
+                self.records.move_to_end(key)
+            else:
+                del self.records[key]
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """None when this request now owns the key, otherwise the stored (final) response."""
+        while True:
+            now = time.monotonic()
+            record = self.records.get(key)
+            if record is not None and record.expires_at <= now and record.response.status is not None:
+                del self.records[key]
+                record = None
+            if record is None:
+                self._evict(now)
+                self.records[key] = _MemoryRecord(StoredResponse(fingerprint, None, [], b""), now + self.ttl_seconds)
+                return None
+            if record.response.status is not None or record.response.fingerprint != fingerprint:
+                return record.response
+            # Same request still running: wait for it, then replay its response (or retry if it failed)
+            await record.done.wait()
+
+    async def complete(self, key: str, response: StoredResponse):
+        record = self.records.get(key)
+        if record is not None:
+            record.response = response
+            record.done.set()
+
+    async def release(self, key: str):
+        record = self.records.pop(key, None)
+        if record is not None:
+            record.done.set()
+
+
+class DatabaseIdempotencyStore:
+    """Keys in the ``idempotency_keys`` table, shared by every worker."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        from core.async_engine import AsyncSessionLocal
+        from crud.idempotency_crud import idempotency_crud as IdempotencyCrud
+
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                if await IdempotencyCrud.claim(session, key, fingerprint, self.ttl_seconds):
+                    return None
+                row = await IdempotencyCrud.get(session, key)
+        if row is None:
+            # Released between the insert and the read; let this request run
+            return None
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in row.headers or []]
+        return StoredResponse(row.fingerprint, row.status_code, headers, row.body or b"")
+
+    async def complete(self, key: str, response: StoredResponse):
+        from core.async_engine import AsyncSessionLocal
+        from crud.idempotency_crud import idempotency_crud as IdempotencyCrud
+
+        headers = [[name.decode("latin-1"), value.decode("latin-1")] for name, value in response.headers]
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                await IdempotencyCrud.complete(session, key, response.status, headers, response.body)
+
+    async def release(self, key: str):
+        from core.async_engine import AsyncSessionLocal
+        from crud.idempotency_crud import idempotency_crud as IdempotencyCrud
+
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                await IdempotencyCrud.release(session, key)
+
+    async def delete_expired(self):
+        from core.async_engine import AsyncSessionLocal
+        from crud.idempotency_crud import idempotency_crud as IdempotencyCrud
+
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                deleted = await IdempotencyCrud.delete_expired(session, self.ttl_seconds)
+        if deleted:
+            logger.info(f"Deleted {deleted} expired idempotency keys")
+
+
+if settings.IDEMPOTENCY_STORE == "database":
+    idempotency_store = DatabaseIdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS)
+else:
+    idempotency_store = MemoryIdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_KEYS)
+
+
+async def _send_json(send, status: int, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Answers retried POSTs that carry an ``Idempotency-Key`` from the idempotency store."""
+
+    def __init__(self, app, store=None):
+        self.app = app
+        self.store = store or idempotency_store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        headers: Dict[bytes, bytes] = dict(scope["headers"])
+        raw_key = headers.get(IDEMPOTENCY_HEADER)
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        user_key = token_subject(HTTPAuthorizationCredentials(scheme=scheme, credentials=token)) if token else None
+        if raw_key is None or user_key is None:
+            # Keys are per user; anonymous or unauthenticated requests are handled as usual
+            await self.app(scope, receive, send)
+            return
+        if not raw_key or len(raw_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+            return
+
+        # Buffer the (small JSON) body to fingerprint it, then hand it to the app unchanged
+        body_chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body_chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(body_chunks)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        key = hashlib.sha256(
+            b"\0".join((user_key.encode(), scope["path"].encode(), raw_key))
+        ).hexdigest()
+
+        stored = await self.store.claim(key, fingerprint)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                await _send_json(send, 422, "Idempotency-Key was already used with a different request body")
+            elif stored.status is None:
+                await _send_json(send, 409, "A request with this Idempotency-Key is still being processed")
+            else:
+                await send({
+                    "type": "http.response.start",
+                    "status": stored.status,
+                    "headers": stored.headers + [(b"idempotent-replayed", b"true")],
+                })
+                await send({"type": "http.response.body", "body": stored.body})
+            return
+
+        body_sent = False
+
+        async def replay_body():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status: Optional[int] = None
+        response_headers: Headers = []
+        response_body = []
+
+        async def capture(message):
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response_body.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            await self.store.release(key)
+            raise
+        if status is not None and status < 500:
+            await self.store.complete(key, StoredResponse(fingerprint, status, response_headers, b"".join(response_body)))
+        else:
+            await self.store.release(key)
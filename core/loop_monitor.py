@@ -0,0 +1,108 @@
+"""Event loop lag monitor and blocking-code detector.
+
+A task on the loop sleeps for a fixed interval and records how late it wakes up; that delay
+is the time other callbacks held the loop. A watchdog thread checks the task's heartbeat and,
+when the loop has not come back for longer than the block threshold, logs a stack sample of
+the loop thread taken while it is still blocked, so the culprit (a bcrypt call, a large
+validation, synchronous I/O) shows up by name instead of as an unexplained latency spike.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from core.metrics import event_loop_lag_seconds
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class LoopMonitor:
+    def __init__(self, window: int = 4096):
+        self.recent_lags: Deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        self.blocks = 0
+        self.heartbeat = time.monotonic()
+        self.loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def _sample(self, interval: float):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(loop.time() - expected, 0.0)
+            self.heartbeat = time.monotonic()
+            self.recent_lags.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            event_loop_lag_seconds.observe(lag)
+
+    def _watch(self, interval: float, threshold: float):
+        reported_heartbeat = None
+        while not self._stopped.wait(threshold / 2):
+            heartbeat = self.heartbeat
+            blocked_for = time.monotonic() - heartbeat - interval
+            if blocked_for < threshold or heartbeat == reported_heartbeat:
+                continue
+            # One report per stall: the heartbeat has to move before this stall can be reported again
+            reported_heartbeat = heartbeat
+            self.blocks += 1
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<no frame>"
+            logger.warning(f"Event loop blocked for {blocked_for * 1000:.0f}ms so far; loop thread stack:\n{stack}")
+
+    def start(self):
+        interval = settings.EVENT_LOOP_LAG_PROBE_INTERVAL_SECONDS
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample(interval), name="event_loop_lag_monitor")
+        if settings.EVENT_LOOP_BLOCK_THRESHOLD_MS > 0:
+            self._watchdog = threading.Thread(
+                target=self._watch,
+                args=(interval, settings.EVENT_LOOP_BLOCK_THRESHOLD_MS / 1000),
+                name="event-loop-watchdog",
+                daemon=True,
+            )
+            self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        lags = list(self.recent_lags)
+        return {
+            "samples": len(lags),
+            "lag_ms": {
+                "p50": round(_percentile(lags, 50) * 1000, 3),
+                "p95": round(_percentile(lags, 95) * 1000, 3),
+                "p99": round(_percentile(lags, 99) * 1000, 3),
+                "max": round(self.max_lag * 1000, 3),
+            },
+            "blocks": self.blocks,
+            "block_threshold_ms": settings.EVENT_LOOP_BLOCK_THRESHOLD_MS,
+        }
+
+
+loop_monitor = LoopMonitor()
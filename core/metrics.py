@@ -0,0 +1,276 @@
+"""Minimal Prometheus text-format metrics.
+
+Recording is kept cheap on the hot path: counters and histograms are plain attribute
+updates on pre-created children (a bucket index from ``bisect`` and two additions), labelled
+children are created once per label set and cached, and everything that can be read from
+existing state (pool statistics, websocket connections) is collected only when ``/metrics``
+is scraped. The event loop is single threaded, so no locking is needed.
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], _CounterChild] = {}
+        if not self.labelnames:
+            self._default = self._children.setdefault((), _CounterChild())
+
+    def labels(self, *values: str) -> _CounterChild:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = _CounterChild()
+        return child
+
+    def inc(self, amount: float = 1.0):
+        self._default.value += amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for values, child in self._children.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}")
+        return lines
+
+
+class Gauge:
+    """A gauge set directly with ``set``/``inc``/``dec``, or read from ``function`` at scrape time.
+
+    ``metric_type="counter"`` exposes a monotonically increasing value kept elsewhere as a counter.
+    """
+
+    def __init__(
+        self, name: str, documentation: str, function: Callable[[], float] = None, metric_type: str = "gauge"
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self.metric_type = metric_type
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def collect(self) -> List[str]:
+        value = self.function() if self.function is not None else self.value
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            f"{self.name} {_format_value(value)}",
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "bucket_counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket plus +Inf; counts are stored per bucket and made cumulative when rendered
+        self.bucket_counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+        if not self.labelnames:
+            self._default = self._children.setdefault((), _HistogramChild(self.bounds))
+
+    def labels(self, *values: str) -> _HistogramChild:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = _HistogramChild(self.bounds)
+        return child
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.bounds, child.bucket_counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labelnames, values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {child.count}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[object] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being served")
+)
+http_request_duration_seconds = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+)
+http_requests_total = registry.register(
+    Counter("http_requests_total", "HTTP requests by route and status code", ("method", "route", "status"))
+)
+websocket_broadcast_duration_seconds = registry.register(
+    Histogram("websocket_broadcast_duration_seconds", "Time to fan a broadcast out to every websocket client")
+)
+http_requests_shed_total = registry.register(
+    Counter("http_requests_shed_total", "Requests rejected by admission control by priority", ("priority",))
+)
+single_flight_calls_total = registry.register(
+    Counter(
+        "single_flight_calls_total",
+        "Coalesced read computations: leaders ran the queries, coalesced callers shared a leader's result",
+        ("name", "role"),
+    )
+)
+votes_total = registry.register(Counter("votes_total", "Votes recorded"))
+likes_total = registry.register(Counter("likes_total", "Like toggles by resulting state", ("action",)))
+event_loop_lag_seconds = registry.register(
+    Histogram(
+        "event_loop_lag_seconds",
+        "How late the event loop lag probe woke up",
+        buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+    )
+)
+
+
+def register_pool_metrics(prefix: str, monitor):
+    """Scrape-time gauges for one connection pool, named ``<prefix>_*``."""
+
+    def pool_value(read: Callable[[object], float]) -> Callable[[], float]:
+        return lambda: read(monitor.pool) if monitor.pool is not None else 0
+
+    registry.register(Gauge(f"{prefix}_size", "Configured connection pool size", pool_value(lambda pool: pool.size())))
+    registry.register(Gauge(f"{prefix}_max_overflow", "Current pool max_overflow", pool_value(lambda pool: pool._max_overflow)))
+    registry.register(Gauge(f"{prefix}_checked_out", "Connections in use", pool_value(lambda pool: pool.checkedout())))
+    registry.register(Gauge(f"{prefix}_idle", "Idle connections in the pool", pool_value(lambda pool: pool.checkedin())))
+    registry.register(Gauge(f"{prefix}_overflow", "Overflow connections open", pool_value(lambda pool: max(pool.overflow(), 0))))
+    registry.register(Gauge(
+        f"{prefix}_checkouts_total", "Connection checkouts", lambda: monitor.checkouts, "counter"
+    ))
+    registry.register(Gauge(
+        f"{prefix}_timeouts_total", "Connection checkouts that timed out", lambda: monitor.timeouts, "counter"
+    ))
+    registry.register(Gauge(
+        f"{prefix}_checkout_wait_seconds_total", "Total time spent waiting for connections",
+        lambda: monitor.checkout_seconds_total, "counter",
+    ))
+
+
+def register_collected_metrics():
+    """Gauges read from existing state at scrape time, so the hot path does no extra work.
+
+    Called once by the application at start-up; kept out of import time to avoid import cycles.
+    """
+    from core.connection_manager import manager
+    from core.loop_monitor import loop_monitor
+    from core.pool_monitor import pool_monitor, replica_pool_monitor
+
+    register_pool_metrics("db_pool", pool_monitor)
+    if replica_pool_monitor.pool is not None:
+        register_pool_metrics("db_replica_pool", replica_pool_monitor)
+    registry.register(Gauge(
+        "event_loop_blocks_total", "Times the event loop stayed blocked past the threshold",
+        lambda: loop_monitor.blocks, "counter",
+    ))
+    registry.register(Gauge(
+        "websocket_connections", "Open websocket connections", lambda: len(manager.active_connections)
+    ))
+
+
+class MetricsMiddleware:
+    """Records in-flight requests, latency per route template and responses by status code."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.value += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.value -= 1
+            # FastAPI stores the matched route in the scope; templates keep label cardinality bounded
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            http_request_duration_seconds.labels(method, path).observe(time.perf_counter() - started)
+            http_requests_total.labels(method, path, str(status_code)).inc()
@@ -0,0 +1,161 @@
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class PoolMonitor:
+    """Collects connection pool statistics: checkout waits, timeouts, overflow use and pre-ping cost."""
+
+    def __init__(self, window: int = 2048):
+        self.pool: Optional[Pool] = None
+        self.checkouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=window)
+        self.timeouts = 0
+        self.overflow_checkouts = 0
+        self.pre_pings = 0
+        self.pre_ping_seconds_total = 0.0
+        # Checkouts in progress; stays above zero only while the pool is exhausted
+        self.waiting = 0
+        # Exponentially weighted checkout wait, a cheap "current" signal for admission control
+        self.wait_ewma = 0.0
+        self._last_alarm = 0.0
+
+    def attach(self, pool: Pool, dialect):
+        self.pool = pool
+        pool.monitor = self
+        do_ping = dialect.do_ping
+
+        def timed_ping(dbapi_connection):
+            started = time.perf_counter()
+            try:
+                return do_ping(dbapi_connection)
+            finally:
+                self.pre_pings += 1
+                self.pre_ping_seconds_total += time.perf_counter() - started
+
+        dialect.do_ping = timed_ping
+
+    def record_checkout(self, seconds: float, in_overflow: bool):
+        self.checkouts += 1
+        self.checkout_seconds_total += seconds
+        if seconds > self.checkout_seconds_max:
+            self.checkout_seconds_max = seconds
+        self.recent_waits.append(seconds)
+        self.wait_ewma += (seconds - self.wait_ewma) * 0.1
+        if in_overflow:
+            self.overflow_checkouts += 1
+        if seconds * 1000 >= settings.POSTGRES_POOL_WAIT_ALARM_MS:
+            self._alarm(f"Connection checkout took {seconds * 1000:.1f}ms")
+
+    def record_timeout(self, seconds: float):
+        self.timeouts += 1
+        self.recent_waits.append(seconds)
+        self.wait_ewma += (seconds - self.wait_ewma) * 0.1
+        self._alarm(f"Connection checkout timed out after {seconds:.2f}s")
+
+    def _alarm(self, message: str):
+        # Rate limited so a saturated pool doesn't flood the logs
+        now = time.monotonic()
+        if now - self._last_alarm < 10:
+            return
+        self._last_alarm = now
+        logger.warning(f"DB pool saturated: {message}; {self.snapshot()}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        waits = list(self.recent_waits)
+        pool = self.pool
+        return {
+            "size": pool.size() if pool else 0,
+            "max_overflow": pool._max_overflow if pool else 0,
+            "in_use": pool.checkedout() if pool else 0,
+            "waiting": self.waiting,
+            "idle": pool.checkedin() if pool else 0,
+            "overflow": max(pool.overflow(), 0) if pool else 0,
+            "checkouts": self.checkouts,
+            "overflow_checkouts": self.overflow_checkouts,
+            "timeouts": self.timeouts,
+            "checkout_wait_ms": {
+                "avg": round(self.checkout_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "p50": round(_percentile(waits, 50) * 1000, 3),
+                "p95": round(_percentile(waits, 95) * 1000, 3),
+                "p99": round(_percentile(waits, 99) * 1000, 3),
+                "max": round(self.checkout_seconds_max * 1000, 3),
+                "ewma": round(self.wait_ewma * 1000, 3),
+            },
+            "pre_pings": self.pre_pings,
+            "pre_ping_ms_avg": round(self.pre_ping_seconds_total / self.pre_pings * 1000, 3) if self.pre_pings else 0.0,
+        }
+
+    async def adapt_overflow(self):
+        """Grow max_overflow while checkouts wait too long, shrink it back once waits are gone."""
+        pool = self.pool
+        if pool is None or not self.recent_waits:
+            return
+
+        p95_ms = _percentile(list(self.recent_waits), 95) * 1000
+        current = pool._max_overflow
+        step = settings.POSTGRES_POOL_ADAPTIVE_STEP
+
+        if p95_ms > settings.POSTGRES_POOL_ADAPTIVE_TARGET_WAIT_MS and current < settings.POSTGRES_POOL_ADAPTIVE_MAX_OVERFLOW:
+            new_value = min(current + step, settings.POSTGRES_POOL_ADAPTIVE_MAX_OVERFLOW)
+        elif p95_ms < settings.POSTGRES_POOL_ADAPTIVE_TARGET_WAIT_MS / 4 and current > settings.POSTGRES_MAX_OVERFLOW:
+            new_value = max(current - step, settings.POSTGRES_MAX_OVERFLOW)
+        else:
+            return
+
+        # QueuePool reads _max_overflow on every checkout, so the change applies immediately;
+        # surplus overflow connections are closed as they are returned
+        pool._max_overflow = new_value
+        self.recent_waits.clear()
+        logger.info(f"Adaptive pool sizing: p95 checkout wait {p95_ms:.1f}ms, max_overflow {current} -> {new_value}")
+
+
+pool_monitor = PoolMonitor()
+# Only attached when a read replica is configured
+replica_pool_monitor = PoolMonitor()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports checkout timing (including pre-ping) to its ``PoolMonitor``."""
+
+    monitor: PoolMonitor = pool_monitor
+
+    def _create_connection(self):
+        # QueuePool has just counted this connection; above zero it is beyond pool_size
+        in_overflow = self._overflow > 0
+        record = super()._create_connection()
+        if in_overflow:
+            record.info["created_in_overflow"] = True
+        return record
+
+    def connect(self):
+        monitor = self.monitor
+        started = time.perf_counter()
+        monitor.waiting += 1
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            monitor.record_timeout(time.perf_counter() - started)
+            raise
+        finally:
+            monitor.waiting -= 1
+        # Popped so only the checkout that opened the overflow connection counts it
+        monitor.record_checkout(time.perf_counter() - started, connection.info.pop("created_in_overflow", False))
+        return connection
@@ -0,0 +1,129 @@
+"""Per-request SQL query profiling.
+
+Engine events count every statement and its execution time into the ``QueryStats`` of the
+current request (a context variable, which SQLAlchemy carries into its greenlets).
+``QueryProfilerMiddleware`` reports the totals in a ``Server-Timing`` header and logs requests
+that exceed the configured budget; ``assert_max_queries`` applies the same counting to a block
+of code so query-count budgets can be asserted in tests.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self, keep_statements: bool = False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Optional[List[str]] = [] if keep_statements else None
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    stats.count += 1
+    stats.seconds += time.perf_counter() - getattr(context, "_query_started", time.perf_counter())
+    if stats.statements is not None:
+        stats.statements.append(statement)
+
+
+def install_query_profiler():
+    """Attach the counting listeners to the app's engines. Safe to call more than once."""
+    global _installed
+    if _installed:
+        return
+    from core.async_engine import async_engine, read_async_engine
+
+    for engine in {async_engine, read_async_engine}:
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+
+class QueryProfilerMiddleware:
+    """Adds ``Server-Timing: db;dur=<ms>;desc="<n> queries"`` and logs requests over budget."""
+
+    def __init__(self, app):
+        self.app = app
+        install_query_profiler()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'.encode("latin-1"),
+                ))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            outer = _current_stats.get()
+            if outer is not None:
+                # Keep an enclosing count_queries() (an in-process test client) accurate
+                outer.count += stats.count
+                outer.seconds += stats.seconds
+            if stats.count > settings.SQL_QUERY_BUDGET or stats.seconds * 1000 > settings.SQL_TIME_BUDGET_MS:
+                logger.warning(
+                    f"{scope['method']} {scope['path']} over SQL budget: "
+                    f"{stats.count} queries, {stats.seconds * 1000:.1f}ms in the database"
+                )
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Count the statements executed inside the block, keeping their SQL for inspection."""
+    install_query_profiler()
+    stats = QueryStats(keep_statements=True)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """Fail with the executed SQL when the block runs more than ``max_queries`` statements.
+
+    Usage in a test::
+
+        with assert_max_queries(3):
+            response = await client.get("/poll/")
+    """
+    with count_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        executed = "\n".join(f"  {index + 1}. {sql}" for index, sql in enumerate(stats.statements))
+        raise AssertionError(f"Expected at most {max_queries} queries, {stats.count} were executed:\n{executed}")
@@ -0,0 +1,70 @@
+import time
+from typing import Dict, Optional
+
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt, JWTError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.settings import settings
+
+
+class ReadYourWritesTracker:
+    """Remembers which users wrote recently so their reads can be pinned to the primary.
+
+    Replicas lag the primary slightly; without pinning, a user could create a poll and not
+    see it in the listing they fetch right after. State is per process, like the websocket
+    connection manager.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self.pinned_until: Dict[str, float] = {}
+
+    def mark_write(self, user_key: str):
+        now = time.monotonic()
+        self.pinned_until[user_key] = now + self.window_seconds
+        if len(self.pinned_until) > 10000:
+            self.pinned_until = {key: until for key, until in self.pinned_until.items() if until > now}
+
+    def is_pinned(self, user_key: Optional[str]) -> bool:
+        if user_key is None:
+            return False
+        until = self.pinned_until.get(user_key)
+        return until is not None and until > time.monotonic()
+
+
+read_your_writes = ReadYourWritesTracker(settings.READ_YOUR_WRITES_SECONDS)
+
+
+def token_subject(credentials: Optional[HTTPAuthorizationCredentials]) -> Optional[str]:
+    """User uuid from a bearer token, or None. Only used for routing; authentication happens elsewhere."""
+    if credentials is None or not credentials.credentials:
+        return None
+    try:
+        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=["HS256"])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush_writes(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer_to_primary(session):
+    if session.info.pop("has_writes", False) and session.info.get("user_key"):
+        read_your_writes.mark_write(session.info["user_key"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_writes(session):
+    session.info.pop("has_writes", None)
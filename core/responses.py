@@ -0,0 +1,7 @@
+from starlette.responses import Response
+
+
+class RawJSONResponse(Response):
+    """Response for a body that is already encoded JSON bytes, so nothing is validated or re-encoded."""
+
+    media_type = "application/json"
@@ -2,9 +2,9 @@ import json
 import os
 import secrets
 
-from typing import Any, ClassVar, Optional
+from typing import Any, ClassVar, Dict, Literal, Optional
 
-from pydantic import AnyHttpUrl, PostgresDsn, field_validator
+from pydantic import AnyHttpUrl, PostgresDsn, ValidationInfo, field_validator
 from pydantic.fields import FieldInfo, computed_field
 from pydantic_settings import BaseSettings, PydanticBaseSettingsSource
 
@@ -89,6 +89,115 @@ class Settings(BaseSettings):
     POSTGRES_DB: Optional[str] = None
     POSTGRES_POOL_SIZE: int = 50
     POSTGRES_MAX_OVERFLOW: int = 0
+    POSTGRES_POOL_TIMEOUT: float = 5.0
+    POSTGRES_POOL_WAIT_ALARM_MS: float = 250
+    # Adaptive mode raises max_overflow (up to the cap) while p95 checkout wait exceeds the target
+    POSTGRES_POOL_ADAPTIVE: bool = False
+    POSTGRES_POOL_ADAPTIVE_INTERVAL_SECONDS: int = 10
+    POSTGRES_POOL_ADAPTIVE_TARGET_WAIT_MS: float = 20
+    POSTGRES_POOL_ADAPTIVE_MAX_OVERFLOW: int = 50
+    POSTGRES_POOL_ADAPTIVE_STEP: int = 5
+    # psycopg prepares a statement server-side after this many executions on a connection;
+    # set to "off" to disable server-side prepares (required behind pgbouncer in transaction mode)
+    POSTGRES_PREPARE_THRESHOLD: Optional[int] = 1
+
+    @field_validator("POSTGRES_PREPARE_THRESHOLD", mode="before")
+    @classmethod
+    def parse_prepare_threshold(cls, v: Any) -> Any:
+        # An empty environment variable is ignored, so disabling needs an explicit value
+        if isinstance(v, str) and v.strip().lower() in ("off", "none", "disabled"):
+            return None
+        return v
+
+    POSTGRES_PREPARED_MAX: int = 200
+    SQLALCHEMY_QUERY_CACHE_SIZE: int = 1200
+    SQL_WARMUP_ON_STARTUP: bool = True
+    METRICS_ENABLED: bool = True
+    EVENT_LOOP_LAG_PROBE_INTERVAL_SECONDS: float = 0.1
+    # Log a stack sample of the loop thread when it stays blocked longer than this (0 disables)
+    EVENT_LOOP_BLOCK_THRESHOLD_MS: float = 100
+    # Polls fetched per server-side cursor batch by the streaming listing
+    POLL_STREAM_BATCH_SIZE: int = 500
+    # Opt-in per-request SQL profiling (Server-Timing header and over-budget logging)
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_QUERY_BUDGET: int = 10
+    SQL_TIME_BUDGET_MS: float = 100
+    # Hash partitions for the votes table; only used when creating the schema (see the votes migration)
+    VOTES_PARTITION_COUNT: int = 16
+    # Rows per batch when the partitioning migration copies existing votes
+    VOTES_PARTITION_COPY_BATCH: int = 50000
+
+    # Background jobs (an interval of 0 disables the job)
+    LIKE_RECONCILE_INTERVAL_SECONDS: int = 0
+    LIKE_RECONCILE_BATCH_SIZE: int = 500
+    VOTE_SWEEP_INTERVAL_SECONDS: int = 300
+    VOTE_SWEEP_BATCH_SIZE: int = 5000
+    VOTE_SWEEP_PAUSE_SECONDS: float = 0.1
+    ARCHIVE_INTERVAL_SECONDS: int = 0
+    ARCHIVE_BATCH_SIZE: int = 5000
+    ARCHIVE_POLL_BATCH_SIZE: int = 100
+    ARCHIVE_MAX_ROWS_PER_SECOND: float = 20000
+    # Minute vote rollups older than this are removed by the vote sweeper; hour rollups are kept
+    VOTE_ROLLUP_MINUTE_RETENTION_HOURS: int = 48
+    # Window returned by the poll timeline when no ``since`` is given
+    POLL_TIMELINE_DEFAULT_HOURS: int = 24
+    # Share one in-flight computation between concurrent identical reads
+    SINGLE_FLIGHT_ENABLED: bool = True
+    # Admission control: shed low-priority requests while the pool or event loop is saturated
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 500
+    ADMISSION_CRITICAL_RESERVE: float = 0.2
+    ADMISSION_LOW_PRIORITY_SHARE: float = 0.5
+    ADMISSION_POOL_WAIT_MS: float = 100
+    ADMISSION_LOOP_LAG_MS: float = 200
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    ADMISSION_DEFAULT_PRIORITY: Literal["critical", "normal", "low"] = "normal"
+    # "METHOD /route/template" (or a bare template) -> critical | normal | low
+    ADMISSION_ROUTE_PRIORITIES: Dict[str, str] = {
+        "POST /poll/{poll_uuid}/vote": "critical",
+        "POST /poll/{poll_uuid}/like": "critical",
+        "/health": "critical",
+        "/health/pool": "critical",
+        "/health/loop": "critical",
+        "/health/admission": "critical",
+        "/metrics": "critical",
+        "GET /poll/": "low",
+        "GET /poll/stream": "low",
+        "GET /poll/search": "low",
+        "GET /poll/{poll_uuid}/export": "low",
+        "GET /poll/{poll_uuid}/timeline": "low",
+        # Cheap single-poll reads clients should use instead of the listing
+        "GET /poll/{poll_uuid}": "normal",
+        "GET /poll/{poll_uuid}/summary": "normal",
+    }
+    # Idempotency-Key support for POST requests; IDEMPOTENCY_STORE is "memory" (per process) or "database"
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_STORE: Literal["memory", "database"] = "memory"
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_KEYS: int = 100000
+    # Rows per server-side cursor batch for NDJSON poll exports (CSV exports use COPY)
+    POLL_EXPORT_BATCH_SIZE: int = 5000
+    # Poll search: results per page when no ``limit`` is given, and the largest allowed ``limit``
+    POLL_SEARCH_PAGE_SIZE: int = 20
+    POLL_SEARCH_MAX_PAGE_SIZE: int = 100
+    # Trending polls: decayed vote/like activity kept in memory
+    TRENDING_HALF_LIFE_SECONDS: float = 3600
+    TRENDING_VOTE_WEIGHT: float = 1.0
+    TRENDING_LIKE_WEIGHT: float = 2.0
+    TRENDING_TOP_K: int = 100
+    TRENDING_MAX_TRACKED: int = 50000
+
+    @field_validator("TRENDING_MAX_TRACKED")
+    @classmethod
+    def check_trending_capacity(cls, v: int, info: ValidationInfo) -> int:
+        # Pruning keeps the MAX_TRACKED // 2 best polls, which must still fill the top list
+        top_k = info.data.get("TRENDING_TOP_K")
+        if top_k is not None and top_k > v // 2:
+            raise ValueError(f"TRENDING_TOP_K ({top_k}) must not exceed TRENDING_MAX_TRACKED // 2 ({v // 2})")
+        return v
+
+    TRENDING_REBUILD_HALF_LIVES: float = 8
+    TRENDING_REBUILD_INTERVAL_SECONDS: int = 600
 
     @computed_field
     @property
@@ -115,6 +224,18 @@ class Settings(BaseSettings):
             )
         )
 
+    # Optional read replica; GET endpoints use it unless the user wrote within READ_YOUR_WRITES_SECONDS
+    READ_REPLICA_DATABASE_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    @computed_field
+    @property
+    def SQLALCHEMY_READ_DATABASE_URI(self) -> Optional[str]:
+        db_url = self.READ_REPLICA_DATABASE_URL
+        if db_url and db_url.startswith("postgresql://") and "+psycopg" not in db_url:
+            db_url = db_url.replace("postgresql://", "postgresql+psycopg://")
+        return db_url
+
     # Cookie
     COOKIE_KEY: Optional[str] = None
 
@@ -0,0 +1,54 @@
+"""Single-flight coalescing of identical read computations.
+
+When many clients ask for the same data at once (a popular poll just changed and every client
+refetches), only the first caller runs the computation; everyone who arrives while it is in
+flight awaits the same result. Nothing is cached: once the computation finishes the next caller
+starts a fresh one. A caller that joins still gets a result read when the computation started,
+so it can miss writes committed between then and its own arrival, including its own. Callers
+that must see their own writes (those pinned to the primary) pass ``coalesce=False``.
+
+The computation runs as its own task, so a caller that disconnects does not cancel it for the
+others. It must therefore open its own session instead of using the request's.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from core.metrics import single_flight_calls_total
+from core.settings import settings
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self):
+        self.in_flight: Dict[Tuple[Hashable, ...], asyncio.Task] = {}
+
+    def _finished(self, key: Tuple[Hashable, ...], task: asyncio.Task):
+        self.in_flight.pop(key, None)
+        if not task.cancelled():
+            # Retrieved so a failure whose callers all went away is not logged as never retrieved
+            task.exception()
+
+    async def do(self, key: Tuple[Hashable, ...], compute: Callable[[], Awaitable[T]], coalesce: bool = True) -> T:
+        """Result of ``compute()``, shared with every concurrent caller using the same ``key``.
+
+        ``key[0]`` names the computation in metrics; the rest must identify its inputs,
+        including which database it reads from. With ``coalesce=False`` the caller runs its own
+        computation and never joins one already in flight.
+        """
+        if not settings.SINGLE_FLIGHT_ENABLED or not coalesce:
+            return await compute()
+
+        task = self.in_flight.get(key)
+        if task is None:
+            single_flight_calls_total.labels(str(key[0]), "leader").inc()
+            task = asyncio.create_task(compute())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            single_flight_calls_total.labels(str(key[0]), "coalesced").inc()
+        # Shielded so one waiter being cancelled does not cancel the shared task
+        return await asyncio.shield(task)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,39 @@
+"""Pre-built statements for hot queries.
+
+Building a ``select()``/``update()`` and generating its cache key costs far more than
+executing an already built statement whose cache key is memoized, so the CRUD modules
+build their hot statements once at import time with ``bindparam`` placeholders.
+Statements registered with warm-up parameters are executed once at start-up so
+SQLAlchemy's compiled cache is populated before the first request.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.sql import Executable
+
+logger = logging.getLogger(__name__)
+
+WARMUP_STATEMENTS: List[Tuple[str, Executable, Dict[str, Any]]] = []
+
+
+def prebuilt(name: str, stmt: Executable, warmup_params: Optional[Dict[str, Any]] = None) -> Executable:
+    """Register a module-level statement; ``warmup_params`` opts a read-only statement into start-up warm-up."""
+    if warmup_params is not None:
+        WARMUP_STATEMENTS.append((name, stmt, warmup_params))
+    return stmt
+
+
+async def warm_up_compiled_cache(session_factory) -> int:
+    """Execute each registered statement once inside a rolled back transaction. Returns the number warmed."""
+    warmed = 0
+    async with session_factory() as session:
+        try:
+            for name, stmt, params in WARMUP_STATEMENTS:
+                await session.execute(stmt, params)
+                warmed += 1
+        except Exception as e:
+            logger.warning(f"Compiled cache warm-up stopped at {name}: {e}")
+        finally:
+            await session.rollback()
+    logger.info(f"Warmed compiled cache for {warmed}/{len(WARMUP_STATEMENTS)} statements")
+    return warmed
@@ -0,0 +1,170 @@
+"""In-memory trending polls: exponentially decayed vote and like activity with a maintained top-K.
+
+Each vote or like adds ``weight * 2 ** ((t - t0) / half_life)`` to its poll's score ("forward
+decay"). Every score decays at the same rate, so scores never have to be rewritten as time
+passes: an event only touches its own poll, and polls without new events keep their relative
+order. That makes the top-K list cheap to maintain incrementally: a poll can only enter it
+through its own event, so ``GET /poll/trending`` is a slice of an already sorted list.
+
+State is per process. It is rebuilt from the vote rollups at start-up and every
+``TRENDING_REBUILD_INTERVAL_SECONDS``, which also folds in votes handled by other workers.
+Likes have no timestamps in the database, so only locally seen likes count, and a rebuild
+carries their contribution over instead of recomputing it.
+"""
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Re-base the scores before 2 ** exponent gets anywhere near float overflow (2 ** 1024)
+_MAX_EXPONENT = 512
+
+
+class _Entry:
+    __slots__ = ("title", "score", "local_score")
+
+    def __init__(self, title: Optional[str], score: float, local_score: float = 0.0):
+        self.title = title
+        self.score = score
+        # The part of ``score`` that a rebuild from the database cannot recover (likes)
+        self.local_score = local_score
+
+
+class TrendingTracker:
+    def __init__(self, half_life_seconds: float, top_k: int, max_tracked: int):
+        self.half_life = half_life_seconds
+        self.top_k = top_k
+        self.max_tracked = max_tracked
+        self.t0 = time.time()
+        self.entries: Dict[UUID, _Entry] = {}
+        # Poll uuids by descending score; never longer than top_k
+        self.top: List[UUID] = []
+
+    def _growth(self, at: float) -> float:
+        return 2 ** ((at - self.t0) / self.half_life)
+
+    def _rebase(self, now: float):
+        factor = 1 / self._growth(now)
+        for entry in self.entries.values():
+            entry.score *= factor
+            entry.local_score *= factor
+        self.t0 = now
+
+    def _score_key(self, poll_uuid: UUID) -> float:
+        return self.entries[poll_uuid].score
+
+    def _rebuild_top(self):
+        self.top = heapq.nlargest(self.top_k, self.entries, key=self._score_key)
+
+    def _promote(self, poll_uuid: UUID, score: float):
+        if poll_uuid in self.top:
+            self.top.sort(key=self._score_key, reverse=True)
+        elif len(self.top) < self.top_k or score > self.entries[self.top[-1]].score:
+            self.top.append(poll_uuid)
+            self.top.sort(key=self._score_key, reverse=True)
+            del self.top[self.top_k:]
+
+    def _prune(self):
+        # Drop the weakest half; settings keep top_k within it, and the top list is rebuilt from what is kept
+        keep = heapq.nlargest(self.max_tracked // 2, self.entries, key=self._score_key)
+        self.entries = {poll_uuid: self.entries[poll_uuid] for poll_uuid in keep}
+        self._rebuild_top()
+
+    def record(
+        self,
+        poll_uuid: UUID,
+        weight: float,
+        title: Optional[str] = None,
+        at: Optional[float] = None,
+        rebuildable: bool = True
+    ):
+        """Add an event of ``weight`` for the poll at time ``at`` (defaults to now).
+
+        Pass ``rebuildable=False`` for events that ``replace`` will not see again, so it keeps them.
+        """
+        at = time.time() if at is None else at
+        if (at - self.t0) / self.half_life > _MAX_EXPONENT:
+            self._rebase(at)
+        entry = self.entries.get(poll_uuid)
+        if entry is None:
+            entry = self.entries[poll_uuid] = _Entry(title, 0.0)
+        elif title is not None:
+            entry.title = title
+        contribution = weight * self._growth(at)
+        entry.score += contribution
+        if not rebuildable:
+            entry.local_score += contribution
+        self._promote(poll_uuid, entry.score)
+        if len(self.entries) > self.max_tracked:
+            self._prune()
+
+    def set_title(self, poll_uuid: UUID, title: str):
+        entry = self.entries.get(poll_uuid)
+        if entry is not None:
+            entry.title = title
+
+    def forget(self, poll_uuid: UUID):
+        """Remove a deleted poll; the next best tracked poll moves into the top list."""
+        if self.entries.pop(poll_uuid, None) is not None and poll_uuid in self.top:
+            self._rebuild_top()
+
+    def replace(self, events: Iterable[Tuple[UUID, str, datetime, float]]):
+        """Reset the scores from ``(poll_uuid, title, timestamp, weight)`` events.
+
+        Contributions recorded with ``rebuildable=False`` are carried over, decayed to now.
+        """
+        now = time.time()
+        carry = 1 / self._growth(now)
+        previous = self.entries
+        self.t0 = now
+        self.entries = {
+            poll_uuid: _Entry(entry.title, entry.local_score * carry, entry.local_score * carry)
+            for poll_uuid, entry in previous.items()
+            if entry.local_score > 0
+        }
+        for poll_uuid, title, at, weight in events:
+            entry = self.entries.get(poll_uuid)
+            if entry is None:
+                entry = self.entries[poll_uuid] = _Entry(title, 0.0)
+            entry.score += weight * self._growth(at.timestamp())
+        if len(self.entries) > self.max_tracked:
+            self._prune()
+        self._rebuild_top()
+
+    def trending(self, limit: int) -> List[Tuple[UUID, Optional[str], float]]:
+        """The ``limit`` highest ``(poll_uuid, title, score)``, scores decayed to the current time."""
+        decay = 1 / self._growth(time.time())
+        return [
+            (poll_uuid, self.entries[poll_uuid].title, self.entries[poll_uuid].score * decay)
+            for poll_uuid in self.top[:limit]
+        ]
+
+
+trending_polls = TrendingTracker(
+    settings.TRENDING_HALF_LIFE_SECONDS, settings.TRENDING_TOP_K, settings.TRENDING_MAX_TRACKED
+)
+
+
+async def rebuild_trending(session_factory=None):
+    """Reload trending scores from the vote rollups of the last ``TRENDING_REBUILD_HALF_LIVES`` half-lives."""
+    from core.async_engine import AsyncSessionLocal
+    from crud.vote_rollup_crud import vote_rollup_crud as VoteRollupCrud
+
+    session_factory = session_factory or AsyncSessionLocal
+    window_seconds = settings.TRENDING_HALF_LIFE_SECONDS * settings.TRENDING_REBUILD_HALF_LIVES
+    started = time.monotonic()
+    async with session_factory() as session:
+        rows = await VoteRollupCrud.get_recent_poll_activity(session, window_seconds)
+    trending_polls.replace(
+        (row.poll_uuid, row.title, row.bucket_start, row.votes * settings.TRENDING_VOTE_WEIGHT) for row in rows
+    )
+    logger.info(
+        f"Rebuilt trending polls from {len(rows)} rollup buckets in {time.monotonic() - started:.3f}s; "
+        f"tracking {len(trending_polls.entries)} polls"
+    )
@@ -0,0 +1,84 @@
+from typing import List, Sequence
+
+from sqlalchemy import select, delete, insert, tuple_, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Poll, PollOptions, Vote, Like
+from models import PollArchive, PollOptionsArchive, VoteArchive, LikeArchive
+
+POLL_COLUMNS = ["id", "uuid", "title", "created_by", "likes", "vote_epoch", "version_id", "is_active", "created_at"]
+OPTION_COLUMNS = ["id", "uuid", "poll_id", "option_name", "votes", "version_id", "is_active", "created_at"]
+VOTE_COLUMNS = ["id", "uuid", "user_id", "poll_id", "option_id", "epoch", "created_at"]
+LIKE_COLUMNS = ["id", "uuid", "poll_id", "user_id", "is_active"]
+
+
+class ArchiveCrud:
+    """Moves rows out of the hot tables into their archive tables.
+
+    Each move is one ``WITH moved AS (DELETE ... RETURNING ...) INSERT INTO <archive>``
+    statement, so a row is always in exactly one of the two tables and an interrupted
+    run can simply be started again.
+    """
+
+    def __init__(self):
+        self.table = PollArchive
+
+    async def _move_rows(self, session: AsyncSession, model, archive_model, columns: List[str], key_columns, keys_stmt) -> int:
+        source = model.__table__
+        moved = (
+            delete(source)
+            .where(tuple_(*key_columns).in_(keys_stmt))
+            .returning(*(source.c[name] for name in columns))
+            .cte("moved")
+        )
+        stmt = (
+            insert(archive_model.__table__)
+            .from_select(columns, select(*(moved.c[name] for name in columns)))
+            .add_cte(moved)
+            # SQLAlchemy only keeps the row count of UPDATE and DELETE statements by default
+            .execution_options(preserve_rowcount=True)
+        )
+        result = await session.execute(stmt)
+        return result.rowcount
+
+    async def get_inactive_poll_ids(self, session: AsyncSession, after_id: int, limit: int) -> Sequence[int]:
+        stmt = (
+            select(Poll.id)
+            .where(Poll.is_active == False, Poll.id > after_id)
+            .order_by(Poll.id)
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    async def move_votes_for_polls(self, session: AsyncSession, poll_ids: Sequence[int], limit: int) -> int:
+        keys = select(Vote.poll_id, Vote.id).where(Vote.poll_id.in_(poll_ids)).limit(limit)
+        return await self._move_rows(session, Vote, VoteArchive, VOTE_COLUMNS, (Vote.poll_id, Vote.id), keys)
+
+    async def move_likes_for_polls(self, session: AsyncSession, poll_ids: Sequence[int], limit: int) -> int:
+        keys = select(Like.id).where(Like.poll_id.in_(poll_ids)).limit(limit)
+        return await self._move_rows(session, Like, LikeArchive, LIKE_COLUMNS, (Like.id,), keys)
+
+    async def move_options_for_polls(self, session: AsyncSession, poll_ids: Sequence[int], limit: int) -> int:
+        keys = select(PollOptions.id).where(PollOptions.poll_id.in_(poll_ids)).limit(limit)
+        return await self._move_rows(session, PollOptions, PollOptionsArchive, OPTION_COLUMNS, (PollOptions.id,), keys)
+
+    async def move_polls(self, session: AsyncSession, poll_ids: Sequence[int]) -> int:
+        """Move inactive polls; callers must have moved their votes, likes and options first."""
+        keys = select(Poll.id).where(Poll.id.in_(poll_ids), Poll.is_active == False)
+        return await self._move_rows(session, Poll, PollArchive, POLL_COLUMNS, (Poll.id,), keys)
+
+    async def move_unreferenced_inactive_options(self, session: AsyncSession, limit: int) -> int:
+        """Move soft-deleted options of live polls once no vote references them any more."""
+        keys = (
+            select(PollOptions.id)
+            .where(
+                PollOptions.is_active == False,
+                ~exists().where(Vote.poll_id == PollOptions.poll_id, Vote.option_id == PollOptions.id)
+            )
+            .limit(limit)
+        )
+        return await self._move_rows(session, PollOptions, PollOptionsArchive, OPTION_COLUMNS, (PollOptions.id,), keys)
+
+
+archive_crud = ArchiveCrud()
@@ -0,0 +1,52 @@
+from datetime import timedelta
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from models import IdempotencyKey
+
+
+class IdempotencyCrud:
+
+    def __init__(self):
+        self.table = IdempotencyKey
+
+    async def claim(self, session: AsyncSession, key: str, fingerprint: str, ttl_seconds: float) -> bool:
+        """Insert the key, or take over an expired one. Returns False if a live entry already exists."""
+        stmt = pg_insert(IdempotencyKey).values(key=key, fingerprint=fingerprint)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                "status_code": None,
+                "headers": None,
+                "body": None,
+                "created_at": func.now(),
+            },
+            where=IdempotencyKey.created_at < func.now() - timedelta(seconds=ttl_seconds),
+        ).returning(IdempotencyKey.id)
+        result = await session.execute(stmt)
+        return result.first() is not None
+
+    async def get(self, session: AsyncSession, key: str) -> Optional[IdempotencyKey]:
+        result = await session.execute(select(IdempotencyKey).where(IdempotencyKey.key == key))
+        return result.scalars().first()
+
+    async def complete(self, session: AsyncSession, key: str, status_code: int, headers: list, body: bytes) -> None:
+        await session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(status_code=status_code, headers=headers, body=body)
+        )
+
+    async def release(self, session: AsyncSession, key: str) -> None:
+        await session.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+
+    async def delete_expired(self, session: AsyncSession, ttl_seconds: float) -> int:
+        result = await session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.created_at < func.now() - timedelta(seconds=ttl_seconds))
+        )
+        return result.rowcount
+
+
+idempotency_crud = IdempotencyCrud()
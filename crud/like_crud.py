@@ -1,10 +1,33 @@
-from sqlalchemy import select, update, insert
+from sqlalchemy import select, update, insert, case, not_, func, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Sequence, Optional
+from typing import Sequence
+from core.statement_cache import prebuilt
 from models import Poll
 from models import Like
 
 
+_toggled = (
+    pg_insert(Like)
+    .values(user_id=bindparam("user_id"), poll_id=bindparam("poll_id"), is_active=True)
+    .on_conflict_do_update(
+        constraint="uq_likes_poll_user",
+        set_={"is_active": not_(Like.is_active)},
+    )
+    .returning(Like.poll_id, Like.is_active)
+    .cte("toggled")
+)
+_TOGGLE_LIKE = prebuilt(
+    "toggle_like",
+    update(Poll)
+    .where(Poll.id == _toggled.c.poll_id)
+    .values(likes=Poll.likes + case((_toggled.c.is_active, 1), else_=-1))
+    .returning(_toggled.c.is_active, Poll.likes, Poll.title)
+    .add_cte(_toggled)
+    .execution_options(synchronize_session=False),
+)
+
+
 class LikeCrud:
 
     def __init__(self):
@@ -15,28 +38,17 @@ class LikeCrud:
         result = await session.execute(stmt)
         return result.scalars().first()
     
-    async def toggle_like(self, session: AsyncSession, user_id: int, poll_id: int) -> tuple[bool, Optional[Like]]:
-        existing_like = await self.get_like(session, user_id, poll_id)
-        
-        if existing_like:
-            new_is_active = not existing_like.is_active
-            stmt = (
-                update(Like)
-                .where(
-                    Like.user_id == user_id,
-                    Like.poll_id == poll_id
-                )
-                .values(is_active=new_is_active)
-                .returning(Like)
-            )
-            result = await session.execute(stmt)
-            updated_like = result.scalars().first()
-            await session.flush()
-            return new_is_active, updated_like
-        else:
-            new_like = await self.create_like(session, user_id, poll_id, is_active=True)
-            await session.flush()
-            return True, new_like
+    async def toggle_like(self, session: AsyncSession, user_id: int, poll_id: int) -> tuple[bool, int, str]:
+        """Flip the user's like on a poll and adjust ``Poll.likes`` in a single statement.
+
+        The like row is upserted with ``is_active = NOT is_active`` and the counter is
+        bumped with ``likes = likes +/- 1`` from a data-modifying CTE, so concurrent toggles
+        never race on a read-modify-write and the poll's ``version_id`` is left untouched.
+        Returns the new like state, the poll's updated like count and its title.
+        """
+        result = await session.execute(_TOGGLE_LIKE, {"user_id": user_id, "poll_id": poll_id})
+        is_liked, likes, title = result.one()
+        return is_liked, likes, title
     
     async def get_like(self, session: AsyncSession, user_id: int, poll_id: int):
         stmt = select(Like).where(
@@ -61,9 +73,21 @@ class LikeCrud:
         return result.scalars().all()
     
     async def count_likes_by_poll(self, session: AsyncSession, poll_id: int) -> int:
-        stmt = select(Like).where(Like.poll_id == poll_id, Like.is_active == True)
+        stmt = select(func.count()).select_from(Like).where(Like.poll_id == poll_id, Like.is_active == True)
+        result = await session.execute(stmt)
+        return result.scalar_one()
+    
+    async def count_likes_by_polls(self, session: AsyncSession, poll_ids: Sequence[int]) -> dict[int, int]:
+        """Active like counts for several polls in one grouped query. Polls without likes are omitted."""
+        if not poll_ids:
+            return {}
+        stmt = (
+            select(Like.poll_id, func.count().label("count"))
+            .where(Like.poll_id.in_(poll_ids), Like.is_active == True)
+            .group_by(Like.poll_id)
+        )
         result = await session.execute(stmt)
-        return len(result.scalars().all())
+        return {row.poll_id: row.count for row in result}
     
     async def get_liked_polls_by_user(self, session: AsyncSession, user_id: int):
         stmt = select(Poll.uuid).join(
@@ -1,11 +1,54 @@
-from typing import Sequence, Optional, Dict, Any
+from typing import Sequence, Optional, Dict, Any, List, Tuple
 from uuid import UUID
-from sqlalchemy import insert, update, select
+from sqlalchemy import insert, update, select, func, bindparam, literal, tuple_, any_, Float, Integer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import contains_eager
-from models import Poll, PollOptions
+from core.statement_cache import prebuilt
+from crud.poll_search_crud import search_terms
+from models import Poll, PollOptions, Like, PollSearchTerm
 from models import UserModel
-from schemas.poll_schema import PollOptionSchema
+from schemas.poll_schema import PollOptionSchema, PollResponseWithVersionId, PollSummaryData
+
+
+_SELECT_POLL_BY_UUID = prebuilt(
+    "poll_by_uuid",
+    select(Poll)
+    .outerjoin(PollOptions, (Poll.id == PollOptions.poll_id) & (PollOptions.is_active == True))
+    .where(Poll.uuid == bindparam("poll_uuid"), Poll.is_active == True)
+    .options(contains_eager(Poll.poll_options)),
+    {"poll_uuid": UUID(int=0)},
+)
+
+_SELECT_POLL_WITH_CREATOR_BY_UUID = prebuilt(
+    "poll_with_creator_by_uuid",
+    select(Poll, UserModel.uuid.label("created_by_uuid"))
+    .join(UserModel, UserModel.id == Poll.created_by)
+    .outerjoin(PollOptions, (Poll.id == PollOptions.poll_id) & (PollOptions.is_active == True))
+    .where(Poll.uuid == bindparam("poll_uuid"), Poll.is_active == True)
+    .options(contains_eager(Poll.poll_options)),
+    {"poll_uuid": UUID(int=0)},
+)
+
+_SELECT_ACTIVE_POLL_ID_BY_UUID = prebuilt(
+    "active_poll_id_by_uuid",
+    select(Poll.id).where(Poll.uuid == bindparam("poll_uuid"), Poll.is_active == True),
+    {"poll_uuid": UUID(int=0)},
+)
+
+_SELECT_ALL_ACTIVE_POLLS = prebuilt(
+    "all_active_polls",
+    select(Poll)
+    .outerjoin(PollOptions, (Poll.id == PollOptions.poll_id) & (PollOptions.is_active == True))
+    .where(Poll.is_active == True)
+    .options(contains_eager(Poll.poll_options))
+    .order_by(Poll.created_at.desc()),
+)
+
+_SELECT_USER_UUID_BY_ID = prebuilt(
+    "user_uuid_by_id",
+    select(UserModel.uuid).where(UserModel.id == bindparam("user_id")),
+    {"user_id": 0},
+)
 
 
 class PollCrud:
@@ -18,24 +61,15 @@ class PollCrud:
         return result.scalars().first()
 
     async def get_poll_by_uuid(self, session: AsyncSession, poll_uuid: UUID) -> Optional[Poll]:
-        stmt = (
-            select(Poll)
-            .outerjoin(PollOptions, (Poll.id == PollOptions.poll_id) & (PollOptions.is_active == True))
-            .where(Poll.uuid == poll_uuid, Poll.is_active == True)
-            .options(contains_eager(Poll.poll_options))
-        )
-        result = await session.execute(stmt)
+        result = await session.execute(_SELECT_POLL_BY_UUID, {"poll_uuid": poll_uuid})
         return result.scalars().unique().first()
 
+    async def get_active_poll_id_by_uuid(self, session: AsyncSession, poll_uuid: UUID) -> Optional[int]:
+        result = await session.execute(_SELECT_ACTIVE_POLL_ID_BY_UUID, {"poll_uuid": poll_uuid})
+        return result.scalar_one_or_none()
+
     async def get_all_active_polls(self, session: AsyncSession) -> Sequence[Poll]:
-        stmt = (
-            select(Poll)
-            .outerjoin(PollOptions, (Poll.id == PollOptions.poll_id) & (PollOptions.is_active == True))
-            .where(Poll.is_active == True)
-            .options(contains_eager(Poll.poll_options))
-            .order_by(Poll.created_at.desc())
-        )
-        result = await session.execute(stmt)
+        result = await session.execute(_SELECT_ALL_ACTIVE_POLLS)
         return result.scalars().unique().all()
 
     async def update_poll(self, session: AsyncSession, poll_id: int, poll_data: dict) -> Poll:
@@ -48,61 +82,182 @@ class PollCrud:
         result = await session.execute(stmt)
         return result.scalars().first()
     
-    async def get_creator_uuid(self, session: AsyncSession, created_by: int) -> Optional[UUID]:
-        creator_result = await session.execute(
-            select(UserModel).where(UserModel.id == created_by)
+    async def get_poll_likes_batch(self, session: AsyncSession, after_id: int, limit: int) -> Sequence[Any]:
+        """Return ``(id, likes)`` rows for the next ``limit`` polls with ``id > after_id``."""
+        stmt = select(Poll.id, Poll.likes).where(Poll.id > after_id).order_by(Poll.id).limit(limit)
+        result = await session.execute(stmt)
+        return result.all()
+
+    async def recount_likes(self, session: AsyncSession, poll_ids: Sequence[int]) -> int:
+        """Reset ``Poll.likes`` from the likes table for the given polls without bumping ``version_id``."""
+        if not poll_ids:
+            return 0
+        active_likes = (
+            select(func.count())
+            .select_from(Like)
+            .where(Like.poll_id == Poll.id, Like.is_active == True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Poll)
+            .where(Poll.id.in_(poll_ids))
+            .values(likes=active_likes)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        return result.rowcount
+
+    async def stream_active_polls(self, session: AsyncSession, batch_size: int):
+        """Active polls, newest first, through a server-side cursor in ``batch_size`` partitions.
+
+        Options are not eagerly loaded because joined collections cannot be streamed.
+        """
+        stmt = (
+            select(Poll)
+            .where(Poll.is_active == True)
+            .order_by(Poll.created_at.desc())
+            .execution_options(yield_per=batch_size)
+        )
+        result = await session.stream(stmt)
+        async for partition in result.scalars().partitions():
+            yield partition
+
+    async def search_active_polls(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[Tuple[Poll, float]]:
+        """Active polls whose title or active option names contain any word of ``query``.
+
+        Words are matched whole, case-insensitively, through the ``poll_search_terms`` postings.
+        A poll's rank is the sum of its matched words' weights (``TITLE_WEIGHT`` for a title word,
+        ``OPTION_WEIGHT`` for one only in option names), so polls matching more of the query come
+        first. Results are ordered by ``(rank, id)`` descending and ``after`` is the last
+        ``(rank, id)`` of the previous page (keyset pagination).
+
+        Ranking reads only the term index (an index-only scan of each query word's postings), and
+        only the ``limit`` polls returned are loaded.
+        """
+        rank = func.sum(PollSearchTerm.weight)
+        matches = (
+            select(PollSearchTerm.poll_id, rank.label("rank"))
+            .where(PollSearchTerm.term == any_(search_terms(query)))
+            .group_by(PollSearchTerm.poll_id)
+        )
+        if after is not None:
+            after_key = tuple_(literal(after[0], Float), literal(after[1], Integer))
+            matches = matches.having(tuple_(rank, PollSearchTerm.poll_id) < after_key)
+        matches = matches.order_by(rank.desc(), PollSearchTerm.poll_id.desc()).limit(limit).subquery()
+
+        result = await session.execute(
+            select(Poll, matches.c.rank)
+            .join(matches, matches.c.poll_id == Poll.id)
+            .where(Poll.is_active == True)
+            .order_by(matches.c.rank.desc(), Poll.id.desc())
         )
-        creator = creator_result.scalars().first()
-        return creator.uuid if creator else None
+        return [(row[0], row[1]) for row in result]
+
+    async def get_creator_uuids(self, session: AsyncSession, user_ids: Sequence[int]) -> Dict[int, UUID]:
+        if not user_ids:
+            return {}
+        result = await session.execute(select(UserModel.id, UserModel.uuid).where(UserModel.id.in_(set(user_ids))))
+        return {row.id: row.uuid for row in result}
+
+    async def get_creator_uuid(self, session: AsyncSession, created_by: int) -> Optional[UUID]:
+        creator_result = await session.execute(_SELECT_USER_UUID_BY_ID, {"user_id": created_by})
+        return creator_result.scalar_one_or_none()
     
     async def build_poll_response_data(
         self, 
         session: AsyncSession, 
         poll: Poll,
         current_user_uuid: Optional[UUID] = None
-    ) -> Dict[str, Any]:
+    ) -> PollResponseWithVersionId:
         from crud.vote_crud import vote_crud as VoteCrud
-        from schemas.poll_schema import PollSummaryData
 
         if current_user_uuid is None:
             current_user_uuid = await self.get_creator_uuid(session, poll.created_by)
         
         # Get actual vote counts from the Vote table
-        vote_counts = await VoteCrud.get_vote_counts_by_poll(session, poll.id)
+        vote_counts = await VoteCrud.get_vote_counts_by_poll(session, poll.id, poll.vote_epoch)
         
-        # Sort options by id (ascending order) and build options list with actual vote counts
-        sorted_options = sorted(poll.poll_options, key=lambda opt: opt.id)
-        options_list = []
-        for opt in sorted_options:
-            option_data = PollOptionSchema.model_validate(opt).model_dump(mode="json")
-            # Replace the stored votes field with actual vote count from Vote table
-            option_data["votes"] = vote_counts.get(opt.id, 0)
-            options_list.append(option_data)
+        return self.build_poll_response(poll, poll.poll_options, current_user_uuid, vote_counts)
+
+    async def get_poll_response_by_uuid(
+        self, session: AsyncSession, poll_uuid: UUID
+    ) -> Optional[PollResponseWithVersionId]:
+        """One active poll with its creator and current vote counts in two queries, or None."""
+        from crud.vote_crud import vote_crud as VoteCrud
+
+        result = await session.execute(_SELECT_POLL_WITH_CREATOR_BY_UUID, {"poll_uuid": poll_uuid})
+        row = result.unique().first()
+        if row is None:
+            return None
+        poll, created_by_uuid = row
+        vote_counts = await VoteCrud.get_vote_counts_by_poll(session, poll.id, poll.vote_epoch)
+        return self.build_poll_response(poll, poll.poll_options, created_by_uuid, vote_counts)
+
+    async def build_poll_responses(self, session: AsyncSession, polls: Sequence[Poll]) -> List[PollResponseWithVersionId]:
+        """Responses for several polls with one query each for options, vote counts and creators."""
+        from crud.poll_option_crud import poll_option_crud as PollOptionCrud
+        from crud.vote_crud import vote_crud as VoteCrud
+
+        options_by_poll = await PollOptionCrud.get_active_options_by_poll_ids(session, [poll.id for poll in polls])
+        counts_by_poll = await VoteCrud.get_vote_counts_by_polls(session, {poll.id: poll.vote_epoch for poll in polls})
+        creators = await self.get_creator_uuids(session, [poll.created_by for poll in polls])
+        return [
+            self.build_poll_response(
+                poll, options_by_poll[poll.id], creators.get(poll.created_by), counts_by_poll[poll.id]
+            )
+            for poll in polls
+        ]
+
+    def build_poll_response(
+        self,
+        poll: Poll,
+        poll_options: Sequence[PollOptions],
+        created_by_uuid: UUID,
+        vote_counts: Dict[int, int]
+    ) -> PollResponseWithVersionId:
+        """Build a poll response from rows already in memory without touching the database.
+
+        The values come straight from typed database columns, so the models are constructed
+        without validation; serialize the result once with ``poll_response_adapter``.
+        """
+        from crud.vote_crud import vote_crud as VoteCrud
+
+        # Sort options by id (ascending order) and use the actual vote counts from the Vote table
+        sorted_options = sorted(poll_options, key=lambda opt: opt.id)
+        options_list = [
+            PollOptionSchema.model_construct(
+                option_name=opt.option_name,
+                votes=vote_counts.get(opt.id, 0),
+                uuid=opt.uuid,
+                version_id=opt.version_id,
+                created_at=opt.created_at,
+            )
+            for opt in sorted_options
+        ]
         
         # Calculate vote summary (total votes and percentages)
-        total_votes, option_percentages = await VoteCrud.get_vote_percentages(
-            session, poll.id, poll.poll_options
-        )
-        
-        response_dict = {
-            "uuid": poll.uuid,
-            "title": poll.title,
-            "likes": poll.likes,
-            "created_at": poll.created_at,
-            "version_id": poll.version_id,
-            "created_by_uuid": current_user_uuid,
-            "options": options_list
-        }
+        total_votes, option_percentages = VoteCrud.calculate_vote_percentages(vote_counts, poll_options)
         
-        # Only include summary if there are votes
-        if total_votes > 0:
-            summary = PollSummaryData(
+        return PollResponseWithVersionId.model_construct(
+            uuid=poll.uuid,
+            title=poll.title,
+            likes=poll.likes,
+            created_at=poll.created_at,
+            version_id=poll.version_id,
+            created_by_uuid=created_by_uuid,
+            options=options_list,
+            # Only include summary if there are votes
+            summary=PollSummaryData.model_construct(
                 total_votes=total_votes,
                 option_percentages=option_percentages
-            )
-            response_dict["summary"] = summary.model_dump()
-        
-        return response_dict
+            ) if total_votes > 0 else None,
+        )
 
 
 poll_crud = PollCrud()
\ No newline at end of file
@@ -1,10 +1,29 @@
 from typing import List, Sequence, Dict
+from uuid import UUID
 
-from sqlalchemy import insert, delete, update, select, case
+from sqlalchemy import insert, delete, update, select, case, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.statement_cache import prebuilt
 from models import PollOptions
 
+_SELECT_ACTIVE_OPTION_BY_UUID_AND_POLL_ID = prebuilt(
+    "active_option_by_uuid_and_poll_id",
+    select(PollOptions)
+    .where(PollOptions.uuid == bindparam("option_uuid"))
+    .where(PollOptions.poll_id == bindparam("poll_id"))
+    .where(PollOptions.is_active == True),
+    {"option_uuid": UUID(int=0), "poll_id": 0},
+)
+
+_SELECT_ACTIVE_OPTIONS_BY_POLL_ID = prebuilt(
+    "active_options_by_poll_id",
+    select(PollOptions)
+    .where(PollOptions.poll_id == bindparam("poll_id"))
+    .where(PollOptions.is_active == True),
+    {"poll_id": 0},
+)
+
 class PollOptionCrud:
     def __init__(self):
         self.table = PollOptions
@@ -31,6 +50,8 @@ class PollOptionCrud:
             .values(option_name=case_stmt,
                     version_id = PollOptions.version_id+1)
             .returning(PollOptions)
+            # Refresh the options already loaded in the session so callers can reuse them
+            .execution_options(populate_existing=True)
         )
         
         result = await session.execute(stmt)
@@ -79,25 +100,25 @@ class PollOptionCrud:
         poll_id: int
     ) -> PollOptions:
         """Get an active option by its UUID that belongs to a specific poll."""
-        from uuid import UUID
-        
-        uuid_obj = UUID(option_uuid)
-        stmt = (
-            select(PollOptions)
-            .where(PollOptions.uuid == uuid_obj)
-            .where(PollOptions.poll_id == poll_id)
-            .where(PollOptions.is_active == True)
+        result = await session.execute(
+            _SELECT_ACTIVE_OPTION_BY_UUID_AND_POLL_ID,
+            {"option_uuid": UUID(option_uuid), "poll_id": poll_id}
         )
-        result = await session.execute(stmt)
         return result.scalars().first()
     
-    async def get_active_options_by_poll_id(self, session: AsyncSession, poll_id: int) -> Sequence[PollOptions]:
-        stmt = (
-            select(PollOptions)
-            .where(PollOptions.poll_id == poll_id)
-            .where(PollOptions.is_active == True)
-        )
+    async def get_active_options_by_poll_ids(self, session: AsyncSession, poll_ids: Sequence[int]) -> Dict[int, List[PollOptions]]:
+        """Active options for several polls in one query, grouped by poll id."""
+        options_by_poll: Dict[int, List[PollOptions]] = {poll_id: [] for poll_id in poll_ids}
+        if not poll_ids:
+            return options_by_poll
+        stmt = select(PollOptions).where(PollOptions.poll_id.in_(poll_ids), PollOptions.is_active == True)
         result = await session.execute(stmt)
+        for option in result.scalars():
+            options_by_poll[option.poll_id].append(option)
+        return options_by_poll
+
+    async def get_active_options_by_poll_id(self, session: AsyncSession, poll_id: int) -> Sequence[PollOptions]:
+        result = await session.execute(_SELECT_ACTIVE_OPTIONS_BY_POLL_ID, {"poll_id": poll_id})
         return result.scalars().all()
     
     async def validate_option_uuids_belong_to_poll(
@@ -117,17 +138,29 @@ class PollOptionCrud:
         session: AsyncSession, 
         poll_id: int, 
         option_uuids: List[str]
-    ) -> int:
-        active_options = await self.get_active_options_by_poll_id(session, poll_id)
-        valid_option_uuids = [str(opt.uuid) for opt in active_options]
-        requested_uuids = [str(uuid) for uuid in option_uuids]
-        
-        valid_requested_uuids = [uuid for uuid in requested_uuids if uuid in valid_option_uuids]
-        
-        if not valid_requested_uuids:
-            return 0
-        
-        return await self.soft_delete_options_by_uuids(session, valid_requested_uuids)
+    ) -> Sequence[int]:
+        """Soft delete the given options if they are active and belong to the poll.
+
+        Returns the ids of the options that were deleted; UUIDs that don't match an
+        active option of this poll are ignored.
+        """
+        from uuid import UUID
+
+        uuid_objects = [uuid if isinstance(uuid, UUID) else UUID(uuid) for uuid in option_uuids]
+        if not uuid_objects:
+            return []
+
+        stmt = (
+            update(PollOptions)
+            .where(PollOptions.poll_id == poll_id)
+            .where(PollOptions.is_active == True)
+            .where(PollOptions.uuid.in_(uuid_objects))
+            .values(is_active=False)
+            .returning(PollOptions.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
 
 
 poll_option_crud = PollOptionCrud()
@@ -0,0 +1,83 @@
+from typing import Optional
+from sqlalchemy import select, delete, func, exists, literal, literal_column, union_all, Float
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Poll, PollOptions, PollSearchTerm
+
+# Text search configuration for both indexed text and queries: lower-cased words, no stemming
+# or stop words, so it suits poll text in any language
+SEARCH_CONFIG = "simple"
+# ts_rank's default weights for 'A' and 'B' labelled words
+TITLE_WEIGHT = 1.0
+OPTION_WEIGHT = 0.4
+
+
+def search_terms(text):
+    """The distinct words of ``text`` as search terms, as an array."""
+    # The configuration is a constant, so it goes into the SQL rather than a regconfig parameter
+    return func.tsvector_to_array(func.to_tsvector(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), text))
+
+
+def _postings(poll_id: Optional[int]):
+    """``(poll_id, term, weight)`` for every word of active polls, or of one poll if ``poll_id`` is given."""
+    title_terms = select(
+        Poll.id.label("poll_id"),
+        func.unnest(search_terms(Poll.title)).label("term"),
+        literal(TITLE_WEIGHT, Float).label("weight")
+    ).where(Poll.is_active == True)
+    option_terms = (
+        select(
+            PollOptions.poll_id,
+            func.unnest(search_terms(PollOptions.option_name)),
+            literal(OPTION_WEIGHT, Float)
+        )
+        .join(Poll, (Poll.id == PollOptions.poll_id) & (Poll.is_active == True))
+        .where(PollOptions.is_active == True)
+    )
+    if poll_id is not None:
+        title_terms = title_terms.where(Poll.id == poll_id)
+        option_terms = option_terms.where(PollOptions.poll_id == poll_id)
+    words = union_all(title_terms, option_terms).subquery()
+    # A word in both the title and an option counts once, at the title's weight
+    return select(words.c.poll_id, words.c.term, func.max(words.c.weight).label("weight")).group_by(
+        words.c.poll_id, words.c.term
+    )
+
+
+class PollSearchCrud:
+    """Maintains ``poll_search_terms``, the word -> poll postings that poll search reads."""
+
+    def __init__(self):
+        self.table = PollSearchTerm
+
+    def _upsert(self, postings):
+        stmt = pg_insert(PollSearchTerm).from_select(["poll_id", "term", "weight"], postings)
+        return stmt.on_conflict_do_update(
+            constraint="poll_search_terms_pkey",
+            set_={"weight": stmt.excluded.weight},
+        )
+
+    async def index_poll(self, session: AsyncSession, poll_id: int) -> None:
+        """Bring the poll's search terms in line with its title and active options, in one statement.
+
+        Run after any change to those (or to ``is_active``), in the same transaction, so search
+        never returns text a poll no longer has. A deleted poll ends up with no terms at all.
+        """
+        fresh = _postings(poll_id).cte("fresh")
+        upserted = self._upsert(select(fresh)).cte("upserted")
+        stmt = (
+            delete(PollSearchTerm)
+            .where(
+                PollSearchTerm.poll_id == poll_id,
+                ~exists().where(fresh.c.term == PollSearchTerm.term)
+            )
+            .add_cte(upserted)
+        )
+        await session.execute(stmt)
+
+    async def index_all_polls(self, session: AsyncSession) -> None:
+        """Add or update the search terms of every active poll; for rows written without the API (seeding)."""
+        await session.execute(self._upsert(_postings(None)))
+
+
+poll_search_crud = PollSearchCrud()
@@ -1,9 +1,24 @@
 from typing import Optional
-from sqlalchemy import select
+from uuid import UUID
+from sqlalchemy import select, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.user_model import UserModel
 from core.auth import get_password_hash
+from core.statement_cache import prebuilt
+
+
+_SELECT_USER_BY_EMAIL = prebuilt(
+    "user_by_email",
+    select(UserModel).where(UserModel.email == bindparam("email")),
+    {"email": ""},
+)
+
+_SELECT_USER_BY_UUID = prebuilt(
+    "user_by_uuid",
+    select(UserModel).where(UserModel.uuid == bindparam("user_uuid")),
+    {"user_uuid": UUID(int=0)},
+)
 
 
 class UserCrud:
@@ -20,8 +35,7 @@ class UserCrud:
         return user
     
     async def get_user_by_email(self, session: AsyncSession, email: str) -> Optional[UserModel]:
-        stmt = select(UserModel).where(UserModel.email == email)
-        result = await session.execute(stmt)
+        result = await session.execute(_SELECT_USER_BY_EMAIL, {"email": email})
         return result.scalars().first()
     
     async def get_user_by_id(self, session: AsyncSession, user_id: int) -> Optional[UserModel]:
@@ -30,8 +44,7 @@ class UserCrud:
         return result.scalars().first()
     
     async def get_user_by_uuid(self, session: AsyncSession, user_uuid) -> Optional[UserModel]:
-        stmt = select(UserModel).where(UserModel.uuid == user_uuid)
-        result = await session.execute(stmt)
+        result = await session.execute(_SELECT_USER_BY_UUID, {"user_uuid": user_uuid})
         return result.scalars().first()
 
 
@@ -1,46 +1,120 @@
-from sqlalchemy import select, delete, insert, func
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Sequence, List
+from sqlalchemy import select, delete, insert, func, tuple_, bindparam
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from typing import AsyncIterator, Sequence, List, Optional, Dict, Tuple
+from uuid import UUID
+from core.statement_cache import prebuilt
 from models import Vote
-from models import Poll, PollOptions
-from sqlalchemy.orm import selectinload
+from models import Poll, PollOptions, UserModel
+from schemas.poll_schema import PollSummaryResponse
 from schemas.user_schema import VotedPollInfo
 
 
+_CURRENT_EPOCH = select(Poll.vote_epoch).where(Poll.id == bindparam("poll_id")).scalar_subquery()
+
+_INSERT_VOTE = prebuilt(
+    "insert_vote",
+    insert(Vote).values(
+        user_id=bindparam("user_id"),
+        poll_id=bindparam("poll_id"),
+        option_id=bindparam("option_id"),
+        epoch=_CURRENT_EPOCH
+    ).returning(Vote),
+)
+
+_DELETE_USER_VOTE = prebuilt(
+    "delete_user_vote",
+    delete(Vote)
+    .where(Vote.user_id == bindparam("user_id"), Vote.poll_id == bindparam("poll_id"))
+    .returning(Vote.option_id, Vote.epoch, Vote.created_at),
+)
+
+_SELECT_VOTE_COUNTS = prebuilt(
+    "vote_counts",
+    select(Vote.option_id, func.count(Vote.option_id).label("count"))
+    .where(Vote.poll_id == bindparam("poll_id"), Vote.epoch == bindparam("epoch"))
+    .group_by(Vote.option_id),
+    {"poll_id": 0, "epoch": 1},
+)
+
+_SELECT_CURRENT_EPOCH_VOTE_COUNTS = prebuilt(
+    "current_epoch_vote_counts",
+    select(Vote.option_id, func.count(Vote.option_id).label("count"))
+    .where(Vote.poll_id == bindparam("poll_id"), Vote.epoch == _CURRENT_EPOCH)
+    .group_by(Vote.option_id),
+    {"poll_id": 0},
+)
+
+# One row per active option with its current-epoch vote count; a single row with a NULL option
+# id when the poll has no active options, and no rows when the poll does not exist
+_SELECT_POLL_SUMMARY = prebuilt(
+    "poll_summary",
+    select(PollOptions.id, PollOptions.uuid, func.count(Vote.option_id).label("count"))
+    .select_from(Poll)
+    .outerjoin(PollOptions, (PollOptions.poll_id == Poll.id) & (PollOptions.is_active == True))
+    .outerjoin(
+        Vote,
+        (Vote.poll_id == Poll.id) & (Vote.epoch == Poll.vote_epoch) & (Vote.option_id == PollOptions.id),
+    )
+    .where(Poll.uuid == bindparam("poll_uuid"), Poll.is_active == True)
+    .group_by(PollOptions.id, PollOptions.uuid)
+    .order_by(PollOptions.id),
+    {"poll_uuid": UUID(int=0)},
+)
+
+
 class VoteCrud:
 
     def __init__(self):
         self.table = Vote
     
+    def current_epoch(self, poll_id: int):
+        """Scalar subquery for the poll's current vote epoch."""
+        return select(Poll.vote_epoch).where(Poll.id == poll_id).scalar_subquery()
+    
     async def create_vote(self, session: AsyncSession, user_id: int, poll_id: int, option_id: int) -> Vote:
-        stmt = insert(Vote).values(
-            user_id=user_id,
-            poll_id=poll_id,
-            option_id=option_id
-        ).returning(Vote)
-        result = await session.execute(stmt)
+        result = await session.execute(
+            _INSERT_VOTE,
+            {"user_id": user_id, "poll_id": poll_id, "option_id": option_id}
+        )
         return result.scalars().first()
     
     async def delete_vote(self, session: AsyncSession, user_id: int, poll_id: int) -> bool:
-        stmt = delete(Vote).where(
-            Vote.user_id == user_id,
-            Vote.poll_id == poll_id
-        )
-        result = await session.execute(stmt)
-        return result.rowcount > 0
+        return bool(await self._delete_user_votes(session, user_id, poll_id))
+
+    async def _delete_user_votes(self, session: AsyncSession, user_id: int, poll_id: int) -> list:
+        """Delete the user's votes on the poll (any epoch) and return their ``(option_id, epoch, created_at)`` rows."""
+        result = await session.execute(_DELETE_USER_VOTE, {"user_id": user_id, "poll_id": poll_id})
+        return result.all()
     
     async def delete_all_votes_for_poll(self, session: AsyncSession, poll_id: int) -> int:
-        """Delete all votes for a specific poll. Returns number of votes deleted."""
+        """Delete all votes for a specific poll. Returns number of votes deleted.
+
+        Routes reset votes by bumping ``Poll.vote_epoch`` instead; this is kept for maintenance use.
+        """
         stmt = delete(Vote).where(Vote.poll_id == poll_id)
         result = await session.execute(stmt)
         return result.rowcount
     
+    async def delete_stale_votes(self, session: AsyncSession, limit: int) -> int:
+        """Delete up to ``limit`` votes left over from earlier epochs. Returns number of votes deleted."""
+        stale_keys = (
+            select(Vote.poll_id, Vote.id)
+            .join(Poll, (Poll.id == Vote.poll_id) & (Vote.epoch < Poll.vote_epoch))
+            .where(Poll.vote_epoch > 1)
+            .limit(limit)
+        )
+        # Match on the full (poll_id, id) primary key so each delete is routed to its partition
+        stmt = delete(Vote).where(tuple_(Vote.poll_id, Vote.id).in_(stale_keys))
+        result = await session.execute(stmt)
+        return result.rowcount
+    
     async def has_votes_for_options(self, session: AsyncSession, poll_id: int, option_ids: List[int]) -> bool:
         """Check if any of the given options have votes."""
         if not option_ids:
             return False
         stmt = select(func.count(Vote.option_id)).where(
             Vote.poll_id == poll_id,
+            Vote.epoch == self.current_epoch(poll_id),
             Vote.option_id.in_(option_ids)
         )
         result = await session.execute(stmt)
@@ -50,36 +124,109 @@ class VoteCrud:
     async def get_vote(self, session: AsyncSession, user_id: int, poll_id: int):
         stmt = select(Vote).where(
             Vote.user_id == user_id,
-            Vote.poll_id == poll_id
+            Vote.poll_id == poll_id,
+            Vote.epoch == self.current_epoch(poll_id)
         )
         result = await session.execute(stmt)
         return result.scalars().first()
     
     async def get_votes_by_poll(self, session: AsyncSession, poll_id: int) -> Sequence[Vote]:
-        stmt = select(Vote).where(Vote.poll_id == poll_id)
+        stmt = select(Vote).where(Vote.poll_id == poll_id, Vote.epoch == self.current_epoch(poll_id))
         result = await session.execute(stmt)
         return result.scalars().all()
     
-    async def get_vote_counts_by_poll(self, session: AsyncSession, poll_id: int) -> dict:
+    def _export_select(self, poll_id: int, epoch: int):
+        # No ORDER BY: sorting millions of votes would delay the first byte until the sort finished
+        return (
+            select(
+                PollOptions.uuid.label("option_uuid"),
+                PollOptions.option_name,
+                UserModel.uuid.label("voter_uuid"),
+                Vote.created_at.label("voted_at")
+            )
+            .select_from(Vote)
+            .join(PollOptions, PollOptions.id == Vote.option_id)
+            .join(UserModel, UserModel.id == Vote.user_id)
+            .where(Vote.poll_id == poll_id, Vote.epoch == epoch)
+        )
+
+    async def copy_votes_csv(self, connection: AsyncConnection, poll_id: int, epoch: int) -> AsyncIterator[bytes]:
+        """Stream the votes of one epoch as CSV (with a header row) using ``COPY ... TO STDOUT``.
+
+        Postgres formats the rows itself and psycopg hands the chunks straight through, so no
+        row objects are created in Python and memory stays flat at any poll size.
+        """
+        compiled = self._export_select(poll_id, epoch).compile(dialect=connection.dialect)
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        async with driver_connection.cursor() as cursor:
+            async with cursor.copy(f"COPY ({compiled}) TO STDOUT WITH (FORMAT csv, HEADER)", compiled.params) as copy:
+                async for chunk in copy:
+                    yield bytes(chunk)
+
+    async def stream_votes_for_export(
+        self, session: AsyncSession, poll_id: int, epoch: int, batch_size: int
+    ) -> AsyncIterator[Sequence]:
+        """The votes of one epoch in ``batch_size`` partitions through a server-side cursor."""
+        stmt = self._export_select(poll_id, epoch).execution_options(yield_per=batch_size)
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+
+    async def get_vote_counts_by_poll(self, session: AsyncSession, poll_id: int, epoch: Optional[int] = None) -> dict:
+        """Vote counts per option for the poll's current epoch (or ``epoch`` when the caller already knows it)."""
+        if epoch is None:
+            result = await session.execute(_SELECT_CURRENT_EPOCH_VOTE_COUNTS, {"poll_id": poll_id})
+        else:
+            result = await session.execute(_SELECT_VOTE_COUNTS, {"poll_id": poll_id, "epoch": epoch})
+        return {row.option_id: row.count for row in result}
+    
+    async def get_vote_counts_by_polls(self, session: AsyncSession, epochs_by_poll: Dict[int, int]) -> Dict[int, Dict[int, int]]:
+        """Vote counts per option for several polls at once; ``epochs_by_poll`` maps poll id to its vote epoch."""
+        counts: Dict[int, Dict[int, int]] = {poll_id: {} for poll_id in epochs_by_poll}
+        if not epochs_by_poll:
+            return counts
         stmt = select(
+            Vote.poll_id,
             Vote.option_id,
             func.count(Vote.option_id).label("count")
         ).where(
-            Vote.poll_id == poll_id
-        ).group_by(Vote.option_id)
-        
+            tuple_(Vote.poll_id, Vote.epoch).in_(list(epochs_by_poll.items()))
+        ).group_by(Vote.poll_id, Vote.option_id)
         result = await session.execute(stmt)
-        return {row.option_id: row.count for row in result}
-    
+        for row in result:
+            counts[row.poll_id][row.option_id] = row.count
+        return counts
+
+    async def get_poll_summary(self, session: AsyncSession, poll_uuid: UUID) -> Optional[PollSummaryResponse]:
+        """Total votes and per-option percentages and counts for an active poll in one query, or None."""
+        rows = (await session.execute(_SELECT_POLL_SUMMARY, {"poll_uuid": poll_uuid})).all()
+        if not rows:
+            return None
+        options = [row for row in rows if row.id is not None]
+        total_votes, option_percentages = self.calculate_vote_percentages(
+            {row.id: row.count for row in options}, options
+        )
+        return PollSummaryResponse.model_construct(
+            poll_uuid=poll_uuid,
+            total_votes=total_votes,
+            option_summary=option_percentages,
+            option_votes={str(row.uuid): row.count for row in options}
+        )
+
     async def get_votes_by_user(self, session: AsyncSession, user_id: int):
+        """The user's current-epoch votes on active options, with the ids needed to count them."""
         stmt = (
             select(
+                Vote.poll_id,
+                Vote.option_id,
+                Vote.epoch,
                 Poll.uuid.label("poll_uuid"),
                 PollOptions.uuid.label("option_uuid")
             )
             .select_from(Vote)
-            .join(Poll, Vote.poll_id == Poll.id)
-            .join(PollOptions, Vote.option_id == PollOptions.id)
+            .join(Poll, (Vote.poll_id == Poll.id) & (Vote.epoch == Poll.vote_epoch))
+            .join(PollOptions, (Vote.option_id == PollOptions.id) & (PollOptions.is_active == True))
             .where(Vote.user_id == user_id)
         )
         
@@ -87,45 +234,29 @@ class VoteCrud:
         return result.fetchall()
     
     async def get_voted_polls_info(self, session: AsyncSession, user_id: int):
+        """Each poll the user voted on with its total and the voted option's share, in two queries."""
         votes = await self.get_votes_by_user(session, user_id)
+        counts_by_poll = await self.get_vote_counts_by_polls(session, {vote.poll_id: vote.epoch for vote in votes})
         
         voted_polls = []
         for vote_row in votes:
-            poll_result = await session.execute(
-                select(Poll)
-                .options(selectinload(Poll.poll_options))
-                .where(Poll.uuid == vote_row.poll_uuid)
-            )
-            poll = poll_result.scalars().first()
+            vote_counts = counts_by_poll[vote_row.poll_id]
+            total_votes = sum(vote_counts.values())
             
-            if poll:
-                option_exists_result = await session.execute(
-                    select(PollOptions)
-                    .where(PollOptions.uuid == vote_row.option_uuid)
-                    .where(PollOptions.is_active == True)
-                )
-                voted_option = option_exists_result.scalars().first()
-                
-                if not voted_option:
-                    continue
-                
-                vote_counts = await self.get_vote_counts_by_poll(session, poll.id)
-                total_votes = sum(vote_counts.values())
-                
-                # Calculate percentage for the voted option only
-                voted_option_votes = vote_counts.get(voted_option.id, 0)
-                percentage = 0.0
-                if total_votes > 0:
-                    percentage = round((voted_option_votes / total_votes) * 100, 2)
-                
-                voted_polls.append(
-                    VotedPollInfo(
-                        poll_uuid=vote_row.poll_uuid,
-                        option_uuid=vote_row.option_uuid,
-                        total_votes=total_votes,
-                        percentage=percentage
-                    )
+            # Calculate percentage for the voted option only
+            voted_option_votes = vote_counts.get(vote_row.option_id, 0)
+            percentage = 0.0
+            if total_votes > 0:
+                percentage = round((voted_option_votes / total_votes) * 100, 2)
+            
+            voted_polls.append(
+                VotedPollInfo(
+                    poll_uuid=vote_row.poll_uuid,
+                    option_uuid=vote_row.option_uuid,
+                    total_votes=total_votes,
+                    percentage=percentage
                 )
+            )
         
         return voted_polls
     
@@ -136,6 +267,14 @@ class VoteCrud:
         poll_options: Sequence
     ) -> tuple[int, dict[str, float]]:
         vote_counts = await self.get_vote_counts_by_poll(session, poll_id)
+        return self.calculate_vote_percentages(vote_counts, poll_options)
+    
+    def calculate_vote_percentages(
+        self,
+        vote_counts: dict,
+        poll_options: Sequence
+    ) -> tuple[int, dict[str, float]]:
+        """Total votes and per-option percentages from already fetched ``option_id -> count`` data."""
         total_votes = sum(vote_counts.values())
         
         option_percentages = {}
@@ -156,9 +295,22 @@ class VoteCrud:
         user_id: int,
         poll_id: int,
         option_id: int
-    ) -> Vote:
-        await self.delete_vote(session, user_id, poll_id)
-        return await self.create_vote(session, user_id, poll_id, option_id)
+    ) -> Tuple[Vote, Dict[int, int]]:
+        """Replace the user's vote on the poll.
+
+        Returns the new vote and the net ``option_id -> change`` for ``VoteRollupCrud.record_deltas``,
+        which the caller runs as the last statement before commit so the rollup rows stay locked briefly.
+        """
+        previous = await self._delete_user_votes(session, user_id, poll_id)
+        vote = await self.create_vote(session, user_id, poll_id, option_id)
+
+        deltas = {vote.option_id: 1}
+        for old in previous:
+            # Votes from earlier epochs were already dropped from the counts when the epoch advanced,
+            # and votes without a timestamp predate the rollups, so they were never in them
+            if old.epoch == vote.epoch and old.created_at is not None:
+                deltas[old.option_id] = deltas.get(old.option_id, 0) - 1
+        return vote, deltas
 
 
 vote_crud = VoteCrud()
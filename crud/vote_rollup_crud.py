@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete, func, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Sequence
+from core.settings import settings
+from models import Poll, PollOptions, VoteRollup
+
+ROLLUP_GRANULARITIES = ("minute", "hour")
+
+
+class VoteRollupCrud:
+
+    def __init__(self):
+        self.table = VoteRollup
+
+    async def record_deltas(self, session: AsyncSession, poll_id: int, epoch: int, deltas: Dict[int, int]) -> None:
+        """Add ``option_id -> net vote change`` to the current minute and hour buckets.
+
+        Runs in the vote's transaction, so rollups always agree with the votes table. Rows are
+        upserted in a fixed (granularity, option) order so concurrent voters on the same poll
+        lock the bucket rows in the same order and cannot deadlock.
+        """
+        rows = [
+            {
+                "poll_id": poll_id,
+                "epoch": epoch,
+                "option_id": option_id,
+                "granularity": granularity,
+                "bucket_start": func.date_trunc(granularity, func.now()),
+                "votes": delta,
+            }
+            for granularity in ROLLUP_GRANULARITIES
+            for option_id, delta in sorted(deltas.items())
+            if delta
+        ]
+        if not rows:
+            return
+        stmt = pg_insert(VoteRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_vote_rollups_bucket",
+            set_={"votes": VoteRollup.votes + stmt.excluded.votes},
+        )
+        await session.execute(stmt)
+
+    async def get_timeline(
+        self,
+        session: AsyncSession,
+        poll_id: int,
+        epoch: int,
+        granularity: str,
+        since: datetime
+    ) -> Dict[datetime, Dict[str, int]]:
+        """Net votes per active option for each bucket of the given vote epoch since ``since``."""
+        stmt = (
+            select(VoteRollup.bucket_start, PollOptions.uuid.label("option_uuid"), VoteRollup.votes)
+            .join(PollOptions, (PollOptions.id == VoteRollup.option_id) & (PollOptions.is_active == True))
+            .where(
+                VoteRollup.poll_id == poll_id,
+                VoteRollup.epoch == epoch,
+                VoteRollup.granularity == granularity,
+                VoteRollup.bucket_start >= since
+            )
+            .order_by(VoteRollup.bucket_start)
+        )
+        result = await session.execute(stmt)
+        buckets: Dict[datetime, Dict[str, int]] = {}
+        for row in result:
+            buckets.setdefault(row.bucket_start, {})[str(row.option_uuid)] = row.votes
+        return buckets
+
+    async def get_recent_poll_activity(self, session: AsyncSession, window_seconds: float) -> Sequence:
+        """New votes per active poll and bucket over the last ``window_seconds``, for rebuilding trending scores.
+
+        Uses minute buckets while the window is within their retention, hour buckets otherwise.
+        """
+        if window_seconds <= settings.VOTE_ROLLUP_MINUTE_RETENTION_HOURS * 3600:
+            granularity = "minute"
+        else:
+            granularity = "hour"
+        since = datetime.now(timezone.utc) - timedelta(seconds=window_seconds)
+        stmt = (
+            select(
+                Poll.uuid.label("poll_uuid"),
+                Poll.title,
+                VoteRollup.bucket_start,
+                func.sum(VoteRollup.votes).label("votes")
+            )
+            .join(Poll, (Poll.id == VoteRollup.poll_id) & (Poll.vote_epoch == VoteRollup.epoch))
+            .where(
+                Poll.is_active == True,
+                VoteRollup.granularity == granularity,
+                VoteRollup.bucket_start >= since
+            )
+            .group_by(Poll.id, VoteRollup.bucket_start)
+            .having(func.sum(VoteRollup.votes) > 0)
+        )
+        result = await session.execute(stmt)
+        return result.all()
+
+    async def delete_stale_rollups(self, session: AsyncSession, limit: int) -> int:
+        """Delete up to ``limit`` rollups of earlier epochs or of deleted polls. Returns rows deleted."""
+        stale_ids = (
+            select(VoteRollup.id)
+            .where(~exists().where(
+                Poll.id == VoteRollup.poll_id,
+                Poll.vote_epoch == VoteRollup.epoch,
+                Poll.is_active == True
+            ))
+            .limit(limit)
+        )
+        result = await session.execute(delete(VoteRollup).where(VoteRollup.id.in_(stale_ids)))
+        return result.rowcount
+
+    async def delete_expired_minute_rollups(self, session: AsyncSession, older_than: datetime, limit: int) -> int:
+        """Delete up to ``limit`` minute buckets that started before ``older_than``; hour buckets are kept."""
+        expired_ids = (
+            select(VoteRollup.id)
+            .where(VoteRollup.granularity == "minute", VoteRollup.bucket_start < older_than)
+            .limit(limit)
+        )
+        result = await session.execute(delete(VoteRollup).where(VoteRollup.id.in_(expired_ids)))
+        return result.rowcount
+
+
+vote_rollup_crud = VoteRollupCrud()
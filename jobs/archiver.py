@@ -0,0 +1,114 @@
+"""Move soft-deleted polls, their options, votes and likes into archive tables.
+
+Rows are moved in bounded chunks, each chunk in its own short transaction, and the
+job sleeps between chunks to stay under ``ARCHIVE_MAX_ROWS_PER_SECOND``. Since every
+chunk atomically deletes from the hot table and inserts into the archive, the job
+keeps no checkpoint: an interrupted run is resumed by simply running it again.
+Runs periodically inside the app when ``ARCHIVE_INTERVAL_SECONDS`` is set, or from
+the command line:
+
+    python -m jobs.archiver --batch-size 5000 --max-rows-per-second 20000
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.async_engine import AsyncSessionLocal
+from core.settings import settings
+from crud.archive_crud import archive_crud as ArchiveCrud
+
+logger = logging.getLogger(__name__)
+
+
+class Archiver:
+    def __init__(self, batch_size: int, poll_batch_size: int, max_rows_per_second: float):
+        self.batch_size = batch_size
+        self.poll_batch_size = poll_batch_size
+        self.max_rows_per_second = max_rows_per_second
+        self.report = {"polls": 0, "options": 0, "votes": 0, "likes": 0}
+
+    async def _throttle(self, rows: int, chunk_started: float):
+        if self.max_rows_per_second <= 0:
+            return
+        remaining = rows / self.max_rows_per_second - (time.monotonic() - chunk_started)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    async def _move_until_empty(self, kind: str, move: Callable[[AsyncSession], Awaitable[int]]):
+        while True:
+            chunk_started = time.monotonic()
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    moved = await move(session)
+            self.report[kind] += moved
+            await self._throttle(moved, chunk_started)
+            if moved < self.batch_size:
+                return
+
+    async def run(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        last_id = 0
+
+        while True:
+            async with AsyncSessionLocal() as session:
+                poll_ids = await ArchiveCrud.get_inactive_poll_ids(session, last_id, self.poll_batch_size)
+            if not poll_ids:
+                break
+
+            # Children first: votes and likes reference options and polls
+            await self._move_until_empty(
+                "votes", lambda session: ArchiveCrud.move_votes_for_polls(session, poll_ids, self.batch_size)
+            )
+            await self._move_until_empty(
+                "likes", lambda session: ArchiveCrud.move_likes_for_polls(session, poll_ids, self.batch_size)
+            )
+            await self._move_until_empty(
+                "options", lambda session: ArchiveCrud.move_options_for_polls(session, poll_ids, self.batch_size)
+            )
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    self.report["polls"] += await ArchiveCrud.move_polls(session, poll_ids)
+
+            last_id = poll_ids[-1]
+
+        # Deleted options of polls that are still live, once the vote sweeper has removed their votes
+        await self._move_until_empty(
+            "options", lambda session: ArchiveCrud.move_unreferenced_inactive_options(session, self.batch_size)
+        )
+
+        duration = time.monotonic() - started
+        total_rows = sum(self.report.values())
+        report: Dict[str, Any] = dict(self.report)
+        report["duration_seconds"] = round(duration, 3)
+        report["rows_per_second"] = round(total_rows / duration, 1) if duration > 0 else 0.0
+        if total_rows:
+            logger.info(f"Archived soft-deleted rows: {report}")
+        return report
+
+
+async def archive_inactive_rows(
+    batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+    max_rows_per_second: float = settings.ARCHIVE_MAX_ROWS_PER_SECOND,
+) -> Dict[str, Any]:
+    archiver = Archiver(batch_size, settings.ARCHIVE_POLL_BATCH_SIZE, max_rows_per_second)
+    return await archiver.run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive soft-deleted polls, options, votes and likes")
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-rows-per-second", type=float, default=settings.ARCHIVE_MAX_ROWS_PER_SECOND,
+                        help="Throttle; 0 disables throttling")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report = asyncio.run(archive_inactive_rows(args.batch_size, args.max_rows_per_second))
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Reconcile the denormalized ``Poll.likes`` counter with the likes table.
+
+Runs periodically inside the app when ``LIKE_RECONCILE_INTERVAL_SECONDS`` is set,
+or once from the command line:
+
+    python -m jobs.like_reconciler --batch-size 1000
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Dict
+
+from core.async_engine import AsyncSessionLocal
+from core.settings import settings
+from crud.like_crud import like_crud as LikeCrud
+from crud.poll_crud import poll_crud as PollCrud
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_like_counts(batch_size: int = settings.LIKE_RECONCILE_BATCH_SIZE) -> Dict[str, Any]:
+    """Walk all polls in id order, compare stored likes with a grouped count and fix any drift.
+
+    Each batch runs in its own short transaction so the job never holds locks on
+    more than ``batch_size`` poll rows at a time.
+    """
+    started = time.monotonic()
+    report = {"polls_scanned": 0, "polls_drifted": 0, "total_drift": 0}
+    last_id = 0
+
+    while True:
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                polls = await PollCrud.get_poll_likes_batch(session, last_id, batch_size)
+                if not polls:
+                    break
+
+                poll_ids = [poll.id for poll in polls]
+                actual_counts = await LikeCrud.count_likes_by_polls(session, poll_ids)
+
+                drifted_ids = []
+                for poll in polls:
+                    drift = actual_counts.get(poll.id, 0) - poll.likes
+                    if drift:
+                        drifted_ids.append(poll.id)
+                        report["total_drift"] += abs(drift)
+
+                if drifted_ids:
+                    # Recount inside the UPDATE so likes toggled since the grouped count are not lost
+                    await PollCrud.recount_likes(session, drifted_ids)
+
+        report["polls_scanned"] += len(polls)
+        report["polls_drifted"] += len(drifted_ids)
+        last_id = poll_ids[-1]
+
+    report["duration_seconds"] = round(time.monotonic() - started, 3)
+    if report["polls_drifted"]:
+        logger.warning(f"Like count reconciliation fixed drift: {report}")
+    else:
+        logger.info(f"Like count reconciliation found no drift: {report}")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconcile Poll.likes with the likes table")
+    parser.add_argument("--batch-size", type=int, default=settings.LIKE_RECONCILE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report = asyncio.run(reconcile_like_counts(args.batch_size))
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class JobScheduler:
+    """Runs coroutine jobs on a fixed interval inside the application's event loop."""
+
+    def __init__(self):
+        self.tasks: List[asyncio.Task] = []
+
+    def schedule(self, name: str, job: Callable[[], Awaitable[object]], interval_seconds: float):
+        async def run_periodically():
+            while True:
+                await asyncio.sleep(interval_seconds)
+                try:
+                    await job()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Scheduled job {name} failed: {e}")
+
+        self.tasks.append(asyncio.create_task(run_periodically(), name=name))
+        logger.info(f"Scheduled job {name} every {interval_seconds}s")
+
+    async def shutdown(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+
+
+scheduler = JobScheduler()
@@ -0,0 +1,78 @@
+"""Delete votes left behind when a poll's vote epoch is advanced.
+
+Resetting a poll's votes only bumps ``Poll.vote_epoch``; the rows from earlier
+epochs are no longer counted and are removed here in small batches, each in its
+own transaction, so no single statement holds locks for long. Vote rollups of
+earlier epochs or deleted polls, and minute rollups past
+``VOTE_ROLLUP_MINUTE_RETENTION_HOURS``, are removed the same way. Runs periodically
+inside the app when ``VOTE_SWEEP_INTERVAL_SECONDS`` is set, or once from the
+command line:
+
+    python -m jobs.vote_sweeper --batch-size 5000
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.async_engine import AsyncSessionLocal
+from core.settings import settings
+from crud.vote_crud import vote_crud as VoteCrud
+from crud.vote_rollup_crud import vote_rollup_crud as VoteRollupCrud
+
+logger = logging.getLogger(__name__)
+
+
+async def sweep_stale_votes(
+    batch_size: int = settings.VOTE_SWEEP_BATCH_SIZE,
+    pause_seconds: float = settings.VOTE_SWEEP_PAUSE_SECONDS,
+) -> Dict[str, Any]:
+    started = time.monotonic()
+    report = {"votes_deleted": 0, "rollups_deleted": 0, "batches": 0}
+
+    async def delete_until_empty(kind: str, delete_batch: Callable[[AsyncSession], Awaitable[int]]):
+        while True:
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    deleted = await delete_batch(session)
+
+            report[kind] += deleted
+            report["batches"] += 1
+            if deleted < batch_size:
+                return
+            # Yield to request traffic between batches
+            await asyncio.sleep(pause_seconds)
+
+    await delete_until_empty("votes_deleted", lambda session: VoteCrud.delete_stale_votes(session, batch_size))
+    await delete_until_empty(
+        "rollups_deleted", lambda session: VoteRollupCrud.delete_stale_rollups(session, batch_size)
+    )
+    minute_cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.VOTE_ROLLUP_MINUTE_RETENTION_HOURS)
+    await delete_until_empty(
+        "rollups_deleted",
+        lambda session: VoteRollupCrud.delete_expired_minute_rollups(session, minute_cutoff, batch_size)
+    )
+
+    report["duration_seconds"] = round(time.monotonic() - started, 3)
+    if report["votes_deleted"] or report["rollups_deleted"]:
+        logger.info(f"Vote sweeper removed stale votes: {report}")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete votes and vote rollups from previous poll vote epochs")
+    parser.add_argument("--batch-size", type=int, default=settings.VOTE_SWEEP_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.VOTE_SWEEP_PAUSE_SECONDS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report = asyncio.run(sweep_stale_votes(args.batch_size, args.pause))
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
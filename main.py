@@ -1,11 +1,64 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi_pagination import add_pagination
+from sqlalchemy import exc as sa_exc
 import uvicorn
 from core.settings import settings
 from api.api import api_router
+from core.pool_monitor import pool_monitor, replica_pool_monitor
+from jobs.scheduler import scheduler
+from jobs.like_reconciler import reconcile_like_counts
+from jobs.vote_sweeper import sweep_stale_votes
+from jobs.archiver import archive_inactive_rows
+from core.async_engine import AsyncSessionLocal
+from core.statement_cache import warm_up_compiled_cache
+from core.query_profiler import QueryProfilerMiddleware
+from core.metrics import MetricsMiddleware, registry, register_collected_metrics
+from core.loop_monitor import loop_monitor
+from core.trending import rebuild_trending
+from core.idempotency import IdempotencyMiddleware, idempotency_store
+from core.admission import AdmissionControlMiddleware, admission_controller
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.SQL_WARMUP_ON_STARTUP:
+        try:
+            await warm_up_compiled_cache(AsyncSessionLocal)
+        except Exception as e:
+            logger.warning(f"Compiled cache warm-up failed: {e}")
+    try:
+        await rebuild_trending()
+    except Exception as e:
+        logger.warning(f"Trending polls rebuild failed: {e}")
+    if settings.TRENDING_REBUILD_INTERVAL_SECONDS > 0:
+        scheduler.schedule("trending_rebuild", rebuild_trending, settings.TRENDING_REBUILD_INTERVAL_SECONDS)
+    if settings.IDEMPOTENCY_ENABLED and settings.IDEMPOTENCY_STORE == "database":
+        scheduler.schedule("idempotency_cleanup", idempotency_store.delete_expired, settings.IDEMPOTENCY_TTL_SECONDS)
+    if settings.LIKE_RECONCILE_INTERVAL_SECONDS > 0:
+        scheduler.schedule("like_reconciler", reconcile_like_counts, settings.LIKE_RECONCILE_INTERVAL_SECONDS)
+    if settings.VOTE_SWEEP_INTERVAL_SECONDS > 0:
+        scheduler.schedule("vote_sweeper", sweep_stale_votes, settings.VOTE_SWEEP_INTERVAL_SECONDS)
+    if settings.ARCHIVE_INTERVAL_SECONDS > 0:
+        scheduler.schedule("archiver", archive_inactive_rows, settings.ARCHIVE_INTERVAL_SECONDS)
+    if settings.EVENT_LOOP_LAG_PROBE_INTERVAL_SECONDS > 0:
+        loop_monitor.start()
+    if settings.POSTGRES_POOL_ADAPTIVE:
+        scheduler.schedule("pool_adaptive_sizing", pool_monitor.adapt_overflow, settings.POSTGRES_POOL_ADAPTIVE_INTERVAL_SECONDS)
+        if replica_pool_monitor.pool is not None:
+            scheduler.schedule(
+                "replica_pool_adaptive_sizing", replica_pool_monitor.adapt_overflow,
+                settings.POSTGRES_POOL_ADAPTIVE_INTERVAL_SECONDS,
+            )
+    yield
+    await scheduler.shutdown()
+    await loop_monitor.stop()
 
-app = FastAPI(title="Votez API", version="1.0.0")
+
+app = FastAPI(title="Votez API", version="1.0.0", lifespan=lifespan)
 
 # Debug: Log CORS configuration
 import logging
@@ -25,6 +78,14 @@ else:
     logger.info("No CORS origins configured, using wildcard")
     cors_origins = ["*"]
 
+# Innermost, so replayed responses still get CORS headers
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware)
+
+# Inside CORS so browsers can read the 503, outside everything that does work for the request
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
 # Always add CORS middleware to ensure WebSocket connections work
 app.add_middleware(
     CORSMiddleware,
@@ -33,15 +94,32 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     max_age=32400,
-    expose_headers=["Content-Disposition"],
+    expose_headers=["Content-Disposition", "Server-Timing"],
 )
 
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
+
+if settings.METRICS_ENABLED:
+    register_collected_metrics()
+    app.add_middleware(MetricsMiddleware)
+
 add_pagination(app)
 
 app.include_router(api_router)
 
 logger.info("FastAPI app initialized with CORS middleware")
 
+@app.exception_handler(sa_exc.TimeoutError)
+async def pool_timeout_handler(request: Request, exc: sa_exc.TimeoutError):
+    # Handler catch-alls raise ``core.errors.unexpected_error``, which passes pool timeouts through to here
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.get("/")
 async def root():
     return {"message": "Votez API", "version": "1.0.0"}
@@ -55,6 +133,31 @@ async def health():
     }
 
 
+@app.get("/health/pool")
+async def pool_health():
+    snapshot = pool_monitor.snapshot()
+    if replica_pool_monitor.pool is not None:
+        snapshot["replica"] = replica_pool_monitor.snapshot()
+    return snapshot
+
+
+@app.get("/health/loop")
+async def loop_health():
+    return loop_monitor.snapshot()
+
+
+@app.get("/health/admission")
+async def admission_health():
+    return admission_controller.snapshot()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("Metrics are disabled\n", status_code=404)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     run_args = {
         "app": "main:app",
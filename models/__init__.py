@@ -3,5 +3,13 @@ from .poll_options_model import PollOptions
 from .user_model import UserModel
 from .like_model import Like
 from .vote_model import Vote
+from .archive_model import PollArchive, PollOptionsArchive, VoteArchive, LikeArchive
+from .vote_rollup_model import VoteRollup
+from .idempotency_key_model import IdempotencyKey
+from .poll_search_term_model import PollSearchTerm
 
-__all__ = ['UserModel', 'Poll', 'PollOptions', 'Like', 'Vote']
\ No newline at end of file
+__all__ = [
+    'UserModel', 'Poll', 'PollOptions', 'Like', 'Vote',
+    'PollArchive', 'PollOptionsArchive', 'VoteArchive', 'LikeArchive', 'VoteRollup',
+    'IdempotencyKey', 'PollSearchTerm',
+]
@@ -0,0 +1,54 @@
+from datetime import datetime
+from sqlalchemy import Integer, String, Boolean, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.base import Base
+
+
+# Archive tables hold rows moved out of the hot tables by jobs.archiver. They keep the
+# original ids and uuids, carry no foreign keys and are never read on the request path.
+
+class PollArchive(Base):
+    __tablename__ = "poll_archive"
+
+    title: Mapped[str] = mapped_column(String(50), nullable=False)
+    created_by: Mapped[int] = mapped_column(Integer, nullable=False)
+    likes: Mapped[int] = mapped_column(Integer, nullable=False)
+    vote_epoch: Mapped[int] = mapped_column(Integer, nullable=False)
+    version_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class PollOptionsArchive(Base):
+    __tablename__ = "poll_options_archive"
+
+    poll_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    option_name: Mapped[str] = mapped_column(String(50), nullable=False)
+    votes: Mapped[int] = mapped_column(Integer, nullable=False)
+    version_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class VoteArchive(Base):
+    __tablename__ = "votes_archive"
+
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    poll_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    option_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    epoch: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Null for votes archived before votes had timestamps
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class LikeArchive(Base):
+    __tablename__ = "likes_archive"
+
+    poll_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
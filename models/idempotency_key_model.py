@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Integer, String, DateTime, LargeBinary, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.base import Base
+
+
+class IdempotencyKey(Base):
+    """Stored responses for ``Idempotency-Key`` retries when ``IDEMPOTENCY_STORE=database``."""
+    __tablename__ = "idempotency_keys"
+
+    # sha256 of user, path and the client's key
+    key: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Null while the first request is still running
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    headers: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
+    body: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
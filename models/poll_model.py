@@ -11,6 +11,7 @@ class Poll(VersionedMixin, Base):
     created_by: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
     poll_options: Mapped[List["PollOptions"]] = relationship(back_populates="poll", cascade="all, delete-orphan")
     likes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    vote_epoch: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
 
@@ -1,10 +1,13 @@
 from datetime import datetime
-from sqlalchemy import Integer, ForeignKey, String, DateTime, Boolean, func, event, update
+from sqlalchemy import Integer, ForeignKey, String, DateTime, Boolean, Index, func, event, update
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from core.base import VersionedMixin, Base
 
 class PollOptions(VersionedMixin, Base):
     __tablename__ = 'poll_options'
+    __table_args__ = (
+        Index('ix_poll_options_poll_id', 'poll_id'),
+    )
 
     poll_id: Mapped[int] = mapped_column(Integer, ForeignKey("poll.id"), nullable=False)
     option_name: Mapped[str] = mapped_column(String(50), nullable=False)
@@ -0,0 +1,27 @@
+from sqlalchemy import Integer, Float, Text, Index, PrimaryKeyConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.base import Base
+
+
+class PollSearchTerm(Base):
+    """One word of an active poll's title or option names: the postings behind poll search.
+
+    Maintained by ``PollSearchCrud`` in the same transaction as the change to the poll. Like the
+    vote rollups this is derived data with no foreign keys. It has no ``id`` or ``uuid`` either:
+    there are several rows per poll, and searches only ever read the ``term`` index.
+    """
+    __tablename__ = "poll_search_terms"
+    __table_args__ = (
+        PrimaryKeyConstraint('poll_id', 'term', name='poll_search_terms_pkey'),
+        # Covers search completely, so a lookup is an index-only scan of one term's postings
+        Index('ix_poll_search_terms_term', 'term', 'weight', 'poll_id'),
+    )
+
+    id = None
+    uuid = None
+    poll_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # A lexeme of to_tsvector('simple', ...): lower-cased, not stemmed
+    term: Mapped[str] = mapped_column(Text, nullable=False)
+    # TITLE_WEIGHT when the word is in the title, OPTION_WEIGHT when only in option names
+    weight: Mapped[float] = mapped_column(Float, nullable=False)
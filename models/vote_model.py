@@ -1,13 +1,37 @@
-from sqlalchemy import Integer, ForeignKey
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Integer, ForeignKey, Index, DDL, DateTime, PrimaryKeyConstraint, event, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from core.base import Base
+from core.settings import settings
 
 
 class Vote(Base):
     __tablename__ = "votes"
+    __table_args__ = (
+        # Postgres requires the partition key in unique constraints; poll_id leads, as in the migration
+        PrimaryKeyConstraint('poll_id', 'id', name='votes_pkey'),
+        Index('ix_votes_poll_id_epoch', 'poll_id', 'epoch'),
+        # Every vote query filters by poll_id, so each one touches a single partition
+        {"postgresql_partition_by": "HASH (poll_id)"},
+    )
 
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
-    poll_id: Mapped[int] = mapped_column(Integer, ForeignKey("poll.id"), nullable=False)
+    poll_id: Mapped[int] = mapped_column(Integer, ForeignKey("poll.id"), primary_key=True)
     option_id: Mapped[int] = mapped_column(Integer, ForeignKey("poll_options.id"), nullable=False)
+    # Only votes whose epoch matches Poll.vote_epoch count; older epochs are swept in the background
+    epoch: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+    # NULL for votes cast before timestamps were recorded; those are not in the vote rollups
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=True)
 
+
+for remainder in range(settings.VOTES_PARTITION_COUNT):
+    event.listen(
+        Vote.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TABLE votes_p{remainder} PARTITION OF votes "
+            f"FOR VALUES WITH (MODULUS {settings.VOTES_PARTITION_COUNT}, REMAINDER {remainder})"
+        ).execute_if(dialect="postgresql"),
+    )
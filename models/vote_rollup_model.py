@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.base import Base
+
+
+class VoteRollup(Base):
+    """Net vote changes per poll option and time bucket, maintained on the vote path.
+
+    Summing ``votes`` over a poll epoch's buckets gives its current counts; the timeline
+    endpoint reads only this table, never the raw votes. Rollups are derived data, so like
+    the archive tables they carry no foreign keys and are simply deleted when stale.
+    """
+    __tablename__ = "vote_rollups"
+    __table_args__ = (
+        UniqueConstraint('poll_id', 'epoch', 'granularity', 'bucket_start', 'option_id', name='uq_vote_rollups_bucket'),
+    )
+
+    poll_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    epoch: Mapped[int] = mapped_column(Integer, nullable=False)
+    option_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # "minute" or "hour"; the value is passed straight to date_trunc
+    granularity: Mapped[str] = mapped_column(String(10), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    votes: Mapped[int] = mapped_column(Integer, nullable=False)
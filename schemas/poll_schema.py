@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional, Dict
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 class PollOptionSchema(BaseModel):
     option_name: str = Field(..., min_length=1, max_length=200)
@@ -64,6 +64,7 @@ class PollSummaryResponse(BaseModel):
     poll_uuid: UUID
     total_votes: int
     option_summary: Dict[str, float]  # option_uuid -> percentage
+    option_votes: Dict[str, int]  # option_uuid -> vote count
 
 
 class LikeResponseSchema(BaseModel):
@@ -76,3 +77,31 @@ class VoteResponseSchema(BaseModel):
     poll_uuid: UUID
     option_uuid: UUID
     summary: PollSummaryData
+
+
+class TimelineBucket(BaseModel):
+    bucket_start: datetime
+    votes: Dict[str, int]  # option_uuid -> net votes added in this bucket
+
+class PollSearchResponse(BaseModel):
+    items: List[PollResponseWithVersionId]
+    next_cursor: Optional[str] = None  # pass as ``cursor`` to fetch the next page; None on the last page
+
+class TrendingPollSchema(BaseModel):
+    poll_uuid: UUID
+    title: Optional[str] = None
+    score: float  # decayed vote/like activity; comparable only within one response
+
+class PollTimelineResponse(BaseModel):
+    poll_uuid: UUID
+    granularity: str
+    since: datetime
+    buckets: List[TimelineBucket]
+
+
+# Serializers for poll payloads built with model_construct from database rows: one JSON
+# encoding pass, shared by the HTTP response and the websocket broadcast
+poll_response_adapter = TypeAdapter(PollResponseWithVersionId)
+poll_list_adapter = TypeAdapter(List[PollResponseWithVersionId])
+poll_summary_adapter = TypeAdapter(PollSummaryResponse)
+trending_list_adapter = TypeAdapter(List[TrendingPollSchema])
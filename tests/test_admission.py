@@ -0,0 +1,138 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import core.admission
+from core.admission import AdmissionControlMiddleware, AdmissionController
+from core.loop_monitor import LoopMonitor
+from core.pool_monitor import PoolMonitor
+from core.settings import settings
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    """A fresh controller with stubbed monitors: a normal limit of 8 and a low-priority cap of 4."""
+    controller = AdmissionController()
+    monkeypatch.setattr(core.admission, "admission_controller", controller)
+    monkeypatch.setattr(core.admission, "pool_monitor", PoolMonitor())
+    monkeypatch.setattr(core.admission, "replica_pool_monitor", PoolMonitor())
+    monkeypatch.setattr(core.admission, "loop_monitor", LoopMonitor())
+    monkeypatch.setattr(settings, "ADMISSION_MAX_IN_FLIGHT", 10)
+    monkeypatch.setattr(settings, "ADMISSION_CRITICAL_RESERVE", 0.2)
+    monkeypatch.setattr(settings, "ADMISSION_LOW_PRIORITY_SHARE", 0.5)
+    monkeypatch.setattr(settings, "ADMISSION_POOL_WAIT_MS", 100)
+    monkeypatch.setattr(settings, "ADMISSION_LOOP_LAG_MS", 200)
+    monkeypatch.setattr(settings, "ADMISSION_DEFAULT_PRIORITY", "normal")
+    monkeypatch.setattr(settings, "ADMISSION_ROUTE_PRIORITIES", {"POST /vote": "critical", "GET /list": "low"})
+    return controller
+
+
+@pytest.fixture
+async def gate():
+    gate = asyncio.Event()
+    yield gate
+    gate.set()
+
+
+@pytest.fixture
+async def client(controller, gate):
+    app = FastAPI()
+
+    @app.post("/vote")
+    async def vote():
+        return {}
+
+    @app.get("/item")
+    async def item():
+        return {}
+
+    @app.get("/list")
+    async def listing():
+        return {}
+
+    @app.get("/slow")
+    async def slow():
+        await gate.wait()
+        return {}
+
+    app.add_middleware(AdmissionControlMiddleware)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def hold(client, controller, gate):
+    """Keeps ``count`` normal requests in flight until the test ends."""
+    tasks = []
+
+    async def hold(count):
+        tasks.extend(asyncio.create_task(client.get("/slow")) for _ in range(count))
+        while controller.in_flight < len(tasks):
+            await asyncio.sleep(0)
+
+    yield hold
+    gate.set()
+    for response in await asyncio.gather(*tasks):
+        assert response.status_code == 200
+
+
+def saturate_pool():
+    core.admission.pool_monitor.waiting = 1
+    core.admission.pool_monitor.wait_ewma = 0.5
+
+
+def lag_loop():
+    core.admission.loop_monitor.recent_lags.append(0.5)
+
+
+async def test_critical_is_admitted_past_the_limit_and_while_saturated(client, controller, hold):
+    await hold(8)
+    saturate_pool()
+    lag_loop()
+    assert (await client.get("/item")).status_code == 503
+    assert (await client.post("/vote")).status_code == 200
+    assert controller.in_flight_by_priority["critical"] == 0
+
+
+async def test_normal_is_rejected_past_the_limit(client, controller, hold):
+    saturate_pool()
+    await hold(7)
+    assert (await client.get("/item")).status_code == 200
+
+    await hold(1)
+    response = await client.get("/item")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(settings.ADMISSION_RETRY_AFTER_SECONDS)
+    assert response.json() == {"detail": "Server is busy, please retry shortly"}
+    assert controller.shed == 1
+
+
+async def test_low_is_shed_while_saturated(client, controller):
+    assert (await client.get("/list")).status_code == 200
+
+    saturate_pool()
+    assert (await client.get("/list")).status_code == 503
+
+    # Waits below ADMISSION_POOL_WAIT_MS do not count as saturation
+    core.admission.pool_monitor.wait_ewma = 0.05
+    assert (await client.get("/list")).status_code == 200
+
+    core.admission.replica_pool_monitor.waiting = 1
+    core.admission.replica_pool_monitor.wait_ewma = 0.5
+    assert (await client.get("/list")).status_code == 503
+    core.admission.replica_pool_monitor.waiting = 0
+
+    lag_loop()
+    assert (await client.get("/list")).status_code == 503
+    assert controller.shed == 3
+
+
+async def test_low_is_capped_at_its_share(client, controller, hold):
+    await hold(3)
+    assert (await client.get("/list")).status_code == 200
+
+    await hold(1)
+    assert (await client.get("/list")).status_code == 503
+    assert (await client.get("/item")).status_code == 200
@@ -0,0 +1,77 @@
+"""The archiver moves soft-deleted polls and their rows into the archive tables, exactly once."""
+from uuid import UUID
+
+from sqlalchemy import func, select
+
+from jobs.archiver import archive_inactive_rows
+from models import Like, LikeArchive, Poll, PollArchive, PollOptions, PollOptionsArchive, Vote, VoteArchive
+
+
+async def count(session, model, **filters):
+    stmt = select(func.count()).select_from(model)
+    for column, value in filters.items():
+        stmt = stmt.where(getattr(model, column) == value)
+    return await session.scalar(stmt)
+
+
+async def create_poll(client, headers, title, names):
+    response = await client.post(
+        "/poll/", json={"title": title, "options": [{"option_name": name} for name in names]}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def vote(client, headers, poll, index):
+    response = await client.post(
+        f"/poll/{poll['uuid']}/vote", json={"option_uuid": poll["options"][index]["uuid"]}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+
+
+async def test_archives_deleted_poll_once(client, auth_headers, make_user, db_session):
+    other = await make_user()
+    deleted = await create_poll(client, auth_headers, "archived poll", ["a", "b"])
+    await vote(client, auth_headers, deleted, 0)
+    await vote(client, other, deleted, 1)
+    assert (await client.post(f"/poll/{deleted['uuid']}/like", headers=other)).status_code == 200
+    assert (await client.delete(f"/poll/{deleted['uuid']}", headers=auth_headers)).status_code == 200
+
+    # A live poll with one deleted option still referenced by an earlier-epoch vote and one unreferenced
+    live = await create_poll(client, auth_headers, "live poll", ["x", "y", "z", "w"])
+    await vote(client, other, live, 0)
+    for option in (live["options"][0], live["options"][3]):
+        response = await client.request(
+            "DELETE", f"/poll/{live['uuid']}/options", json={"option_uuids": [option["uuid"]]}, headers=auth_headers
+        )
+        assert response.status_code == 200, response.text
+
+    deleted_id = await db_session.scalar(select(Poll.id).where(Poll.uuid == UUID(deleted["uuid"])))
+    live_id = await db_session.scalar(select(Poll.id).where(Poll.uuid == UUID(live["uuid"])))
+    referenced = await db_session.scalar(select(PollOptions.id).where(PollOptions.uuid == UUID(live["options"][0]["uuid"])))
+    unreferenced = await db_session.scalar(select(PollOptions.id).where(PollOptions.uuid == UUID(live["options"][3]["uuid"])))
+
+    # One row per chunk, so every move has to loop until its table is drained
+    first = await archive_inactive_rows(batch_size=1, max_rows_per_second=0)
+    assert first["polls"] >= 1 and first["votes"] >= 2 and first["likes"] >= 1 and first["options"] >= 3
+
+    assert await count(db_session, Poll, id=deleted_id) == 0
+    assert await count(db_session, PollOptions, poll_id=deleted_id) == 0
+    assert await count(db_session, Vote, poll_id=deleted_id) == 0
+    assert await count(db_session, Like, poll_id=deleted_id) == 0
+    assert await count(db_session, PollArchive, id=deleted_id) == 1
+    assert await count(db_session, PollOptionsArchive, poll_id=deleted_id) == 2
+    assert await count(db_session, VoteArchive, poll_id=deleted_id) == 2
+    assert await count(db_session, LikeArchive, poll_id=deleted_id) == 1
+
+    assert await count(db_session, Poll, id=live_id) == 1
+    assert await count(db_session, PollOptions, poll_id=live_id) == 3
+    assert await count(db_session, PollOptions, id=referenced) == 1
+    assert await count(db_session, PollOptionsArchive, id=unreferenced) == 1
+    assert await count(db_session, Vote, poll_id=live_id) == 1
+    assert (await client.get(f"/poll/{live['uuid']}")).status_code == 200
+
+    second = await archive_inactive_rows(max_rows_per_second=0)
+    assert {kind: second[kind] for kind in ("polls", "options", "votes", "likes")} == {
+        "polls": 0, "options": 0, "votes": 0, "likes": 0
+    }
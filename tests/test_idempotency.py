@@ -0,0 +1,36 @@
+import asyncio
+
+from core.idempotency import MemoryIdempotencyStore, StoredResponse
+
+
+async def test_in_flight_keys_survive_eviction():
+    store = MemoryIdempotencyStore(ttl_seconds=60, max_keys=1)
+    assert await store.claim("first", "a") is None
+    assert await store.claim("second", "b") is None
+
+    duplicate = asyncio.create_task(store.claim("first", "a"))
+    await asyncio.sleep(0)
+    assert not duplicate.done()
+
+    response = StoredResponse("a", 200, [], b"ok")
+    await store.complete("first", response)
+    assert await asyncio.wait_for(duplicate, 1) == response
+
+
+async def test_completed_keys_are_evicted_first():
+    store = MemoryIdempotencyStore(ttl_seconds=60, max_keys=2)
+    assert await store.claim("running", "a") is None
+    assert await store.claim("done", "b") is None
+    await store.complete("done", StoredResponse("b", 200, [], b"ok"))
+    assert await store.claim("new", "c") is None
+    assert list(store.records) == ["running", "new"]
+
+
+async def test_expired_in_flight_key_is_not_taken_over():
+    store = MemoryIdempotencyStore(ttl_seconds=0, max_keys=10)
+    assert await store.claim("slow", "a") is None
+    duplicate = asyncio.create_task(store.claim("slow", "a"))
+    await asyncio.sleep(0)
+    assert not duplicate.done()
+    await store.release("slow")
+    assert await asyncio.wait_for(duplicate, 1) is None
@@ -0,0 +1,26 @@
+import asyncio
+from uuid import UUID
+
+from sqlalchemy import func, select
+
+from models import Like, Poll
+
+
+async def test_concurrent_toggles_keep_the_like_count_exact(client, make_user, poll, db_session):
+    users = [await make_user() for _ in range(6)]
+    poll_uuid = poll["uuid"]
+    before = await db_session.scalar(select(Poll.version_id).where(Poll.uuid == UUID(poll_uuid)))
+
+    # Every user likes, and the first three toggle a second time in the same burst
+    toggles = [client.post(f"/poll/{poll_uuid}/like", headers=headers) for headers in users + users[:3]]
+    responses = await asyncio.gather(*toggles)
+    assert all(response.status_code == 200 for response in responses), [r.text for r in responses]
+
+    likes, version_id, poll_id = (
+        await db_session.execute(select(Poll.likes, Poll.version_id, Poll.id).where(Poll.uuid == UUID(poll_uuid)))
+    ).one()
+    active = await db_session.scalar(
+        select(func.count()).select_from(Like).where(Like.poll_id == poll_id, Like.is_active == True)
+    )
+    assert likes == active == 3
+    assert version_id == before
@@ -0,0 +1,38 @@
+import csv
+import io
+import uuid
+
+from api import poll_api
+from core.pool_monitor import pool_monitor
+
+
+async def test_export_holds_one_connection_while_streaming(client, auth_headers, poll, monkeypatch):
+    response = await client.post(
+        f"/poll/{poll['uuid']}/vote", json={"option_uuid": poll["options"][0]["uuid"]}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+
+    checked_out_while_streaming = []
+    export_votes = poll_api._export_votes
+
+    async def recording_export(*args):
+        async for chunk in export_votes(*args):
+            checked_out_while_streaming.append(pool_monitor.pool.checkedout())
+            yield chunk
+
+    monkeypatch.setattr(poll_api, "_export_votes", recording_export)
+    idle_checked_out = pool_monitor.pool.checkedout()
+    response = await client.get(f"/poll/{poll['uuid']}/export", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert len(rows) == 2
+    assert checked_out_while_streaming and set(checked_out_while_streaming) == {idle_checked_out + 1}
+
+
+async def test_export_is_creator_only(client, poll):
+    email = f"export-{uuid.uuid4().hex[:12]}@example.com"
+    await client.post("/auth/register", json={"name": "other", "email": email, "password": "test-password"})
+    login = await client.post("/auth/login", json={"email": email, "password": "test-password"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    response = await client.get(f"/poll/{poll['uuid']}/export", headers=headers)
+    assert response.status_code == 403
@@ -0,0 +1,81 @@
+"""Edit, add-option and delete-option responses are built by hand; they must match a fresh read."""
+import pytest
+
+
+@pytest.fixture
+async def voted_poll(client, auth_headers):
+    response = await client.post(
+        "/poll/",
+        json={"title": "mutation poll", "options": [{"option_name": "a"}, {"option_name": "b"}, {"option_name": "c"}]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    poll = response.json()
+    response = await client.post(
+        f"/poll/{poll['uuid']}/vote", json={"option_uuid": poll["options"][0]["uuid"]}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    return (await client.get(f"/poll/{poll['uuid']}")).json()
+
+
+async def assert_matches_read(client, response):
+    assert response.status_code == 200, response.text
+    body = response.json()
+    fresh = (await client.get(f"/poll/{body['uuid']}")).json()
+    assert set(body) == set(fresh)
+    for field in fresh:
+        assert body[field] == fresh[field], field
+    return body
+
+
+def votes_by_name(poll):
+    return {option["option_name"]: option["votes"] for option in poll["options"]}
+
+
+async def test_edit_response_matches_read(client, auth_headers, voted_poll):
+    renamed = voted_poll["options"][1]
+    response = await client.put(
+        f"/poll/{voted_poll['uuid']}",
+        json={
+            "title": "mutation poll edited",
+            "version_id": voted_poll["version_id"],
+            "options": [{"uuid": renamed["uuid"], "version_id": renamed["version_id"], "option_name": "b2"}],
+        },
+        headers=auth_headers,
+    )
+    body = await assert_matches_read(client, response)
+    assert body["version_id"] > voted_poll["version_id"]
+    assert votes_by_name(body) == {"a": 1, "b2": 0, "c": 0}
+
+
+async def test_add_options_response_matches_read(client, auth_headers, voted_poll):
+    response = await client.post(
+        f"/poll/{voted_poll['uuid']}/options", json={"options": [{"option_name": "d"}]}, headers=auth_headers
+    )
+    body = await assert_matches_read(client, response)
+    assert body["version_id"] == voted_poll["version_id"] + 1
+    # Adding options starts a new vote epoch
+    assert votes_by_name(body) == {"a": 0, "b": 0, "c": 0, "d": 0}
+
+
+async def test_delete_voted_option_response_matches_read(client, auth_headers, voted_poll):
+    response = await client.request(
+        "DELETE",
+        f"/poll/{voted_poll['uuid']}/options",
+        json={"option_uuids": [voted_poll["options"][0]["uuid"]]},
+        headers=auth_headers,
+    )
+    body = await assert_matches_read(client, response)
+    assert body["version_id"] == voted_poll["version_id"] + 1
+    assert votes_by_name(body) == {"b": 0, "c": 0}
+
+
+async def test_delete_unvoted_option_keeps_counts(client, auth_headers, voted_poll):
+    response = await client.request(
+        "DELETE",
+        f"/poll/{voted_poll['uuid']}/options",
+        json={"option_uuids": [voted_poll["options"][2]["uuid"]]},
+        headers=auth_headers,
+    )
+    body = await assert_matches_read(client, response)
+    assert votes_by_name(body) == {"a": 1, "b": 0}
@@ -0,0 +1,64 @@
+import random
+import string
+
+
+def random_word():
+    return "".join(random.choices(string.ascii_lowercase, k=10))
+
+
+async def search(client, q, limit=100):
+    response = await client.get("/poll/search", params={"q": q, "limit": limit})
+    assert response.status_code == 200, response.text
+    return [item["uuid"] for item in response.json()["items"]]
+
+
+async def create_poll(client, headers, title, options):
+    response = await client.post(
+        "/poll/", json={"title": title, "options": [{"option_name": name} for name in options]}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_pages_follow_the_ranking(client, auth_headers):
+    first, second = random_word(), random_word()
+    both = await create_poll(client, auth_headers, f"{first} poll", [f"{second} a", "b"])
+    in_title = [await create_poll(client, auth_headers, f"{first} poll {index}", ["a", "b"]) for index in range(3)]
+    in_option = [await create_poll(client, auth_headers, f"poll {index}", [first.upper(), "b"]) for index in range(3)]
+
+    expected = await search(client, f"{first} {second}")
+    # Title and option words add up, a title word outweighs an option word, ties go newest first
+    assert expected == [poll["uuid"] for poll in [both, *reversed(in_title), *reversed(in_option)]]
+
+    paged, cursor = [], None
+    while True:
+        params = {"q": f"{first} {second}", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/poll/search", params=params)).json()
+        paged.extend(item["uuid"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert paged == expected
+
+
+async def test_search_terms_follow_edits_and_deletes(client, auth_headers):
+    old_word, new_word, option_word = random_word(), random_word(), random_word()
+    poll = await create_poll(client, auth_headers, f"{old_word} poll", [option_word, "b", "c"])
+    assert await search(client, old_word) == [poll["uuid"]]
+
+    response = await client.put(
+        f"/poll/{poll['uuid']}", json={"title": f"{new_word} poll", "version_id": poll["version_id"]}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    assert await search(client, old_word) == []
+    assert await search(client, new_word) == [poll["uuid"]]
+
+    response = await client.request(
+        "DELETE", f"/poll/{poll['uuid']}/options", json={"option_uuids": [poll["options"][0]["uuid"]]}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    assert await search(client, option_word) == []
+
+    response = await client.delete(f"/poll/{poll['uuid']}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert await search(client, new_word) == []
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from core.settings import settings
+from crud.poll_crud import poll_crud
+
+
+@pytest.mark.parametrize("output_format", ["json", "ndjson"])
+async def test_stream_is_aborted_when_a_batch_fails(client, poll, monkeypatch, output_format):
+    async def fail(session, polls):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(poll_crud, "build_poll_responses", fail)
+    # The in-process transport surfaces the aborted response as the app's exception
+    with pytest.raises(RuntimeError, match="boom"):
+        await client.get("/poll/stream", params={"format": output_format})
+
+
+async def test_json_stream_returns_every_poll(client, poll, make_user, monkeypatch):
+    other_poll = await client.post(
+        "/poll/",
+        json={"title": "second stream poll", "options": [{"option_name": "a"}, {"option_name": "b"}]},
+        headers=await make_user(),
+    )
+    # One poll per batch, so the listing spans several cursor fetches
+    monkeypatch.setattr(settings, "POLL_STREAM_BATCH_SIZE", 1)
+    response = await client.get("/poll/stream", params={"format": "json"})
+    assert {poll["uuid"], other_poll.json()["uuid"]} <= {item["uuid"] for item in json.loads(response.content)}
@@ -0,0 +1,9 @@
+async def test_summary_has_counts_and_percentages(client, auth_headers, poll):
+    yes, no = (option["uuid"] for option in poll["options"])
+    response = await client.post(f"/poll/{poll['uuid']}/vote", json={"option_uuid": yes}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    summary = (await client.get(f"/poll/{poll['uuid']}/summary")).json()
+    assert summary["total_votes"] == 1
+    assert summary["option_votes"] == {yes: 1, no: 0}
+    assert summary["option_summary"] == {yes: 100.0, no: 0.0}
@@ -0,0 +1,88 @@
+"""One pooled connection per authenticated request, returned before the response goes out."""
+import asyncio
+
+from core.connection_manager import manager
+from core.pool_monitor import pool_monitor
+
+
+async def test_authenticated_write_checks_out_one_connection(client, auth_headers):
+    before = pool_monitor.checkouts
+    response = await client.post(
+        "/poll/",
+        json={"title": "checkout test", "options": [{"option_name": "a"}, {"option_name": "b"}]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    assert pool_monitor.checkouts - before == 1
+
+
+async def test_authenticated_read_checks_out_one_connection(client, auth_headers):
+    before = pool_monitor.checkouts
+    response = await client.get("/auth/me", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert pool_monitor.checkouts - before == 1
+
+
+async def test_concurrent_requests_check_out_one_connection_each(client, make_user, monkeypatch):
+    users = await asyncio.gather(*(make_user() for _ in range(5)))
+    peak_checked_out = []
+    record_checkout = pool_monitor.record_checkout
+
+    def recording_checkout(seconds, in_overflow):
+        peak_checked_out.append(pool_monitor.pool.checkedout())
+        record_checkout(seconds, in_overflow)
+
+    monkeypatch.setattr(pool_monitor, "record_checkout", recording_checkout)
+    before = pool_monitor.snapshot()
+    requests = [client.get("/auth/me", headers=headers) for headers in users] + [
+        client.post(
+            "/poll/",
+            json={"title": "concurrent checkout test", "options": [{"option_name": "a"}, {"option_name": "b"}]},
+            headers=headers,
+        )
+        for headers in users
+    ]
+    responses = await asyncio.gather(*requests)
+
+    assert all(response.status_code == 200 for response in responses), [r.text for r in responses]
+    after = pool_monitor.snapshot()
+    assert after["checkouts"] - before["checkouts"] == len(requests)
+    assert after["overflow_checkouts"] == before["overflow_checkouts"]
+    assert after["timeouts"] == before["timeouts"]
+    assert max(peak_checked_out) <= min(before["in_use"] + len(requests), pool_monitor.pool.size())
+
+
+async def test_connection_is_returned_before_the_broadcast(client, auth_headers, monkeypatch):
+    checked_out_during_broadcast = []
+    broadcast_event = manager.broadcast_event
+
+    async def recording_broadcast(event_type, data_json):
+        checked_out_during_broadcast.append(pool_monitor.pool.checkedout())
+        await broadcast_event(event_type, data_json)
+
+    monkeypatch.setattr(manager, "broadcast_event", recording_broadcast)
+    idle_checked_out = pool_monitor.pool.checkedout()
+    response = await client.post(
+        "/poll/",
+        json={"title": "broadcast test", "options": [{"option_name": "a"}, {"option_name": "b"}]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    assert checked_out_during_broadcast == [idle_checked_out]
+
+
+async def test_vote_is_committed_before_the_broadcast(client, auth_headers, poll, monkeypatch):
+    checked_out_during_broadcast = []
+    broadcast = manager.broadcast
+
+    async def recording_broadcast(message):
+        checked_out_during_broadcast.append(pool_monitor.pool.checkedout())
+        await broadcast(message)
+
+    monkeypatch.setattr(manager, "broadcast", recording_broadcast)
+    idle_checked_out = pool_monitor.pool.checkedout()
+    response = await client.post(
+        f"/poll/{poll['uuid']}/vote", json={"option_uuid": poll["options"][0]["uuid"]}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    assert checked_out_during_broadcast == [idle_checked_out]
@@ -0,0 +1,22 @@
+"""A pool checkout timeout is answered with 503 and Retry-After, not a generic 500."""
+from sqlalchemy import exc as sa_exc
+
+from api import poll_api
+
+
+async def _timeout(*args):
+    raise sa_exc.TimeoutError("QueuePool limit reached")
+
+
+async def test_poll_list_timeout_is_503(client, monkeypatch):
+    monkeypatch.setattr(poll_api, "_render_poll_list", _timeout)
+    response = await client.get("/poll/")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+async def test_single_poll_timeouts_are_503(client, poll, monkeypatch):
+    monkeypatch.setattr(poll_api, "_render_poll", _timeout)
+    monkeypatch.setattr(poll_api, "_render_poll_summary", _timeout)
+    assert (await client.get(f"/poll/{poll['uuid']}")).status_code == 503
+    assert (await client.get(f"/poll/{poll['uuid']}/summary")).status_code == 503
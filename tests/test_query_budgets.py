@@ -0,0 +1,93 @@
+"""Query-count budgets for the hot endpoints.
+
+Each budget is the number of statements the endpoint needs however many rows are involved, so
+an N+1 regression (a query per poll, option or vote) fails here with the executed SQL.
+"""
+import pytest
+
+from core.query_profiler import assert_max_queries
+
+POLL_COUNT = 3
+
+
+@pytest.fixture
+async def polls(client, auth_headers):
+    created = []
+    for index in range(POLL_COUNT):
+        response = await client.post(
+            "/poll/",
+            json={"title": f"budget poll {index}", "options": [{"option_name": "a"}, {"option_name": "b"}, {"option_name": "c"}]},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200, response.text
+        created.append(response.json())
+    return created
+
+
+@pytest.fixture
+async def voted_polls(client, auth_headers, polls):
+    for poll in polls:
+        response = await client.post(
+            f"/poll/{poll['uuid']}/vote", json={"option_uuid": poll["options"][0]["uuid"]}, headers=auth_headers
+        )
+        assert response.status_code == 200, response.text
+    return polls
+
+
+async def test_list_polls(client, voted_polls):
+    # Polls with their options, then vote counts and creators for all of them at once
+    with assert_max_queries(4):
+        response = await client.get("/poll/")
+    assert response.status_code == 200
+
+
+async def test_create_poll(client, auth_headers):
+    # User lookup, poll insert, options insert, search terms
+    with assert_max_queries(4):
+        response = await client.post(
+            "/poll/",
+            json={"title": "budget create", "options": [{"option_name": "a"}, {"option_name": "b"}]},
+            headers=auth_headers,
+        )
+    assert response.status_code == 200
+
+
+async def test_vote(client, auth_headers, polls):
+    poll = polls[0]
+    with assert_max_queries(8):
+        response = await client.post(
+            f"/poll/{poll['uuid']}/vote", json={"option_uuid": poll["options"][1]["uuid"]}, headers=auth_headers
+        )
+    assert response.status_code == 200
+
+
+async def test_like(client, auth_headers, polls):
+    # User lookup, poll id, one toggle statement
+    with assert_max_queries(3):
+        response = await client.post(f"/poll/{polls[0]['uuid']}/like", headers=auth_headers)
+    assert response.status_code == 200
+
+
+async def test_auth_me(client, auth_headers, voted_polls):
+    # User lookup, liked polls, voted polls, vote counts for every voted poll at once
+    with assert_max_queries(4):
+        response = await client.get("/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()["voted_polls"]) == POLL_COUNT
+
+
+async def test_get_voted_polls_info(app, client, auth_headers, voted_polls):
+    from core.async_engine import AsyncSessionLocal
+    from crud.user_crud import user_crud
+    from crud.vote_crud import vote_crud
+    from jose import jwt
+    from core.settings import settings
+
+    token = auth_headers["Authorization"].split(" ", 1)[1]
+    user_uuid = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])["sub"]
+    async with AsyncSessionLocal() as session:
+        user = await user_crud.get_user_by_uuid(session, user_uuid)
+        with assert_max_queries(2):
+            voted = await vote_crud.get_voted_polls_info(session, user.id)
+    assert {str(info.poll_uuid) for info in voted} == {poll["uuid"] for poll in voted_polls}
+    assert all(info.total_votes == 1 for info in voted)
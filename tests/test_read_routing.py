@@ -0,0 +1,18 @@
+"""Reads are routed by the bearer token's subject, decoded once per request."""
+import core.depends
+
+
+async def test_authenticated_read_decodes_the_token_once(client, auth_headers, poll, monkeypatch):
+    calls = []
+    token_subject = core.depends.token_subject
+
+    def counting_token_subject(credentials):
+        calls.append(credentials)
+        return token_subject(credentials)
+
+    monkeypatch.setattr(core.depends, "token_subject", counting_token_subject)
+    for path in ("/auth/me", f"/poll/{poll['uuid']}", f"/poll/{poll['uuid']}/export"):
+        calls.clear()
+        response = await client.get(path, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert len(calls) == 1, path
@@ -0,0 +1,52 @@
+import asyncio
+
+from core.single_flight import SingleFlight
+
+
+async def test_concurrent_callers_share_one_computation():
+    flight, calls, release = SingleFlight(), [], asyncio.Event()
+
+    async def compute():
+        calls.append(len(calls))
+        await release.wait()
+        return len(calls)
+
+    first = asyncio.create_task(flight.do(("test",), compute))
+    second = asyncio.create_task(flight.do(("test",), compute))
+    await asyncio.sleep(0)
+    release.set()
+    assert await first == await second == 1
+
+
+async def test_uncoalesced_caller_runs_its_own_computation():
+    flight, calls, release = SingleFlight(), [], asyncio.Event()
+
+    async def compute():
+        calls.append(len(calls))
+        await release.wait()
+        return len(calls)
+
+    in_flight = asyncio.create_task(flight.do(("test",), compute))
+    await asyncio.sleep(0)
+    pinned = asyncio.create_task(flight.do(("test",), compute, coalesce=False))
+    await asyncio.sleep(0)
+    release.set()
+    await in_flight
+    assert await pinned == 2
+    assert len(calls) == 2
+
+
+async def test_writer_reads_the_listing_uncoalesced(client, auth_headers, poll, monkeypatch):
+    from core.single_flight import single_flight
+
+    coalesced = []
+    do = single_flight.do
+
+    async def recording_do(key, compute, coalesce=True):
+        coalesced.append(coalesce)
+        return await do(key, compute, coalesce)
+
+    monkeypatch.setattr(single_flight, "do", recording_do)
+    assert (await client.get("/poll/", headers=auth_headers)).status_code == 200
+    assert (await client.get("/poll/")).status_code == 200
+    assert coalesced == [False, True]
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from core.settings import Settings
+from core.trending import TrendingTracker
+
+
+def test_rebuild_keeps_like_contributions():
+    tracker = TrendingTracker(half_life_seconds=3600, top_k=10, max_tracked=100)
+    liked, voted = uuid4(), uuid4()
+    tracker.record(liked, 2.0, "liked", rebuildable=False)
+    tracker.record(voted, 1.0, "voted")
+
+    now = datetime.now(timezone.utc)
+    tracker.replace([(voted, "voted", now, 1.0), (liked, "liked", now, 1.0)])
+
+    scores = {poll_uuid: score for poll_uuid, _, score in tracker.trending(10)}
+    assert scores[voted] == pytest.approx(1.0, rel=1e-3)
+    assert scores[liked] == pytest.approx(3.0, rel=1e-3)
+
+
+def test_rebuild_drops_rebuildable_events():
+    tracker = TrendingTracker(half_life_seconds=3600, top_k=10, max_tracked=100)
+    tracker.record(uuid4(), 1.0, "voted")
+    tracker.replace([])
+    assert tracker.trending(10) == []
+
+
+def test_prune_keeps_the_top_list_consistent():
+    tracker = TrendingTracker(half_life_seconds=3600, top_k=2, max_tracked=4)
+    polls = [uuid4() for _ in range(5)]
+    for weight, poll_uuid in enumerate(polls, start=1):
+        tracker.record(poll_uuid, float(weight), "poll")
+
+    assert len(tracker.entries) == 2
+    assert [poll_uuid for poll_uuid, _, _ in tracker.trending(10)] == [polls[4], polls[3]]
+
+
+def test_top_k_must_fit_in_what_pruning_keeps(monkeypatch):
+    # Settings are read from the environment only
+    monkeypatch.setenv("TRENDING_TOP_K", "100")
+    monkeypatch.setenv("TRENDING_MAX_TRACKED", "150")
+    with pytest.raises(ValidationError, match="TRENDING_TOP_K"):
+        Settings()
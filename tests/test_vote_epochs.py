@@ -0,0 +1,90 @@
+"""Resetting votes advances the poll's vote epoch; the sweeper removes the earlier epochs later."""
+from uuid import UUID
+
+from sqlalchemy import func, select
+
+from jobs.vote_sweeper import sweep_stale_votes
+from models import Poll, Vote, VoteRollup
+
+
+async def vote(client, headers, poll, index):
+    response = await client.post(
+        f"/poll/{poll['uuid']}/vote", json={"option_uuid": poll["options"][index]["uuid"]}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def add_option(client, headers, poll, name):
+    response = await client.post(f"/poll/{poll['uuid']}/options", json={"options": [{"option_name": name}]}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def rows_by_epoch(session, model, poll_uuid):
+    poll_id = await session.scalar(select(Poll.id).where(Poll.uuid == UUID(poll_uuid)))
+    result = await session.execute(
+        select(model.epoch, func.count()).where(model.poll_id == poll_id).group_by(model.epoch)
+    )
+    return dict(result.all())
+
+
+async def test_adding_an_option_hides_earlier_votes(client, auth_headers, poll):
+    await vote(client, auth_headers, poll, 0)
+    await add_option(client, auth_headers, poll, "maybe")
+
+    summary = (await client.get(f"/poll/{poll['uuid']}/summary")).json()
+    assert summary["total_votes"] == 0
+    me = (await client.get("/auth/me", headers=auth_headers)).json()
+    assert poll["uuid"] not in {voted["poll_uuid"] for voted in me["voted_polls"]}
+
+
+async def test_deleting_a_voted_option_hides_earlier_votes(client, auth_headers, make_user, poll):
+    other = await make_user()
+    await vote(client, auth_headers, poll, 0)
+    await vote(client, other, poll, 1)
+    response = await client.request(
+        "DELETE", f"/poll/{poll['uuid']}/options", json={"option_uuids": [poll["options"][0]["uuid"]]}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    summary = (await client.get(f"/poll/{poll['uuid']}/summary")).json()
+    assert summary["total_votes"] == 0
+
+
+async def test_revote_after_epoch_bump(client, auth_headers, poll, db_session):
+    await vote(client, auth_headers, poll, 0)
+    poll = await add_option(client, auth_headers, poll, "maybe")
+    result = await vote(client, auth_headers, poll, 1)
+
+    assert result["summary"]["total_votes"] == 1
+    assert result["summary"]["option_percentages"][poll["options"][1]["uuid"]] == 100.0
+    # The re-vote replaced the earlier epoch's row instead of adding a second one
+    assert await rows_by_epoch(db_session, Vote, poll["uuid"]) == {2: 1}
+
+
+async def test_sweeper_deletes_only_stale_epochs(client, auth_headers, make_user, poll, db_session):
+    other = await make_user()
+    untouched = (await client.post(
+        "/poll/", json={"title": "sweeper control", "options": [{"option_name": "x"}, {"option_name": "y"}]},
+        headers=auth_headers,
+    )).json()
+    await vote(client, auth_headers, untouched, 0)
+    await vote(client, auth_headers, poll, 0)
+    await vote(client, other, poll, 1)
+    poll = await add_option(client, auth_headers, poll, "maybe")
+    await vote(client, auth_headers, poll, 2)
+
+    assert await rows_by_epoch(db_session, Vote, poll["uuid"]) == {1: 1, 2: 1}
+    assert set(await rows_by_epoch(db_session, VoteRollup, poll["uuid"])) == {1, 2}
+    control_votes = await rows_by_epoch(db_session, Vote, untouched["uuid"])
+    control_rollups = await rows_by_epoch(db_session, VoteRollup, untouched["uuid"])
+
+    report = await sweep_stale_votes(batch_size=1, pause_seconds=0)
+    assert report["votes_deleted"] >= 1 and report["rollups_deleted"] >= 1
+
+    assert await rows_by_epoch(db_session, Vote, poll["uuid"]) == {2: 1}
+    assert set(await rows_by_epoch(db_session, VoteRollup, poll["uuid"])) == {2}
+    assert await rows_by_epoch(db_session, Vote, untouched["uuid"]) == control_votes
+    assert await rows_by_epoch(db_session, VoteRollup, untouched["uuid"]) == control_rollups
+    summary = (await client.get(f"/poll/{poll['uuid']}/summary")).json()
+    assert summary["total_votes"] == 1
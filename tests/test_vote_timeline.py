@@ -0,0 +1,30 @@
+"""Votes without a timestamp (cast before ``votes.created_at`` existed) stay out of the rollups."""
+from uuid import UUID
+
+from sqlalchemy import delete, select, update
+
+from models import Poll, Vote, VoteRollup
+
+
+async def test_changing_an_untimed_vote_only_adds_the_new_one(client, auth_headers, poll, db_session):
+    response = await client.post(
+        f"/poll/{poll['uuid']}/vote", json={"option_uuid": poll["options"][0]["uuid"]}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    # Make it look like a vote from before the migration: no timestamp, not in any bucket
+    poll_id = await db_session.scalar(select(Poll.id).where(Poll.uuid == UUID(poll["uuid"])))
+    await db_session.execute(update(Vote).where(Vote.poll_id == poll_id).values(created_at=None))
+    await db_session.execute(delete(VoteRollup).where(VoteRollup.poll_id == poll_id))
+    await db_session.commit()
+
+    response = await client.get(f"/poll/{poll['uuid']}/export", params={"format": "ndjson"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert '"voted_at":null' in response.text
+
+    response = await client.post(
+        f"/poll/{poll['uuid']}/vote", json={"option_uuid": poll["options"][1]["uuid"]}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+
+    timeline = (await client.get(f"/poll/{poll['uuid']}/timeline", params={"granularity": "minute"})).json()
+    assert [bucket["votes"] for bucket in timeline["buckets"]] == [{poll["options"][1]["uuid"]: 1}]